@@ -0,0 +1,112 @@
+"""Benchmark da cascata de modelos: todos no modelo completo vs. triagem barata e escalonamento.
+
+Usa o backend falso (sem chave da API), com o modelo de triagem mais rápido
+que o completo, e analisa o mesmo lote uma vez só com o modelo completo e uma
+vez por faixa de escalonamento. Para cada modo mede a latência média por
+currículo (triagem + análise completa, quando houver), o tempo total do lote,
+as chamadas, o custo estimado por currículo e quantos dos `--top` melhores do
+ranking só com o modelo completo continuam entre os `--top` da cascata.
+
+Uso: python -m benchmarks.bench_cascata [--curriculos N] [--faixas 45-100 60-100] [--auditoria F]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+
+from benchmarks.pdf_sintetico import gerar_linhas
+from src.core.agente import AgenteAnalisador
+from src.core.backend import BackendFalso
+from src.core.cascata import AnalisadorCascata, _ler_faixa, _ler_preco, descrever_cascata, resumir_cascata
+from src.core.lote import AnalisadorLote, DocumentoLote, ResultadoLote, ranquear
+from src.core.orcamento import estimar_tokens
+from src.ui.app_streamlit import SelectAIApp
+
+
+MODELO_TRIAGEM = "gemini-2.5-flash-lite"
+
+
+def montar_documentos(quantidade: int) -> List[DocumentoLote]:
+    return [
+        DocumentoLote(f"cv{indice:05d}.txt", "\n".join(gerar_linhas(40, semente=indice)).encode("utf-8"))
+        for indice in range(quantidade)
+    ]
+
+
+def medir(
+    documentos: List[DocumentoLote], vaga: str, faixa: Optional[str], args: argparse.Namespace
+) -> Tuple[List[ResultadoLote], float, int]:
+    backend = BackendFalso(
+        latencia_ms=args.latencia_ms, semente=3, latencias_modelo={MODELO_TRIAGEM: args.latencia_triagem_ms}
+    )
+    agente = AgenteAnalisador(api_key="", backend=backend, usar_cache=False)
+    cascata = (
+        AnalisadorCascata(agente, modelo_triagem=MODELO_TRIAGEM, faixa=_ler_faixa(faixa), auditoria=args.auditoria)
+        if faixa is not None
+        else None
+    )
+    analisador = AnalisadorLote(agente, max_concorrencia=args.concorrencia, cascata=cascata)
+    inicio = time.perf_counter()
+    resultados = list(analisador.analisar(documentos, vaga))
+    return ranquear(resultados), time.perf_counter() - inicio, backend.chamadas
+
+
+def latencia_media(resultados: List[ResultadoLote]) -> float:
+    """Da leitura ao resultado de cada currículo, incluindo a espera por uma vaga de concorrência."""
+    return sum(item.duracao for item in resultados) / len(resultados)
+
+
+def custo_so_completo(documentos: List[DocumentoLote], resultados: List[ResultadoLote], vaga: str) -> float:
+    """Custo do modo sem cascata, pela mesma estimativa que a cascata usa para a camada completa."""
+    agente = AgenteAnalisador(api_key="", backend=BackendFalso(), usar_cache=False)
+    entrada = sum(
+        agente._montar_prompt(documento.conteudo.decode("utf-8"), vaga)[1].tokens_prompt for documento in documentos
+    )
+    saida = sum(estimar_tokens(json.dumps(item.resultado, ensure_ascii=False)) for item in resultados)
+    preco = _ler_preco(os.getenv("SELECT_AI_PRECO_COMPLETO", "0.30,2.50"))
+    return AnalisadorCascata._custo((entrada, saida), preco)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--curriculos", type=int, default=300)
+    parser.add_argument("--faixas", nargs="+", default=["45-100", "60-100", "75-100"])
+    parser.add_argument("--auditoria", type=float, default=0.1)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--latencia-ms", type=float, default=120.0)
+    parser.add_argument("--latencia-triagem-ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    vaga = next(iter(SelectAIApp.AMOSTRAS_VAGA.values()))
+    documentos = montar_documentos(args.curriculos)
+
+    referencia, tempo, chamadas = medir(documentos, vaga, None, args)
+    custo = custo_so_completo(documentos, referencia, vaga)
+    melhores = {item.nome_arquivo for item in referencia[: args.top]}
+    print(f"{len(documentos)} currículos, concorrência {args.concorrencia}, auditoria {args.auditoria:.0%}")
+    print(
+        f"{'modo':<18} {'latência/CV (s)':>16} {'lote (s)':>9} {'chamadas':>9} {'US$/CV':>9} "
+        f"{'escalados':>10} {f'top-{args.top} mantidos':>16}"
+    )
+    print(
+        f"{'só completo':<18} {latencia_media(referencia):>16.3f} {tempo:>9.2f} "
+        f"{chamadas:>9} {custo / len(referencia):>9.5f} {len(referencia):>10} {args.top:>16}"
+    )
+    for faixa in args.faixas:
+        resultados, tempo, chamadas = medir(documentos, vaga, faixa, args)
+        resumo = resumir_cascata(item.resultado for item in resultados)
+        mantidos = len(melhores & {item.nome_arquivo for item in resultados[: args.top]})
+        print(
+            f"{'cascata ' + faixa:<18} {latencia_media(resultados):>16.3f} {tempo:>9.2f} {chamadas:>9} "
+            f"{resumo['custo_por_curriculo']:>9.5f} {resumo['escalados']:>10} {mantidos:>16}"
+        )
+        print(f"  {descrever_cascata(resumo)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Benchmark da detecção de quase duplicatas (MinHash + LSH) em lotes grandes.
+
+Gera currículos sintéticos e, para uma fração deles, variantes com pequenas
+edições (linha trocada, cabeçalho novo, linhas reordenadas), como o mesmo
+candidato enviando PDFs levemente diferentes. Mede o tempo de assinatura e de
+registro, o pico de memória do índice, a precisão/revocação contra o gabarito
+e quantas análises seriam evitadas. Em uma amostra menor, compara o registro
+via LSH com a comparação de cada currículo contra todos os anteriores.
+
+Uso: python -m benchmarks.bench_duplicatas [--curriculos N] [--fracao-variantes F] [--amostra-forca-bruta N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.pdf_sintetico import gerar_linhas
+from src.core.arquivo import ArquivoHandler
+from src.core.duplicatas import DetectorDuplicatas
+
+
+def gerar_variante(linhas: List[str], aleatorio: random.Random) -> List[str]:
+    variante = list(linhas)
+    variante[aleatorio.randrange(len(variante))] = "telefone atualizado e-mail novo linkedin"
+    if aleatorio.random() < 0.5:
+        variante.insert(0, "Currículo atualizado")
+    if aleatorio.random() < 0.5:
+        inicio = aleatorio.randrange(len(variante) - 1)
+        variante[inicio], variante[inicio + 1] = variante[inicio + 1], variante[inicio]
+    return variante
+
+
+def montar_lote(quantidade: int, fracao_variantes: float, semente: int = 0) -> Tuple[List[str], List[int]]:
+    """Textos normalizados e, para cada um, o índice do currículo de origem (gabarito)."""
+    aleatorio = random.Random(semente)
+    textos: List[str] = []
+    origens: List[int] = []
+    distintos = 0
+    while len(textos) < quantidade:
+        linhas = gerar_linhas(40, semente=distintos)
+        textos.append(ArquivoHandler.limpar_texto("\n".join(linhas)))
+        origens.append(distintos)
+        while len(textos) < quantidade and aleatorio.random() < fracao_variantes:
+            textos.append(ArquivoHandler.limpar_texto("\n".join(gerar_variante(linhas, aleatorio))))
+            origens.append(distintos)
+        distintos += 1
+    ordem = list(range(len(textos)))
+    aleatorio.shuffle(ordem)
+    return [textos[indice] for indice in ordem], [origens[indice] for indice in ordem]
+
+
+def registrar_forca_bruta(assinaturas: List[np.ndarray], limiar: float) -> List[Optional[int]]:
+    """Referência O(n²): compara cada assinatura com todos os representantes anteriores."""
+    representantes: List[int] = []
+    grupos: List[Optional[int]] = []
+    for indice, assinatura in enumerate(assinaturas):
+        escolhido = None
+        for representante in representantes:
+            if (assinaturas[representante] == assinatura).mean() >= limiar:
+                escolhido = representante
+                break
+        if escolhido is None:
+            representantes.append(indice)
+        grupos.append(escolhido)
+    return grupos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--curriculos", type=int, default=20000)
+    parser.add_argument("--fracao-variantes", type=float, default=0.3)
+    parser.add_argument("--amostra-forca-bruta", type=int, default=2000)
+    args = parser.parse_args()
+
+    textos, origens = montar_lote(args.curriculos, args.fracao_variantes)
+    detector = DetectorDuplicatas()
+
+    inicio = time.perf_counter()
+    assinaturas = [detector.assinar(texto) for texto in textos]
+    tempo_assinatura = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    grupos = [detector.registrar(assinatura, indice) for indice, assinatura in enumerate(assinaturas)]
+    tempo_registro = time.perf_counter() - inicio
+    memoria = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    acertos = sum(1 for indice, grupo in enumerate(grupos) if grupo is not None and origens[grupo] == origens[indice])
+    marcados = sum(1 for grupo in grupos if grupo is not None)
+    esperados = len(textos) - len(set(origens))
+    print(f"{len(textos)} currículos, {len(set(origens))} distintos, {esperados} variantes")
+    print(f"assinatura: {tempo_assinatura * 1000 / len(textos):.3f} ms/CV ({len(textos) / tempo_assinatura:.0f} CVs/s)")
+    print(
+        f"registro LSH: {tempo_registro * 1e6 / len(textos):.1f} us/CV, "
+        f"pico do índice {memoria / 1024 / 1024:.2f} MiB ({memoria / len(textos):.0f} B/CV)"
+    )
+    print(
+        f"marcados como duplicata: {marcados} | precisão {acertos / marcados if marcados else 1:.3f} "
+        f"| revocação {acertos / esperados if esperados else 1:.3f}"
+    )
+    print(f"análises no modelo: {len(textos)} -> {detector.representantes}")
+
+    amostra = assinaturas[: args.amostra_forca_bruta]
+    inicio = time.perf_counter()
+    registrar_forca_bruta(amostra, detector.limiar)
+    tempo_forca = time.perf_counter() - inicio
+    lsh = DetectorDuplicatas()
+    inicio = time.perf_counter()
+    for indice, assinatura in enumerate(amostra):
+        lsh.registrar(assinatura, indice)
+    tempo_lsh = time.perf_counter() - inicio
+    print(f"amostra de {len(amostra)}: força bruta {tempo_forca:.2f}s vs LSH {tempo_lsh:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
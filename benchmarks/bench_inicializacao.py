@@ -0,0 +1,126 @@
+"""Custo de inicialização: importação dos módulos e sobrecarga por rerun do Streamlit.
+
+A importação de cada módulo é medida em um processo novo, informando quais
+dependências pesadas (SDK do Gemini, PyPDF2, NumPy, Streamlit) ela carregou.
+O custo por rerun compara criar o agente e ler o CSS a cada execução (como
+antes) com os recursos compartilhados via `st.cache_resource`, e mede reruns
+completos do app com o AppTest do Streamlit.
+
+Uso: python -m benchmarks.bench_inicializacao [--repeticoes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+MODULOS = ("src.core.arquivo", "src.core.agente", "src.core.lote", "src.cli.app_cli", "src.ui.app_streamlit")
+PESADOS = ("google.generativeai", "PyPDF2", "numpy", "streamlit")
+
+SCRIPT_IMPORTACAO = """
+import json, sys, time, warnings
+warnings.simplefilter("ignore")
+inicio = time.perf_counter()
+import {modulo}
+decorrido = time.perf_counter() - inicio
+print(json.dumps({{"segundos": decorrido, "carregados": [m for m in {pesados!r} if m in sys.modules]}}))
+"""
+
+
+def medir_importacao(modulo: str, repeticoes: int) -> Tuple[float, List[str]]:
+    tempos = []
+    carregados: List[str] = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", SCRIPT_IMPORTACAO.format(modulo=modulo, pesados=PESADOS)],
+            cwd=RAIZ,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        dados = json.loads(saida.strip().splitlines()[-1])
+        tempos.append(dados["segundos"])
+        carregados = dados["carregados"]
+    return statistics.median(tempos) * 1000, carregados
+
+
+def medir_ms(funcao: Callable[[], object], repeticoes: int) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def medir_recursos(repeticoes: int) -> Dict[str, float]:
+    """Agente + CSS a cada rerun (sem cache) vs. recursos compartilhados."""
+    from src.core.agente import AgenteAnalisador
+    from src.ui import app_streamlit
+
+    chave = os.environ["GEMINI_API_KEY"]
+    caminho_css = Path(app_streamlit.__file__).resolve().parent / "styles.css"
+
+    def sem_cache() -> None:
+        AgenteAnalisador(api_key=chave)
+        caminho_css.read_text(encoding="utf-8")
+
+    def com_cache() -> None:
+        app_streamlit._obter_agente(chave, os.getenv("GEMINI_MODEL", ""))
+        app_streamlit._carregar_estilo(str(caminho_css), caminho_css.stat().st_mtime)
+
+    app_streamlit.invalidar_recursos()
+    inicio = time.perf_counter()
+    com_cache()
+    primeira = (time.perf_counter() - inicio) * 1000
+    return {
+        "sem cache (por rerun)": medir_ms(sem_cache, repeticoes),
+        "com cache (primeira)": primeira,
+        "com cache (reruns)": medir_ms(com_cache, repeticoes),
+    }
+
+
+def medir_reruns(repeticoes: int) -> Dict[str, float]:
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(RAIZ / "main.py"), default_timeout=60)
+    inicio = time.perf_counter()
+    app.run()
+    primeira = (time.perf_counter() - inicio) * 1000
+    return {"primeira execução": primeira, "rerun (mediana)": medir_ms(app.run, repeticoes)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+    os.environ.setdefault("GEMINI_API_KEY", "chave-de-medicao")
+
+    print(f"{'modulo':<24} {'importacao (ms)':>16}  dependencias pesadas carregadas")
+    for modulo in MODULOS:
+        tempo, carregados = medir_importacao(modulo, args.repeticoes)
+        print(f"{modulo:<24} {tempo:>16.1f}  {', '.join(carregados) or '-'}")
+
+    print()
+    print(f"{'agente + CSS':<24} {'tempo (ms)':>16}")
+    for rotulo, tempo in medir_recursos(args.repeticoes * 4).items():
+        print(f"{rotulo:<24} {tempo:>16.3f}")
+
+    print()
+    print(f"{'app completo (AppTest)':<24} {'tempo (ms)':>16}")
+    for rotulo, tempo in medir_reruns(args.repeticoes).items():
+        print(f"{rotulo:<24} {tempo:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Micro-benchmark da leitura de PDFs (ArquivoHandler._ler_pdf).
+
+Compara a leitura anterior (cópia integral + lista de páginas) com a extração
+em streaming, com e sem orçamento de páginas, e com o cache por digest.
+
+Uso: python -m benchmarks.bench_leitura_pdf [--repeticoes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from PyPDF2 import PdfReader
+
+from benchmarks.bench_normalizacao import normalizar_anterior
+from benchmarks.pdf_sintetico import gerar_pdf
+from src.core.arquivo import ArquivoHandler
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def ler_pdf_anterior(conteudo: bytes) -> str:
+    """Reprodução da implementação original, usada como referência."""
+    arquivo = io.BytesIO(conteudo)
+    dados = arquivo.read()
+    reader = PdfReader(io.BytesIO(dados))
+    paginas = [pagina.extract_text() or "" for pagina in reader.pages]
+    return normalizar_anterior("\n".join(paginas))
+
+
+def ler_pdf_streaming(conteudo: bytes, limite_paginas: int = 0) -> str:
+    ArquivoHandler._cache_textos.clear()
+    return ArquivoHandler._ler_pdf(io.BytesIO(conteudo), limite_paginas=limite_paginas, limite_caracteres=0)
+
+
+def ler_pdf_cache(conteudo: bytes) -> str:
+    return ArquivoHandler._ler_pdf(io.BytesIO(conteudo), limite_paginas=0, limite_caracteres=0)
+
+
+def medir(funcao: Callable[[], str], repeticoes: int) -> Tuple[float, float]:
+    """Mede o tempo sem tracemalloc e o pico de memória em uma execução à parte."""
+    tempos: List[float] = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(tempos) * 1000, pico / (1024 * 1024)
+
+
+def carregar_amostras() -> Dict[str, bytes]:
+    amostras = {caminho.name: caminho.read_bytes() for caminho in sorted((RAIZ / "cvs").glob("*.pdf"))}
+    for paginas in (20, 200):
+        amostras[f"sintetico_{paginas}p.pdf"] = gerar_pdf(paginas, semente=paginas)
+    return amostras
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'arquivo':<24} {'estrategia':<22} {'mediana (ms)':>13} {'pico (MiB)':>11}")
+    for nome, conteudo in carregar_amostras().items():
+        estrategias = {
+            "anterior": lambda: ler_pdf_anterior(conteudo),
+            "streaming": lambda: ler_pdf_streaming(conteudo),
+            "streaming 50 paginas": lambda: ler_pdf_streaming(conteudo, limite_paginas=50),
+            "cache (repetido)": lambda: ler_pdf_cache(conteudo),
+        }
+        for rotulo, funcao in estrategias.items():
+            if rotulo.startswith("cache"):
+                ler_pdf_cache(conteudo)
+            tempo, pico = medir(funcao, args.repeticoes)
+            print(f"{nome:<24} {rotulo:<22} {tempo:>13.2f} {pico:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
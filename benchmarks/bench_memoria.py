@@ -0,0 +1,182 @@
+"""Benchmark de memória na leitura de uploads: pico de RSS com e sem os limites de tamanho.
+
+Gera em disco arquivos hostis ou grandes (PDF acima de 10 MB, stream
+FlateDecode que se expande para centenas de MB, árvore de páginas com um milhão
+de páginas, ZIP com um membro-bomba e um TXT de 9 MB) e lê cada um num
+subprocesso próprio, para que o pico de RSS de um cenário não contamine o
+próximo. O modo "protegido" usa o caminho atual (`ArquivoHandler.ler_texto` /
+`expandir_arquivos`); o modo "sem limites" reproduz a leitura anterior, que
+carregava e descomprimia tudo. Sai com código 1 se algum cenário protegido
+passar de `--teto-mb`.
+
+Uso: python -m benchmarks.bench_memoria [--teto-mb 512] [--bomba-mb 300] [--sem-referencia]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Callable, Dict, List
+
+from benchmarks.pdf_sintetico import gerar_linhas, gerar_pdf, gerar_pdf_arvore_bomba, gerar_pdf_bomba
+
+
+def _escrever_zip_bomba(caminho: str, megabytes: int) -> None:
+    espacos = b" " * (1 << 20)
+    with zipfile.ZipFile(caminho, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as pacote:
+        pacote.writestr("curriculo_ok.txt", "\n".join(gerar_linhas(40)))
+        with pacote.open("curriculo_bomba.txt", "w", force_zip64=True) as membro:
+            for _ in range(megabytes):
+                membro.write(espacos)
+
+
+def _escrever_txt(caminho: str, megabytes: int) -> None:
+    linha = " ".join(gerar_linhas(1)[0].split()) + " experiência não técnica\n"
+    with open(caminho, "w", encoding="utf-8") as saida:
+        while saida.tell() < megabytes * (1 << 20):
+            saida.write(linha * 1000)
+
+
+def gerar_cenarios(pasta: str, bomba_mb: int) -> Dict[str, str]:
+    """Caminho de cada cenário; os arquivos são escritos uma vez e lidos pelos subprocessos."""
+    cenarios = {
+        "pdf_grande": ("curriculo.pdf", lambda: gerar_pdf(4000)),
+        "pdf_flate_bomba": ("bomba.pdf", lambda: gerar_pdf_bomba(bomba_mb)),
+        "pdf_arvore_bomba": ("arvore.pdf", lambda: gerar_pdf_arvore_bomba(10, 6)),
+    }
+    caminhos: Dict[str, str] = {}
+    for cenario, (nome, gerar) in cenarios.items():
+        caminhos[cenario] = os.path.join(pasta, nome)
+        with open(caminhos[cenario], "wb") as saida:
+            saida.write(gerar())
+    caminhos["zip_bomba"] = os.path.join(pasta, "lote.zip")
+    _escrever_zip_bomba(caminhos["zip_bomba"], bomba_mb)
+    caminhos["txt_9mb"] = os.path.join(pasta, "curriculo.txt")
+    _escrever_txt(caminhos["txt_9mb"], 9)
+    return caminhos
+
+
+def _protegido(caminho: str) -> str:
+    from src.core.arquivo import ArquivoHandler
+    from src.core.lote import expandir_arquivos
+
+    with open(caminho, "rb") as arquivo:
+        if caminho.endswith(".zip"):
+            documentos = expandir_arquivos([arquivo])
+            recusados = [documento.erro for documento in documentos if documento.erro]
+            return f"{len(documentos)} documentos, {len(recusados)} recusados" + (
+                f": {recusados[0]}" if recusados else ""
+            )
+        return f"{len(ArquivoHandler.ler_texto(arquivo, os.path.basename(caminho)))} caracteres"
+
+
+def _sem_limites(caminho: str) -> str:
+    """Leitura anterior: arquivo inteiro em memória, streams e membros descomprimidos por completo."""
+    from PyPDF2 import PdfReader
+
+    with open(caminho, "rb") as arquivo:
+        conteudo = arquivo.read()
+    if caminho.endswith(".zip"):
+        with zipfile.ZipFile(io.BytesIO(conteudo)) as pacote:
+            tamanhos = [len(pacote.read(info)) for info in pacote.infolist()]
+        return f"{len(tamanhos)} documentos, {sum(tamanhos) / (1 << 20):.0f} MB descomprimidos"
+    if caminho.endswith(".txt"):
+        return f"{len(' '.join(conteudo.decode('utf-8').split()))} caracteres"
+    leitor = PdfReader(io.BytesIO(conteudo))
+    paginas = len(leitor.pages)
+    conteudo_pagina = leitor.pages[0].get_contents() if paginas else None
+    dados = conteudo_pagina.get_data() if conteudo_pagina is not None else b""
+    return f"{paginas} páginas, primeira stream com {len(dados) / (1 << 20):.1f} MB"
+
+
+def pico_rss_mb() -> float:
+    """VmHWM do processo; o ru_maxrss do Linux herda o pico do processo pai através do exec."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for linha in status:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+MODOS: Dict[str, Callable[[str], str]] = {"protegido": _protegido, "sem_limites": _sem_limites}
+
+
+def executar(caminho: str, modo: str) -> None:
+    """Roda no subprocesso: lê o arquivo e imprime o resultado e o pico de RSS em JSON."""
+    inicio = time.perf_counter()
+    try:
+        resultado = MODOS[modo](caminho)
+    except Exception as exc:
+        resultado = f"{type(exc).__name__}: {exc}"
+    print(
+        json.dumps(
+            {
+                "resultado": resultado,
+                "segundos": time.perf_counter() - inicio,
+                "pico_mb": pico_rss_mb(),
+            },
+            ensure_ascii=False,
+        )
+    )
+
+
+def medir(caminho: str, modo: str, timeout: float) -> Dict[str, object]:
+    comando = [sys.executable, "-m", "benchmarks.bench_memoria", "--executar", caminho, modo]
+    try:
+        processo = subprocess.run(comando, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"resultado": f"interrompido após {timeout:.0f}s", "segundos": timeout, "pico_mb": float("nan")}
+    if processo.returncode != 0:
+        ultima = (processo.stderr.strip().splitlines() or ["sem saída"])[-1]
+        resultado = f"processo terminou com código {processo.returncode}: {ultima}"
+        return {"resultado": resultado, "segundos": 0.0, "pico_mb": float("nan")}
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--teto-mb", type=float, default=512.0)
+    parser.add_argument("--bomba-mb", type=int, default=300)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--sem-referencia", action="store_true", help="Não roda o modo sem limites.")
+    parser.add_argument("--executar", nargs=2, metavar=("CAMINHO", "MODO"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.executar:
+        executar(*args.executar)
+        return
+
+    modos: List[str] = ["protegido"] if args.sem_referencia else ["protegido", "sem_limites"]
+    excedidos = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        caminhos = gerar_cenarios(pasta, args.bomba_mb)
+        print(f"teto de memória: {args.teto_mb:.0f} MB")
+        print(f"{'cenário':<18} {'arquivo (MB)':>12} {'modo':<12} {'pico RSS (MB)':>14} {'tempo (s)':>10}  resultado")
+        for cenario, caminho in caminhos.items():
+            tamanho = os.path.getsize(caminho) / (1 << 20)
+            for modo in modos:
+                medicao = medir(caminho, modo, args.timeout)
+                pico = float(medicao["pico_mb"])
+                if modo == "protegido" and not pico <= args.teto_mb:
+                    excedidos += 1
+                print(
+                    f"{cenario:<18} {tamanho:>12.2f} {modo:<12} {pico:>14.1f} {float(medicao['segundos']):>10.2f}  "
+                    f"{str(medicao['resultado'])[:90]}"
+                )
+    if excedidos:
+        print(f"{excedidos} cenário(s) protegido(s) passaram do teto de {args.teto_mb:.0f} MB.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
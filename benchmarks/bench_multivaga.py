@@ -0,0 +1,73 @@
+"""Benchmark de um currículo contra várias vagas: uma chamada por vaga vs. vagas agrupadas.
+
+Usa o backend falso (sem chave da API) e mede, para cada modo, o número de
+chamadas ao modelo, os tokens de entrada reportados em `usage_metadata`
+(o currículo é reenviado a cada chamada) e o tempo total. As vagas de
+exemplo da interface são replicadas até o total pedido.
+
+Uso: python -m benchmarks.bench_multivaga [--vagas N] [--por-chamada G] [--top-k K] [--latencia-ms MS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Dict, List
+
+from benchmarks.bench_sessao_vaga import carregar_curriculos
+from src.core.agente import AgenteAnalisador
+from src.core.backend import BackendFalso
+from src.core.multivaga import AnalisadorMultiVaga
+from src.core.telemetria import Telemetria
+from src.ui.app_streamlit import SelectAIApp
+
+
+def montar_vagas(quantidade: int) -> Dict[str, str]:
+    exemplos = list(SelectAIApp.AMOSTRAS_VAGA.items())
+    vagas: Dict[str, str] = {}
+    for indice in range(quantidade):
+        titulo, texto = exemplos[indice % len(exemplos)]
+        vagas[f"{titulo} #{indice // len(exemplos) + 1}"] = texto
+    return vagas
+
+
+def medir(modo: str, curriculo: str, vagas: Dict[str, str], args: argparse.Namespace) -> List[Any]:
+    backend = BackendFalso(latencia_ms=args.latencia_ms, semente=7)
+    telemetria = Telemetria(ativa=True)
+    agente = AgenteAnalisador(api_key="", backend=backend, usar_cache=False, telemetria=telemetria)
+    inicio = time.perf_counter()
+    if modo == "uma chamada por vaga":
+        for texto in vagas.values():
+            agente.analisar(curriculo, texto)
+    else:
+        analisador = AnalisadorMultiVaga(agente, vagas_por_chamada=args.por_chamada, max_concorrencia=1)
+        list(analisador.analisar(curriculo, vagas, top_k=args.top_k if modo.startswith("pré") else None))
+    decorrido = time.perf_counter() - inicio
+    tokens = telemetria.exportar_prometheus()
+    entrada = sum(
+        float(linha.rsplit(" ", 1)[1])
+        for linha in tokens.splitlines()
+        if linha.startswith('select_ai_tokens_total{tipo="entrada"}')
+    )
+    return [modo, backend.chamadas, int(entrada), decorrido]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vagas", type=int, default=40)
+    parser.add_argument("--por-chamada", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--latencia-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    curriculo = carregar_curriculos(1)[0]
+    vagas = montar_vagas(args.vagas)
+    print(f"{len(vagas)} vagas, {args.por_chamada} por chamada, chamadas sequenciais")
+    print(f"{'modo':<30} {'chamadas':>9} {'tokens entrada':>15} {'tempo (s)':>10}")
+    for modo in ("uma chamada por vaga", "agrupado", f"pré-seleção top-{args.top_k} + agrupado"):
+        nome, chamadas, entrada, decorrido = medir(modo, curriculo, vagas, args)
+        print(f"{nome:<30} {chamadas:>9} {entrada:>15} {decorrido:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Micro-benchmark da normalização de texto (ArquivoHandler._normalizar) em entradas de vários MB.
+
+Compara a implementação anterior (NFKD + encode ASCII + regex sem compilar,
+cada etapa copiando o texto inteiro) com a normalização em blocos, nos modos
+ASCII (padrão) e preservando acentos. O texto de entrada é o extraído dos
+currículos de exemplo, com lixo típico de PDF (ligaduras, hífen suave,
+controles, espaços não separáveis), repetido até o tamanho pedido; a variante
+"decomposto" traz os acentos como caracteres combinantes (NFD), como em PDFs
+gerados por alguns editores, o pior caso do modo que preserva acentos.
+
+Uso: python -m benchmarks.bench_normalizacao [--tamanhos-mb 1 4 16] [--repeticoes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import re
+import statistics
+import time
+import tracemalloc
+import unicodedata
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from src.core.arquivo import ArquivoHandler
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+LIXO_PDF = "\n\ufb01nan\u00e7as e \ufb02uxo de caixa\u00a0\u00a0re\u00adcursos\x00\x07 humanos\ufffd\u200b gest\u00e3o \t\r\n"
+
+
+def normalizar_anterior(texto: str) -> str:
+    """Reprodução da implementação original, usada como referência."""
+    if not texto:
+        return ""
+    texto = unicodedata.normalize("NFKD", texto)
+    texto = texto.encode("ascii", errors="ignore").decode("ascii")
+    texto = re.sub(r"\s+", " ", texto)
+    return texto.strip()
+
+
+def montar_texto(tamanho_mb: float) -> str:
+    paginas = [
+        pagina
+        for caminho in sorted((RAIZ / "cvs").glob("*.pdf"))
+        for pagina in ArquivoHandler.iterar_paginas_pdf(io.BytesIO(caminho.read_bytes()))
+    ]
+    base = "\n".join(paginas) + LIXO_PDF
+    total = int(tamanho_mb * 1024 * 1024)
+    return (base * (total // len(base) + 1))[:total]
+
+
+def medir(funcao: Callable[[], str], repeticoes: int) -> Tuple[float, float]:
+    """Mede o tempo sem tracemalloc e o pico de memória em uma execução à parte."""
+    tempos: List[float] = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    tracemalloc.start()
+    funcao()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(tempos) * 1000, pico / (1024 * 1024)
+
+
+def medir_variante(rotulo_entrada: str, texto: str, repeticoes: int) -> None:
+    estrategias = {
+        "anterior": lambda: normalizar_anterior(texto),
+        "blocos ascii": lambda: ArquivoHandler._normalizar(texto, preservar_acentos=False),
+        "blocos acentos": lambda: ArquivoHandler._normalizar(texto, preservar_acentos=True),
+    }
+    for rotulo, funcao in estrategias.items():
+        tempo, pico = medir(funcao, repeticoes)
+        print(f"{rotulo_entrada:<20} {rotulo:<16} {tempo:>13.2f} {pico:>11.2f} {len(funcao()):>14}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tamanhos-mb", type=float, nargs="+", default=[1.0, 4.0, 16.0])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'entrada':<20} {'estrategia':<16} {'mediana (ms)':>13} {'pico (MiB)':>11} {'saida (chars)':>14}")
+    for tamanho in args.tamanhos_mb:
+        extraido = montar_texto(tamanho)
+        for variante, texto in (("extraido", extraido), ("decomposto", unicodedata.normalize("NFD", extraido))):
+            medir_variante(f"{tamanho:.1f} MB {variante}", texto, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
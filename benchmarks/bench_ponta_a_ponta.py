@@ -0,0 +1,233 @@
+"""Benchmark ponta a ponta com o backend falso, sem chave da API.
+
+Gera um corpus de currículos (PDF e TXT) e mede cada etapa do fluxo:
+leitura (ArquivoHandler.ler_texto), montagem do prompt, chamada ao modelo,
+validação do JSON, análise completa (AgenteAnalisador.analisar) e o lote
+concorrente. Para cada etapa informa p50/p95/p99, vazão e pico de RSS.
+
+Com --saida os números são gravados em JSON; com --base eles são comparados a
+uma execução anterior e as regressões acima da tolerância são destacadas.
+
+Uso: python -m benchmarks.bench_ponta_a_ponta [--curriculos N] [--latencia-ms MS]
+     [--taxa-erro P] [--concorrencia N] [--saida atual.json] [--base anterior.json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from benchmarks.bench_sessao_vaga import VAGA_EXEMPLO
+from benchmarks.pdf_sintetico import gerar_linhas, gerar_pdf
+from src.core.agente import AgenteAnalisador
+from src.core.arquivo import ArquivoHandler
+from src.core.backend import BackendFalso
+from src.core.limitador import LimitadorTaxa
+from src.core.lote import AnalisadorLote, DocumentoLote
+
+
+class MonitorMemoria:
+    """Amostra o RSS atual em segundo plano e guarda o maior valor observado."""
+
+    CAMINHO_STATM = Path("/proc/self/statm")
+
+    def __init__(self, intervalo: float = 0.005) -> None:
+        self._intervalo = intervalo
+        self._pico = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+
+    def __enter__(self) -> "MonitorMemoria":
+        self._pico = self.rss_atual()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._parar.set()
+        self._thread.join()
+        self._pico = max(self._pico, self.rss_atual())
+
+    @property
+    def pico_mib(self) -> float:
+        return self._pico / (1024 * 1024)
+
+    def _amostrar(self) -> None:
+        while not self._parar.wait(self._intervalo):
+            self._pico = max(self._pico, self.rss_atual())
+
+    @classmethod
+    def rss_atual(cls) -> int:
+        try:
+            paginas = int(cls.CAMINHO_STATM.read_text().split()[1])
+            return paginas * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maximo if sys.platform == "darwin" else maximo * 1024
+
+
+def percentil(valores: Sequence[float], fracao: float) -> float:
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    posicao = fracao * (len(ordenados) - 1)
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+
+def medir_etapa(itens: Sequence[Any], funcao: Callable[[Any], Any]) -> Tuple[Dict[str, Any], List[Any]]:
+    latencias: List[float] = []
+    resultados: List[Any] = []
+    falhas = 0
+    with MonitorMemoria() as monitor:
+        inicio = time.perf_counter()
+        for item in itens:
+            comeco = time.perf_counter()
+            try:
+                resultados.append(funcao(item))
+            except Exception:
+                falhas += 1
+                resultados.append(None)
+            latencias.append(time.perf_counter() - comeco)
+        total = time.perf_counter() - inicio
+    return _resumo(latencias, total, monitor.pico_mib, falhas), resultados
+
+
+def medir_lote(agente: AgenteAnalisador, documentos: List[DocumentoLote], vaga: str, concorrencia: int) -> Dict[str, Any]:
+    latencias: List[float] = []
+    falhas = 0
+    with MonitorMemoria() as monitor:
+        inicio = time.perf_counter()
+        for item in AnalisadorLote(agente, max_concorrencia=concorrencia).analisar(documentos, vaga):
+            latencias.append(item.duracao)
+            falhas += item.status != "concluido"
+        total = time.perf_counter() - inicio
+    return _resumo(latencias, total, monitor.pico_mib, falhas)
+
+
+def _resumo(latencias: List[float], total: float, pico_mib: float, falhas: int) -> Dict[str, Any]:
+    return {
+        "itens": len(latencias),
+        "falhas": falhas,
+        "p50_ms": percentil(latencias, 0.50) * 1000,
+        "p95_ms": percentil(latencias, 0.95) * 1000,
+        "p99_ms": percentil(latencias, 0.99) * 1000,
+        "vazao_por_s": len(latencias) / total if total > 0 else 0.0,
+        "pico_rss_mib": pico_mib,
+    }
+
+
+def gerar_corpus(quantidade: int, semente: int) -> List[DocumentoLote]:
+    """Mistura de PDFs de 1 a 6 páginas e TXTs com tamanhos variados."""
+    aleatorio = random.Random(semente)
+    documentos = []
+    for indice in range(quantidade):
+        if indice % 3 == 2:
+            texto = "\n".join(gerar_linhas(aleatorio.randint(20, 400), semente + indice))
+            documentos.append(DocumentoLote(f"cv_{indice:04d}.txt", texto.encode("utf-8")))
+        else:
+            paginas = aleatorio.randint(1, 6)
+            documentos.append(DocumentoLote(f"cv_{indice:04d}.pdf", gerar_pdf(paginas, semente=semente + indice)))
+    return documentos
+
+
+def imprimir(
+    etapas: Dict[str, Dict[str, Any]],
+    base: Optional[Dict[str, Dict[str, Any]]],
+    tolerancia: float,
+    piso_ms: float,
+) -> int:
+    """Imprime a tabela e conta regressões; latências abaixo do piso são ruído e não contam."""
+    print(
+        f"{'etapa':<12} {'itens':>6} {'falhas':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} "
+        f"{'p99 (ms)':>10} {'vazao/s':>9} {'pico RSS (MiB)':>15}"
+    )
+    regressoes = 0
+    for nome, numeros in etapas.items():
+        print(
+            f"{nome:<12} {numeros['itens']:>6} {numeros['falhas']:>6} {numeros['p50_ms']:>10.2f} "
+            f"{numeros['p95_ms']:>10.2f} {numeros['p99_ms']:>10.2f} {numeros['vazao_por_s']:>9.1f} "
+            f"{numeros['pico_rss_mib']:>15.1f}"
+        )
+        anterior = (base or {}).get(nome)
+        if not anterior:
+            continue
+        for metrica in ("p50_ms", "p95_ms", "p99_ms", "pico_rss_mib"):
+            folga = piso_ms if metrica.endswith("_ms") else 0.0
+            if numeros[metrica] > max(anterior[metrica] * (1 + tolerancia), anterior[metrica] + folga):
+                regressoes += 1
+                print(f"  REGRESSAO {metrica}: {anterior[metrica]:.2f} -> {numeros[metrica]:.2f}")
+        if numeros["vazao_por_s"] < anterior["vazao_por_s"] * (1 - tolerancia):
+            regressoes += 1
+            print(f"  REGRESSAO vazao_por_s: {anterior['vazao_por_s']:.1f} -> {numeros['vazao_por_s']:.1f}")
+    return regressoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--curriculos", type=int, default=60)
+    parser.add_argument("--latencia-ms", type=float, default=40.0)
+    parser.add_argument("--dispersao", type=float, default=0.5)
+    parser.add_argument("--taxa-erro", type=float, default=0.0)
+    parser.add_argument("--taxa-truncamento", type=float, default=0.0)
+    parser.add_argument("--itens", type=int, default=3, help="itens por lista na resposta falsa")
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--saida", type=Path)
+    parser.add_argument("--base", type=Path)
+    parser.add_argument("--tolerancia", type=float, default=0.15)
+    parser.add_argument("--piso-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    backend = BackendFalso(
+        latencia_ms=args.latencia_ms,
+        dispersao=args.dispersao,
+        taxa_erro=args.taxa_erro,
+        taxa_truncamento=args.taxa_truncamento,
+        itens_por_lista=args.itens,
+        semente=args.semente,
+    )
+    agente = AgenteAnalisador("offline", usar_cache=False, backend=backend, limitador=LimitadorTaxa())
+    vaga = ArquivoHandler.limpar_texto(VAGA_EXEMPLO)
+    documentos = gerar_corpus(args.curriculos, args.semente)
+
+    etapas: Dict[str, Dict[str, Any]] = {}
+    ArquivoHandler._cache_textos.clear()
+    etapas["leitura"], textos = medir_etapa(
+        documentos, lambda doc: ArquivoHandler.ler_texto(io.BytesIO(doc.conteudo), doc.nome)
+    )
+    textos = [texto for texto in textos if texto]
+    etapas["prompt"], prompts = medir_etapa(textos, lambda texto: agente._construir_prompt(texto, vaga))
+    etapas["modelo"], respostas = medir_etapa(prompts, agente._gerar)
+    etapas["validacao"], _ = medir_etapa([r for r in respostas if r is not None], agente._validar_json)
+    etapas["analise"], _ = medir_etapa(textos, lambda texto: agente.analisar(texto, vaga))
+    ArquivoHandler._cache_textos.clear()
+    etapas["lote"] = medir_lote(agente, documentos, VAGA_EXEMPLO, args.concorrencia)
+
+    print(
+        f"Corpus: {len(documentos)} currículos | backend falso: mediana {args.latencia_ms:g} ms, "
+        f"dispersão {args.dispersao:g}, erros {args.taxa_erro:.0%}, truncamento {args.taxa_truncamento:.0%}"
+    )
+    base = json.loads(args.base.read_text(encoding="utf-8"))["etapas"] if args.base else None
+    regressoes = imprimir(etapas, base, args.tolerancia, args.piso_ms)
+    print(f"Caminhos do JSON: {agente.estatisticas_json()}")
+    if args.saida:
+        args.saida.write_text(
+            json.dumps({"parametros": {**vars(args), "saida": None, "base": None}, "etapas": etapas}, indent=2),
+            encoding="utf-8",
+        )
+    if regressoes:
+        raise SystemExit(f"{regressoes} regressão(ões) acima de {args.tolerancia:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
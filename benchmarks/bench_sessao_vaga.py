@@ -0,0 +1,139 @@
+"""Benchmark da sessão de vaga: prompt completo por currículo vs. prefixo reaproveitado.
+
+Sem chave, estima localmente os tokens de entrada e o tempo de montagem do
+prompt por currículo. Com `system_instruction` o prefixo ainda é cobrado a cada
+chamada (a economia é de montagem e normalização); com o cache de contexto ele
+é processado uma vez e cobrado a taxa reduzida nas chamadas seguintes.
+Com --ao-vivo e GEMINI_API_KEY definida, chama o Gemini nos dois modos e mede
+latência e tokens reais (usage_metadata).
+
+Uso: python -m benchmarks.bench_sessao_vaga [--curriculos N] [--vaga arquivo.txt] [--ao-vivo]
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.pdf_sintetico import gerar_linhas
+from src.core.agente import AgenteAnalisador
+from src.core.arquivo import ArquivoHandler
+from src.core.orcamento import estimar_tokens
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+VAGA_EXEMPLO = """Desenvolvedor(a) Python Pleno
+Responsabilidades:
+- Desenvolver e manter APIs REST com FastAPI e Django
+- Modelar dados em PostgreSQL e Redis
+- Automatizar testes com pytest e integrar pipelines de CI/CD
+Requisitos obrigatórios:
+- Experiência com Python, SQL e Docker
+- Vivência com filas (Kafka ou RabbitMQ)
+Diferenciais:
+- Kubernetes, Airflow ou Spark
+- Experiência com AWS, GCP ou Azure
+Inglês técnico é desejável."""
+
+
+def carregar_curriculos(quantidade: int) -> List[str]:
+    textos = [
+        ArquivoHandler._ler_pdf(io.BytesIO(caminho.read_bytes()))
+        for caminho in sorted((RAIZ / "cvs").glob("*.pdf"))
+    ]
+    semente = 0
+    while len(textos) < quantidade:
+        textos.append(" ".join(gerar_linhas(40, semente)))
+        semente += 1
+    return textos[:quantidade]
+
+
+def medir_ms(funcao: Callable[[], Any], repeticoes: int = 20) -> float:
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def comparar_local(agente: AgenteAnalisador, vaga: str, curriculos: List[str]) -> None:
+    sessao = agente.abrir_sessao(vaga, usar_cache_contexto=False)
+    sessao_cache = agente.abrir_sessao(vaga, usar_cache_contexto=True)
+    antes = [estimar_tokens(agente._construir_prompt(cv, ArquivoHandler.limpar_texto(vaga))) for cv in curriculos]
+    depois = [estimar_tokens(agente._construir_prompt_curriculo(cv, sessao.texto_vaga)) for cv in curriculos]
+    cv = curriculos[0]
+    tempo_antes = medir_ms(lambda: agente._construir_prompt(cv, ArquivoHandler.limpar_texto(vaga)))
+    tempo_depois = medir_ms(lambda: agente._construir_prompt_curriculo(cv, sessao.texto_vaga))
+    prefixo, prefixo_cache = sessao.tokens_prefixo, sessao_cache.tokens_prefixo
+    linhas = {
+        "prompt completo": (antes, sum(antes)),
+        "system_instruction": ([t + prefixo for t in depois], sum(depois) + prefixo * len(depois)),
+        "cache de contexto": (depois, sum(depois) + prefixo_cache),
+    }
+    print(f"Currículos: {len(curriculos)} | prefixo: ~{prefixo} tokens (~{prefixo_cache} com requisitos)")
+    print(f"{'modo':<22} {'entrada/CV (mediana)':>21} {'entrada no lote':>16} {'montagem (ms)':>14}")
+    for rotulo, (por_cv, total) in linhas.items():
+        tempo = tempo_antes if rotulo == "prompt completo" else tempo_depois
+        print(f"{rotulo:<22} {statistics.median(por_cv):>21.0f} {total:>16} {tempo:>14.3f}")
+    print(
+        "Obrigatórios: %d | desejáveis: %d"
+        % (len(sessao.requisitos.obrigatorios), len(sessao.requisitos.desejaveis))
+    )
+
+
+def comparar_ao_vivo(agente: AgenteAnalisador, vaga: str, curriculos: List[str]) -> None:
+    vaga_limpa = ArquivoHandler.limpar_texto(vaga)
+    with agente.abrir_sessao(vaga) as sessao:
+        modos: Dict[str, Callable[[str], Any]] = {
+            "prompt completo": lambda cv: agente._model.generate_content(
+                agente._construir_prompt(cv, vaga_limpa), generation_config=agente._configuracao_geracao
+            ),
+            "sessao de vaga": lambda cv: sessao._obter_modelo().generate_content(
+                agente._construir_prompt_curriculo(cv, sessao.texto_vaga),
+                generation_config=agente._configuracao_geracao,
+            ),
+        }
+        print(f"Cache de contexto do Gemini: {'sim' if sessao._usar_cache_contexto else 'nao'}")
+        print(f"{'modo':<22} {'latencia p50 (s)':>17} {'tokens entrada/CV':>18} {'tokens em cache/CV':>19}")
+        for rotulo, chamar in modos.items():
+            latencias, entrada, em_cache = [], [], []
+            for cv in curriculos:
+                inicio = time.perf_counter()
+                resposta = chamar(cv)
+                latencias.append(time.perf_counter() - inicio)
+                uso = getattr(resposta, "usage_metadata", None)
+                entrada.append(getattr(uso, "prompt_token_count", 0) or 0)
+                em_cache.append(getattr(uso, "cached_content_token_count", 0) or 0)
+            print(
+                f"{rotulo:<22} {statistics.median(latencias):>17.2f} "
+                f"{statistics.mean(entrada):>18.0f} {statistics.mean(em_cache):>19.0f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--curriculos", type=int, default=20)
+    parser.add_argument("--vaga", type=Path)
+    parser.add_argument("--ao-vivo", action="store_true")
+    args = parser.parse_args()
+
+    vaga = args.vaga.read_text(encoding="utf-8") if args.vaga else VAGA_EXEMPLO
+    curriculos = carregar_curriculos(args.curriculos)
+    chave = os.getenv("GEMINI_API_KEY", "")
+    agente = AgenteAnalisador(chave or "offline", usar_cache=False)
+    comparar_local(agente, vaga, curriculos)
+    if args.ao_vivo:
+        if not chave:
+            raise SystemExit("Defina GEMINI_API_KEY para medir no Gemini.")
+        comparar_ao_vivo(agente, vaga, curriculos)
+
+
+if __name__ == "__main__":
+    main()
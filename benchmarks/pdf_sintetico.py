@@ -0,0 +1,91 @@
+"""Geração de PDFs sintéticos com texto extraível para os benchmarks."""
+
+from __future__ import annotations
+
+import random
+import zlib
+from typing import List
+
+
+PALAVRAS = (
+    "python fastapi django postgresql kafka rabbitmq docker kubernetes pandas "
+    "scikit-learn experiencia formacao projetos liderança comunicação análise "
+    "dados testes automatizados pytest selenium playwright scrum kanban cloud "
+    "aws gcp azure mlflow airflow spark sql nosql redis graphql rest microserviços"
+).split()
+
+
+def gerar_linhas(quantidade: int, semente: int = 0) -> List[str]:
+    aleatorio = random.Random(semente)
+    return [" ".join(aleatorio.choices(PALAVRAS, k=12)) for _ in range(quantidade)]
+
+
+def _escapar(texto: str) -> str:
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def gerar_pdf(paginas: int, linhas_por_pagina: int = 50, semente: int = 0) -> bytes:
+    """Monta um PDF mínimo (Helvetica, uma stream de texto por página)."""
+    linhas = gerar_linhas(paginas * linhas_por_pagina, semente)
+    objetos: List[bytes] = []
+    objetos.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{4 + indice * 2} 0 R" for indice in range(paginas))
+    objetos.append(f"<< /Type /Pages /Kids [{kids}] /Count {paginas} >>".encode())
+    objetos.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for indice in range(paginas):
+        trecho = linhas[indice * linhas_por_pagina : (indice + 1) * linhas_por_pagina]
+        comandos = ["BT", "/F1 9 Tf", "11 TL", "40 800 Td"]
+        comandos.extend(f"({_escapar(linha)}) '" for linha in trecho)
+        comandos.append("ET")
+        stream = "\n".join(comandos).encode("cp1252", errors="replace")
+        objetos.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + indice * 2} 0 R >>".encode()
+        )
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    return _serializar(objetos)
+
+
+def gerar_pdf_bomba(megabytes: int) -> bytes:
+    """PDF de uma página cuja stream FlateDecode se expande para `megabytes` MB de espaços."""
+    compressor = zlib.compressobj(9)
+    espacos = b" " * (1 << 20)
+    partes = [compressor.compress(b"BT /F1 9 Tf 40 800 Td\n")]
+    partes.extend(compressor.compress(espacos) for _ in range(megabytes))
+    partes.append(compressor.compress(b"\n(fim) Tj ET") + compressor.flush())
+    stream = b"".join(partes)
+    return _serializar(
+        [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [4 0 R] /Count 1 >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents 5 0 R >>",
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        ]
+    )
+
+
+def gerar_pdf_arvore_bomba(ramificacao: int, niveis: int) -> bytes:
+    """Árvore de páginas em que cada nó repete o mesmo filho: ramificacao**niveis páginas em poucos KB."""
+    objetos: List[bytes] = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    for nivel in range(niveis):
+        filhos = " ".join([f"{3 + nivel} 0 R"] * ramificacao)
+        contagem = ramificacao ** (niveis - nivel)
+        objetos.append(f"<< /Type /Pages /Kids [{filhos}] /Count {contagem} >>".encode())
+    objetos.append(b"<< /Type /Page /MediaBox [0 0 595 842] >>")
+    return _serializar(objetos)
+
+
+def _serializar(objetos: List[bytes]) -> bytes:
+    saida = bytearray(b"%PDF-1.4\n")
+    deslocamentos = []
+    for numero, corpo in enumerate(objetos, start=1):
+        deslocamentos.append(len(saida))
+        saida += b"%d 0 obj\n" % numero + corpo + b"\nendobj\n"
+    inicio_xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for deslocamento in deslocamentos:
+        saida += b"%010d 00000 n \n" % deslocamento
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(saida)
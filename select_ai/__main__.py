@@ -0,0 +1,7 @@
+"""Permite `python -m select_ai score ...` sem carregar a interface Streamlit."""
+
+from src.cli.app_cli import executar_cli
+
+
+if __name__ == "__main__":
+    raise SystemExit(executar_cli())
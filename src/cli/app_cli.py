@@ -0,0 +1,268 @@
+"""Linha de comando para pontuar currículos em massa, sem carregar o Streamlit.
+
+Exemplo:
+    python -m select_ai score --vacancy vaga.txt cvs/ --out resultados.jsonl
+    find cvs -name '*.pdf' | python -m select_ai score --vacancy vaga.txt - --out resultados.jsonl
+
+Os módulos de `src.core` (e o SDK do Gemini) só são importados depois da
+leitura dos argumentos, para que `--help` e erros de uso respondam na hora.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+
+EXTENSOES = (".pdf", ".txt", ".zip")
+
+LOGGER = logging.getLogger("select_ai.cli")
+
+
+def construir_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m select_ai", description="Select.ai sem interface gráfica.")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+    score = comandos.add_parser("score", help="pontua currículos contra uma vaga e grava JSONL")
+    score.add_argument(
+        "entradas",
+        nargs="+",
+        help="diretórios, arquivos (PDF, TXT ou ZIP) ou '-' para ler da entrada padrão",
+    )
+    score.add_argument("--vacancy", "--vaga", dest="vaga", type=Path, required=True, help="arquivo texto da vaga")
+    score.add_argument("--out", "--saida", dest="saida", type=Path, required=True, help="arquivo JSONL de saída")
+    score.add_argument(
+        "--concurrency", "--concorrencia", "-j",
+        dest="concorrencia",
+        type=int,
+        default=int(os.getenv("SELECT_AI_CONCORRENCIA", "4")),
+        help="chamadas simultâneas ao modelo",
+    )
+    modo = score.add_mutually_exclusive_group()
+    modo.add_argument(
+        "--resume", "--retomar",
+        dest="retomar",
+        action="store_true",
+        help="pula currículos já concluídos no arquivo de saída",
+    )
+    modo.add_argument("--overwrite", "--sobrescrever", dest="sobrescrever", action="store_true")
+    score.add_argument("--verbose", "-v", action="store_true")
+    return parser
+
+
+def executar_cli(argv: Optional[Sequence[str]] = None) -> int:
+    args = construir_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
+        stream=sys.stderr,
+    )
+    if args.comando == "score":
+        return _pontuar(args)
+    return 2  # pragma: no cover
+
+
+def _pontuar(args: argparse.Namespace) -> int:
+    if args.concorrencia < 1:
+        print("A concorrência deve ser de pelo menos 1.", file=sys.stderr)
+        return 2
+    try:
+        texto_vaga = args.vaga.read_text(encoding="utf-8")
+    except OSError as exc:
+        print(f"Não foi possível ler a vaga: {exc}", file=sys.stderr)
+        return 2
+    if not texto_vaga.strip():
+        print("A descrição da vaga está vazia.", file=sys.stderr)
+        return 2
+    if args.saida.exists() and args.saida.stat().st_size and not (args.retomar or args.sobrescrever):
+        print(f"{args.saida} já existe; use --resume para continuar ou --overwrite.", file=sys.stderr)
+        return 2
+
+    from dotenv import load_dotenv
+
+    from src.core.agente import AgenteAnalisador
+    from src.core.cascata import descrever_cascata, resumir_cascata
+    from src.core.lote import AnalisadorLote
+
+    load_dotenv()
+    try:
+        agente = AgenteAnalisador(api_key=os.getenv("GEMINI_API_KEY", ""))
+    except ValueError as exc:
+        print(f"{exc} Defina GEMINI_API_KEY.", file=sys.stderr)
+        return 2
+
+    concluidos = carregar_checkpoint(args.saida) if args.retomar else set()
+    contagem = {"concluido": 0, "pulado": 0, "erro": 0}
+
+    def documentos() -> Iterator[Any]:
+        for documento in iterar_documentos(args.entradas, sys.stdin):
+            digest = hashlib.sha256(documento.conteudo).hexdigest()
+            if (documento.nome, digest) in concluidos:
+                contagem["pulado"] += 1
+                continue
+            # Nomes podem se repetir (mesmo basename em pastas diferentes): o digest viaja com o documento.
+            documento.referencia = digest
+            yield documento
+
+    cascatas: List[Dict[str, Any]] = []
+    inicio = time.perf_counter()
+    with args.saida.open("w" if args.sobrescrever or not args.retomar else "a", encoding="utf-8") as saida:
+        analisador = AnalisadorLote(agente, max_concorrencia=args.concorrencia)
+        for item in analisador.analisar_continuo(documentos(), texto_vaga):
+            registro = {
+                "arquivo": item.nome_arquivo,
+                "sha256": item.referencia,
+                "status": item.status,
+                "pontuacao": item.pontuacao if item.status == "concluido" else None,
+                "resultado": item.resultado,
+                "erro": item.erro,
+                "duplicata_de": item.duplicata_de,
+                "duracao_s": round(item.duracao, 3),
+            }
+            _gravar_linha(saida, registro)
+            contagem["concluido" if item.status == "concluido" else "erro"] += 1
+            if "cascata" in item.resultado and item.duplicata_de is None:
+                cascatas.append({"cascata": item.resultado["cascata"]})
+    decorrido = time.perf_counter() - inicio
+    processados = contagem["concluido"] + contagem["erro"]
+    print(
+        f"{contagem['concluido']} concluídos, {contagem['erro']} com erro, {contagem['pulado']} já no checkpoint "
+        f"em {decorrido:.1f}s ({processados / decorrido * 60 if decorrido else 0:.1f} CVs/min).",
+        file=sys.stderr,
+    )
+    if cascatas:
+        print(descrever_cascata(resumir_cascata(cascatas)), file=sys.stderr)
+    return 0
+
+
+def _gravar_linha(saida: IO[str], registro: Dict[str, Any]) -> None:
+    """Cada linha vai inteira para o disco antes da próxima, servindo de checkpoint."""
+    saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    saida.flush()
+
+
+def carregar_checkpoint(caminho: Path) -> Set[Tuple[str, str]]:
+    """Pares (arquivo, sha256) já concluídos.
+
+    Só a última linha pode ter sido cortada por uma queda: sem quebra de linha
+    no fim, ela é removida do arquivo. Linhas corrompidas no meio são apenas
+    ignoradas, para não perder os resultados gravados depois delas.
+    """
+    if not caminho.exists():
+        return set()
+    concluidos: Set[Tuple[str, str]] = set()
+    posicao = 0
+    incompleta: Optional[int] = None
+    with caminho.open("rb") as arquivo:
+        for numero, linha in enumerate(arquivo, start=1):
+            if not linha.endswith(b"\n"):
+                incompleta = posicao
+                break
+            posicao += len(linha)
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                registro = None
+            if not isinstance(registro, dict):
+                if linha.strip():
+                    LOGGER.warning("Ignorando linha %d corrompida em %s.", numero, caminho)
+                continue
+            if registro.get("status") == "concluido" and registro.get("sha256") and registro.get("arquivo"):
+                concluidos.add((str(registro["arquivo"]), str(registro["sha256"])))
+    if incompleta is not None:
+        LOGGER.warning("Descartando linha incompleta no fim de %s.", caminho)
+        with caminho.open("r+b") as arquivo:
+            arquivo.truncate(incompleta)
+    return concluidos
+
+
+def iterar_documentos(entradas: Iterable[str], entrada_padrao: IO[str]) -> Iterator[Any]:
+    """Percorre diretórios e arquivos sob demanda; '-' lê caminhos ou JSON da entrada padrão.
+
+    Cada linha da entrada padrão é um caminho de arquivo ou um objeto JSON
+    `{"nome": ..., "texto": ...}` com o texto já extraído. Linhas ou arquivos
+    ilegíveis viram documentos com `erro`, registrados como `erro_leitura`
+    sem interromper o lote.
+    """
+    from src.core.lote import DocumentoLote, expandir_arquivos
+
+    for entrada in entradas:
+        if entrada == "-":
+            for numero, linha in enumerate(entrada_padrao, start=1):
+                linha = linha.strip()
+                if not linha:
+                    continue
+                if linha.startswith(("{", "[")):
+                    try:
+                        registro = json.loads(linha)
+                    except json.JSONDecodeError as exc:
+                        registro, motivo = None, str(exc)
+                    else:
+                        motivo = "o valor não é um objeto"
+                    if not isinstance(registro, dict):
+                        yield DocumentoLote(
+                            f"stdin-{numero}.txt",
+                            b"",
+                            erro=f"Linha {numero} da entrada padrão não é um objeto JSON válido: {motivo}.",
+                        )
+                        continue
+                    nome = str(registro.get("nome") or f"stdin-{numero}.txt")
+                    if not nome.lower().endswith(".txt"):
+                        nome += ".txt"
+                    yield DocumentoLote(nome, str(registro.get("texto", "")).encode("utf-8"))
+                else:
+                    yield from _documentos_do_caminho(Path(linha), Path(linha).name, expandir_arquivos)
+            continue
+        caminho = Path(entrada)
+        if caminho.is_dir():
+            for arquivo in _listar(caminho):
+                yield from _documentos_do_caminho(arquivo, arquivo.relative_to(caminho).as_posix(), expandir_arquivos)
+        else:
+            yield from _documentos_do_caminho(caminho, caminho.name, expandir_arquivos)
+
+
+def _listar(diretorio: Path) -> Iterator[Path]:
+    """Arquivos suportados em ordem estável, descendo em subdiretórios."""
+    with os.scandir(diretorio) as itens:
+        entradas = sorted(itens, key=lambda item: item.name)
+    for item in entradas:
+        if item.is_dir(follow_symlinks=False):
+            yield from _listar(Path(item.path))
+        elif item.name.lower().endswith(EXTENSOES):
+            yield Path(item.path)
+
+
+def _documentos_do_caminho(caminho: Path, nome: str, expandir_arquivos: Any) -> List[Any]:
+    if not caminho.name.lower().endswith(EXTENSOES):
+        LOGGER.warning("Ignorando '%s': formato não suportado.", caminho)
+        return []
+    try:
+        with caminho.open("rb") as arquivo:
+            documentos = expandir_arquivos([_ArquivoNomeado(nome, arquivo)])
+    except OSError as exc:
+        from src.core.lote import DocumentoLote
+
+        LOGGER.warning("Não foi possível abrir '%s': %s", caminho, exc)
+        return [DocumentoLote(nome, b"", erro=f"Não foi possível abrir o arquivo: {exc.strerror or exc}.")]
+    if caminho.name.lower().endswith(".zip"):
+        for documento in documentos:
+            documento.nome = f"{nome}/{documento.nome}"
+    return documentos
+
+
+class _ArquivoNomeado:
+    """Adapta um arquivo aberto à interface de upload esperada por `expandir_arquivos`."""
+
+    def __init__(self, nome: str, arquivo: IO[bytes]) -> None:
+        self.name = nome
+        self.size = os.fstat(arquivo.fileno()).st_size
+        self._arquivo = arquivo
+
+    def read(self) -> bytes:
+        return self._arquivo.read()
@@ -0,0 +1,344 @@
+"""Acervo local de currículos analisados, com índice invertido de termos pseudonimizados."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.arquivo import ArquivoHandler
+from src.core.prefiltro import extrair_termos_vaga
+
+
+@dataclass
+class RegistroAcervo:
+    """Currículo do acervo e, quando a busca filtra por vaga ou nota, o resultado correspondente."""
+
+    id_curriculo: str
+    apelido: str
+    nome: Optional[str] = None
+    vaga: Optional[str] = None
+    pontuacao: Optional[int] = None
+    resultado: Dict[str, Any] = field(default_factory=dict)
+    analisado_em: Optional[float] = None
+
+    def como_linha(self) -> Dict[str, Any]:
+        return {
+            "Currículo": self.nome or self.apelido,
+            "Vaga": self.vaga,
+            "Compatibilidade": self.pontuacao,
+            "Analisado em": time.strftime("%d/%m/%Y %H:%M", time.localtime(self.analisado_em))
+            if self.analisado_em
+            else None,
+        }
+
+
+class AcervoAnalises:
+    """Currículos normalizados e resultados anteriores em SQLite, consultáveis sem o modelo.
+
+    Em conformidade com a RN005, nada identificável é gravado em claro: o
+    currículo é identificado por um HMAC do texto, os termos do índice
+    invertido também são HMACs (a busca aplica a mesma função aos termos
+    pedidos) e nome, texto e análise do modelo só são guardados cifrados,
+    quando o pacote `cryptography` está disponível; sem ele, fica só a nota. Currículos mais antigos que a retenção são
+    expurgados com seus termos e resultados, na abertura e depois no máximo a
+    cada `INTERVALO_EXPURGO` segundos, durante gravações e buscas; entre um
+    expurgo e outro, a busca já ignora os vencidos.
+    """
+
+    INTERVALO_EXPURGO = 3600.0
+
+    def __init__(self, caminho: str, chave: str, retencao_dias: float = 30.0, cifrar: Optional[bool] = None) -> None:
+        if not chave:
+            raise ValueError("Chave do acervo ausente.")
+        self._chave = hashlib.sha256(b"select-ai:acervo:" + chave.encode("utf-8")).digest()
+        self._retencao = retencao_dias * 86400
+        self._cifra = self._criar_cifra() if cifrar is not False else None
+        if cifrar and self._cifra is None:
+            raise RuntimeError("Cifragem do acervo requer o pacote 'cryptography'.")
+        self._trava = threading.Lock()
+        self._ultimo_expurgo = 0.0
+        self._logger = logging.getLogger(self.__class__.__name__)
+        if caminho != ":memory:":
+            Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._remover_resultados_em_claro()
+        self._conexao.executescript(
+            "PRAGMA foreign_keys = ON;"
+            "PRAGMA journal_mode = WAL;"
+            "CREATE TABLE IF NOT EXISTS curriculos ("
+            " id TEXT PRIMARY KEY,"
+            " nome_cifrado BLOB,"
+            " texto_cifrado BLOB,"
+            " criado_em REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS vagas ("
+            " id TEXT PRIMARY KEY,"
+            " titulo TEXT NOT NULL,"
+            " criado_em REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS resultados ("
+            " id_curriculo TEXT NOT NULL REFERENCES curriculos (id) ON DELETE CASCADE,"
+            " id_vaga TEXT NOT NULL REFERENCES vagas (id) ON DELETE CASCADE,"
+            " pontuacao INTEGER NOT NULL,"
+            " resultado_cifrado BLOB,"
+            " criado_em REAL NOT NULL,"
+            " PRIMARY KEY (id_curriculo, id_vaga));"
+            "CREATE INDEX IF NOT EXISTS idx_resultados_vaga ON resultados (id_vaga, pontuacao);"
+            "CREATE TABLE IF NOT EXISTS termos ("
+            " termo TEXT NOT NULL,"
+            " id_curriculo TEXT NOT NULL REFERENCES curriculos (id) ON DELETE CASCADE,"
+            " PRIMARY KEY (termo, id_curriculo)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_termos_curriculo ON termos (id_curriculo);"
+        )
+        self.expurgar()
+
+    @property
+    def cifrado(self) -> bool:
+        return self._cifra is not None
+
+    def registrar(
+        self,
+        texto_curriculo: str,
+        texto_vaga: str,
+        resultado: Dict[str, Any],
+        nome: Optional[str] = None,
+        titulo_vaga: Optional[str] = None,
+    ) -> Optional[str]:
+        """Grava currículo, termos e resultado; devolve o apelido ou None se a gravação falhar.
+
+        Falhas de disco não interrompem a análise: são apenas registradas no log.
+        """
+        self._expurgar_periodicamente()
+        curriculo = ArquivoHandler.limpar_texto(texto_curriculo)
+        vaga = ArquivoHandler.limpar_texto(texto_vaga)
+        id_curriculo = self._pseudonimo("cv", curriculo)
+        id_vaga = hashlib.sha256(vaga.encode("utf-8")).hexdigest()
+        termos = [(self._pseudonimo("termo", termo), id_curriculo) for termo in extrair_termos_vaga(curriculo)]
+        agora = time.time()
+        try:
+            pontuacao = int(resultado.get("pontuacao_compatibilidade", 0) or 0)
+        except (TypeError, ValueError):
+            pontuacao = 0
+        try:
+            with self._trava, self._conexao:
+                self._conexao.execute(
+                    "INSERT INTO curriculos (id, nome_cifrado, texto_cifrado, criado_em) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (id) DO UPDATE SET"
+                    " nome_cifrado = COALESCE(excluded.nome_cifrado, nome_cifrado), criado_em = excluded.criado_em",
+                    (id_curriculo, self._cifrar(nome), self._cifrar(curriculo), agora),
+                )
+                self._conexao.execute(
+                    "INSERT OR IGNORE INTO vagas (id, titulo, criado_em) VALUES (?, ?, ?)",
+                    (id_vaga, titulo_vaga or self._titulo(texto_vaga), agora),
+                )
+                self._conexao.executemany("INSERT OR IGNORE INTO termos (termo, id_curriculo) VALUES (?, ?)", termos)
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO resultados"
+                    " (id_curriculo, id_vaga, pontuacao, resultado_cifrado, criado_em)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        id_curriculo,
+                        id_vaga,
+                        pontuacao,
+                        self._cifrar(json.dumps(resultado, ensure_ascii=False)),
+                        agora,
+                    ),
+                )
+        except sqlite3.Error as exc:
+            self._logger.warning("Falha ao gravar no acervo: %s", exc)
+            return None
+        return self._apelido(id_curriculo)
+
+    def buscar(
+        self,
+        termos: Sequence[str] = (),
+        vaga: Optional[str] = None,
+        pontuacao_minima: Optional[int] = None,
+        limite: int = 200,
+    ) -> List[RegistroAcervo]:
+        """Currículos com todos os `termos`; com `vaga` ou `pontuacao_minima`, só os já avaliados.
+
+        `vaga` aceita o título gravado (sem diferenciar maiúsculas) ou o identificador.
+        A nota mínima é exclusiva, como em "acima de 70". Os termos passam pelo
+        mesmo filtro da indexação; números, stopwords e termos de uma letra
+        (o "8" de "Java 8") não estão no índice e são ignorados; se nenhum termo
+        pedido sobrar, nada é encontrado.
+        """
+        self._expurgar_periodicamente()
+        pseudonimos = sorted({self._pseudonimo("termo", termo) for termo in self._normalizar_termos(termos)})
+        if termos and not pseudonimos:
+            # Nenhum termo pedido está no índice: sem filtro, a busca devolveria o acervo inteiro.
+            return []
+        condicoes: List[str] = ["c.criado_em >= ?"]
+        parametros: List[Any] = [time.time() - self._retencao]
+        if pseudonimos:
+            marcadores = ", ".join("?" * len(pseudonimos))
+            condicoes.append(
+                f"c.id IN (SELECT id_curriculo FROM termos WHERE termo IN ({marcadores})"
+                " GROUP BY id_curriculo HAVING COUNT(*) = ?)"
+            )
+            parametros.extend(pseudonimos)
+            parametros.append(len(pseudonimos))
+        com_resultado = vaga is not None or pontuacao_minima is not None
+        if vaga is not None:
+            condicoes.append("(v.id = ? OR v.titulo = ? COLLATE NOCASE)")
+            parametros.extend((vaga, vaga))
+        if pontuacao_minima is not None:
+            condicoes.append("r.pontuacao > ?")
+            parametros.append(pontuacao_minima)
+        juncao = "JOIN" if com_resultado else "LEFT JOIN"
+        consulta = (
+            "SELECT c.id, c.nome_cifrado, v.titulo, r.pontuacao, r.resultado_cifrado, r.criado_em"
+            f" FROM curriculos c {juncao} resultados r ON r.id_curriculo = c.id"
+            f" {juncao} vagas v ON v.id = r.id_vaga"
+            + " WHERE " + " AND ".join(condicoes)
+            + " ORDER BY r.pontuacao IS NULL, r.pontuacao DESC, c.criado_em DESC LIMIT ?"
+        )
+        parametros.append(limite)
+        with self._trava:
+            linhas = self._conexao.execute(consulta, parametros).fetchall()
+        return [
+            RegistroAcervo(
+                id_curriculo=id_curriculo,
+                apelido=self._apelido(id_curriculo),
+                nome=self._decifrar(nome_cifrado),
+                vaga=titulo,
+                pontuacao=pontuacao,
+                resultado=self._ler_resultado(resultado_cifrado),
+                analisado_em=analisado_em,
+            )
+            for id_curriculo, nome_cifrado, titulo, pontuacao, resultado_cifrado, analisado_em in linhas
+        ]
+
+    def texto_curriculo(self, id_curriculo: str) -> Optional[str]:
+        """Texto normalizado guardado (só existe com cifragem), para reanalisar sem novo upload."""
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT texto_cifrado FROM curriculos WHERE id = ?", (id_curriculo,)
+            ).fetchone()
+        return self._decifrar(linha[0]) if linha else None
+
+    def vagas(self) -> List[str]:
+        with self._trava:
+            linhas = self._conexao.execute("SELECT DISTINCT titulo FROM vagas ORDER BY titulo").fetchall()
+        return [titulo for (titulo,) in linhas]
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._trava:
+            return {
+                tabela: self._conexao.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                for tabela in ("curriculos", "vagas", "resultados", "termos")
+            }
+
+    def expurgar(self, agora: Optional[float] = None) -> int:
+        """Remove currículos fora da retenção (termos e resultados vão junto) e vagas sem resultados."""
+        agora = agora or time.time()
+        limite = agora - self._retencao
+        with self._trava, self._conexao:
+            self._ultimo_expurgo = agora
+            removidos = self._conexao.execute("DELETE FROM curriculos WHERE criado_em < ?", (limite,)).rowcount
+            self._conexao.execute("DELETE FROM vagas WHERE id NOT IN (SELECT id_vaga FROM resultados)")
+        if removidos:
+            self._logger.info("Acervo: %d currículos expurgados pela retenção.", removidos)
+        return removidos
+
+    def limpar(self) -> None:
+        with self._trava, self._conexao:
+            self._conexao.execute("DELETE FROM curriculos")
+            self._conexao.execute("DELETE FROM vagas")
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._conexao.close()
+
+    def _expurgar_periodicamente(self) -> None:
+        if time.time() - self._ultimo_expurgo >= self.INTERVALO_EXPURGO:
+            try:
+                self.expurgar()
+            except sqlite3.Error as exc:
+                self._logger.warning("Falha ao expurgar o acervo: %s", exc)
+
+    @staticmethod
+    def _normalizar_termos(termos: Sequence[str]) -> List[str]:
+        return [token for termo in termos for token in extrair_termos_vaga(termo)]
+
+    def _pseudonimo(self, tipo: str, valor: str) -> str:
+        return hmac.new(self._chave, f"{tipo}:{valor}".encode("utf-8"), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _apelido(id_curriculo: str) -> str:
+        return f"cv-{id_curriculo[:10]}"
+
+    @staticmethod
+    def _titulo(texto_vaga: str) -> str:
+        primeira = next((linha.strip() for linha in texto_vaga.splitlines() if linha.strip()), "Vaga")
+        return primeira if len(primeira) <= 60 else primeira[:60].rsplit(" ", 1)[0] + "…"
+
+    def _ler_resultado(self, dado: Optional[bytes]) -> Dict[str, Any]:
+        texto = self._decifrar(dado)
+        return json.loads(texto) if texto else {}
+
+    def _remover_resultados_em_claro(self) -> None:
+        """Acervos anteriores guardavam a análise do modelo em claro: a tabela é recriada sem ela."""
+        colunas = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(resultados)")}
+        if "resultado" in colunas:
+            with self._conexao:
+                self._conexao.execute("DROP TABLE resultados")
+            self._logger.warning("Acervo: resultados gravados em claro foram descartados (RN005).")
+
+    def _criar_cifra(self) -> Any:
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            return None
+        return Fernet(base64.urlsafe_b64encode(hmac.new(self._chave, b"cifra", hashlib.sha256).digest()))
+
+    def _cifrar(self, texto: Optional[str]) -> Optional[bytes]:
+        if texto is None or self._cifra is None:
+            return None
+        return self._cifra.encrypt(texto.encode("utf-8"))
+
+    def _decifrar(self, dado: Optional[bytes]) -> Optional[str]:
+        if dado is None or self._cifra is None:
+            return None
+        try:
+            return self._cifra.decrypt(dado).decode("utf-8")
+        except Exception:
+            # Dado gravado com outra chave: tratado como ausente.
+            return None
+
+
+_ACERVO_GLOBAL: Optional[AcervoAnalises] = None
+_TRAVA_GLOBAL = threading.Lock()
+
+
+def obter_acervo() -> Optional[AcervoAnalises]:
+    """Acervo do processo, ativo com SELECT_AI_ACERVO=1 e SELECT_AI_ACERVO_CHAVE definida."""
+    global _ACERVO_GLOBAL
+    if os.getenv("SELECT_AI_ACERVO", "0") != "1":
+        return None
+    with _TRAVA_GLOBAL:
+        if _ACERVO_GLOBAL is None:
+            chave = os.getenv("SELECT_AI_ACERVO_CHAVE", "")
+            if not chave:
+                logging.getLogger(AcervoAnalises.__name__).warning(
+                    "SELECT_AI_ACERVO=1 sem SELECT_AI_ACERVO_CHAVE; acervo desativado."
+                )
+                return None
+            _ACERVO_GLOBAL = AcervoAnalises(
+                caminho=os.getenv(
+                    "SELECT_AI_ACERVO_CAMINHO",
+                    str(Path.home() / ".cache" / "select_ai" / "acervo.sqlite3"),
+                ),
+                chave=chave,
+                retencao_dias=float(os.getenv("SELECT_AI_ACERVO_RETENCAO_DIAS", "30")),
+            )
+        return _ACERVO_GLOBAL
@@ -2,44 +2,413 @@
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import contextvars
+import datetime
+import hashlib
 import json
 import logging
 import os
-from typing import Any, Dict, Optional
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import google.generativeai as genai
+from src.core.backend import BackendModelo, obter_backend
+from src.core.cache import CacheResultados, obter_cache
+from src.core.limitador import LimitadorTaxa, obter_limitador
+from src.core.orcamento import OrcamentoPrompt, estimar_tokens, recortar_curriculo
+from src.core.resposta import CAMPOS_LISTA, ESQUEMA_RESPOSTA, ParserJsonParcial, reparar_json
+from src.core.sessao_vaga import SessaoVaga
+from src.core.telemetria import Telemetria, obter_telemetria
+
+
+CODIGOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+_uso_atual: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("select_ai_uso", default=None)
 
 
 class AgenteAnalisador:
     """Orquestra chamadas ao modelo Gemini para comparar perfil e vaga."""
 
-    def __init__(self, api_key: str, model: Optional[str] = None) -> None:
-        if not api_key:
-            raise ValueError("Chave da API Gemini ausente.")
-        genai.configure(api_key=api_key)
+    def __init__(
+        self,
+        api_key: str,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_tentativas: Optional[int] = None,
+        limitador: Optional[LimitadorTaxa] = None,
+        cache: Optional[CacheResultados] = None,
+        usar_cache: bool = True,
+        limite_tokens_curriculo: Optional[int] = None,
+        saida_estruturada: Optional[bool] = None,
+        backend: Optional[BackendModelo] = None,
+        telemetria: Optional[Telemetria] = None,
+    ) -> None:
+        self._backend = backend or obter_backend(api_key)
         modelo_escolhido = model or os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
-        self._model = genai.GenerativeModel(modelo_escolhido)
+        self._model = self._backend.criar_modelo(modelo_escolhido)
+        self._nome_modelo = modelo_escolhido
+        self._timeout = timeout or float(os.getenv("GEMINI_TIMEOUT", "30"))
+        self._max_tentativas = max_tentativas or int(os.getenv("GEMINI_MAX_TENTATIVAS", "4"))
+        self._limitador = limitador or obter_limitador()
+        self._cache = (cache or obter_cache()) if usar_cache else None
+        self._telemetria = telemetria or obter_telemetria()
+        self._limite_tokens_curriculo = (
+            int(os.getenv("SELECT_AI_LIMITE_TOKENS_CURRICULO", "6000"))
+            if limite_tokens_curriculo is None
+            else limite_tokens_curriculo
+        )
+        if saida_estruturada is None:
+            saida_estruturada = os.getenv("GEMINI_SAIDA_ESTRUTURADA", "1").strip().lower() not in ("0", "false", "nao")
+        self._configuracao_geracao: Optional[Dict[str, Any]] = (
+            {"response_mime_type": "application/json", "response_schema": ESQUEMA_RESPOSTA}
+            if saida_estruturada
+            else None
+        )
+        self._trava_estatisticas = threading.Lock()
+        self._estatisticas_json = {"direto": 0, "reparado": 0, "retentativa": 0, "falha": 0}
+        self._estatisticas_prompt = {
+            "prompts": 0,
+            "prompts_recortados": 0,
+            "tokens_curriculo_original": 0,
+            "tokens_curriculo_enviado": 0,
+            "tokens_prompt": 0,
+        }
+        modelo_prompt = self._montar_prompt("", "")[0] + str(self._limite_tokens_curriculo) + str(saida_estruturada)
+        self._versao_prompt = hashlib.sha256(modelo_prompt.encode("utf-8")).hexdigest()[:12]
         self._logger = logging.getLogger(self.__class__.__name__)
         self._logger.debug("Modelo Gemini configurado: %s", modelo_escolhido)
 
     def analisar(self, texto_curriculo: str, texto_vaga: str) -> Dict[str, Any]:
         """Retorna avaliação estruturada em JSON padrão."""
-        prompt = self._construir_prompt(texto_curriculo, texto_vaga)
-        self._logger.info(
-            "Enviando comparação para Gemini (currículo: %d caracteres, vaga: %d).",
-            len(texto_curriculo),
-            len(texto_vaga),
-        )
+        with self._telemetria.span("analise", modo="sincrono"):
+            chave = self._chave_cache(texto_curriculo, texto_vaga)
+            em_cache = self._consultar_cache(chave)
+            if em_cache is not None:
+                return em_cache
+            prompt = self._construir_prompt(texto_curriculo, texto_vaga)
+            self._logger.info(
+                "Enviando comparação para Gemini (currículo: %d caracteres, vaga: %d).",
+                len(texto_curriculo),
+                len(texto_vaga),
+            )
+            conteudo = self._gerar(prompt)
+            self._logger.info("Resposta recebida do Gemini com %d caracteres.", len(conteudo))
+            return self._concluir(chave, conteudo)
+
+    async def analisar_async(self, texto_curriculo: str, texto_vaga: str) -> Dict[str, Any]:
+        """Versão assíncrona de `analisar`, com prazo por chamada e novas tentativas.
+
+        O prazo (`timeout`) vale para cada tentativa, não para a chamada inteira:
+        com novas tentativas e backoff, o total pode chegar a cerca de
+        `max_tentativas` vezes o prazo mais as esperas. O cache de resultados
+        (SQLite) é consultado e gravado numa thread, fora do event loop.
+        """
+        with self._telemetria.span("analise", modo="assincrono"):
+            chave = self._chave_cache(texto_curriculo, texto_vaga)
+            em_cache = await asyncio.to_thread(self._consultar_cache, chave)
+            if em_cache is not None:
+                return em_cache
+            prompt = self._construir_prompt(texto_curriculo, texto_vaga)
+            self._logger.info(
+                "Enviando comparação assíncrona para Gemini (currículo: %d caracteres, vaga: %d).",
+                len(texto_curriculo),
+                len(texto_vaga),
+            )
+            conteudo = await self._gerar_async(prompt)
+            self._logger.info("Resposta recebida do Gemini com %d caracteres.", len(conteudo))
+            return await self._concluir_async(chave, conteudo)
+
+    def analisar_stream(self, texto_curriculo: str, texto_vaga: str) -> Iterator[Dict[str, Any]]:
+        """Consome a resposta em streaming e entrega os campos conforme se completam.
+
+        Cada item é o conjunto parcial de campos já concluídos; o último item é
+        sempre o resultado validado, igual ao de `analisar`.
+        """
+        with self._telemetria.span("analise", modo="streaming") as span:
+            chave = self._chave_cache(texto_curriculo, texto_vaga)
+            em_cache = self._consultar_cache(chave)
+            if em_cache is not None:
+                yield em_cache
+                return
+            prompt = self._construir_prompt(texto_curriculo, texto_vaga)
+            self._logger.info(
+                "Enviando comparação em streaming para Gemini (currículo: %d caracteres, vaga: %d).",
+                len(texto_curriculo),
+                len(texto_vaga),
+            )
+            parser = ParserJsonParcial()
+            inicio = time.perf_counter()
+            primeiro_campo = None
+            for trecho in self._gerar_stream(prompt):
+                if parser.alimentar(trecho):
+                    if primeiro_campo is None:
+                        primeiro_campo = time.perf_counter() - inicio
+                        self._registrar_etapa(span, "analise.primeiro_campo", primeiro_campo)
+                        self._logger.info("Primeiro campo recebido do Gemini em %.2fs.", primeiro_campo)
+                    yield parser.campos
+            conteudo = parser.texto
+            self._logger.info(
+                "Streaming concluído em %.2fs com %d caracteres.", time.perf_counter() - inicio, len(conteudo)
+            )
+            yield self._concluir(chave, conteudo)
+
+    def abrir_sessao(self, texto_vaga: str, usar_cache_contexto: Optional[bool] = None) -> SessaoVaga:
+        """Prepara a vaga uma vez para analisar vários currículos enviando só o currículo."""
+        return SessaoVaga(self, texto_vaga, usar_cache_contexto)
+
+    @contextlib.contextmanager
+    def medir_uso(self) -> Iterator[Dict[str, int]]:
+        """Soma os tokens das chamadas ao modelo feitas dentro do bloco, no mesmo contexto.
+
+        Os números vêm de `usage_metadata` (estimados só se a resposta não os
+        trouxer); `cache` são os tokens de entrada servidos pelo cache de
+        contexto. `chamadas` fica em zero quando a análise veio do cache de
+        resultados.
+        """
+        uso = {"chamadas": 0, "entrada": 0, "saida": 0, "cache": 0}
+        token = _uso_atual.set(uso)
+        try:
+            yield uso
+        finally:
+            _uso_atual.reset(token)
+
+    def _concluir(self, chave: Optional[str], conteudo: str) -> Dict[str, Any]:
+        """Interpreta a resposta, pede correção só se necessário e grava no cache."""
+        dados = self._interpretar_resposta(conteudo)
+        if dados is None:
+            correcao = self._gerar(self._construir_prompt_correcao(conteudo)) if conteudo.strip() else ""
+            dados = self._interpretar_correcao(correcao)
+        return self._registrar_resultado(chave, dados)
+
+    async def _concluir_async(self, chave: Optional[str], conteudo: str) -> Dict[str, Any]:
+        dados = self._interpretar_resposta(conteudo)
+        if dados is None:
+            correcao = await self._gerar_async(self._construir_prompt_correcao(conteudo)) if conteudo.strip() else ""
+            dados = self._interpretar_correcao(correcao)
+        if chave is None:
+            return self._registrar_resultado(chave, dados)
+        return await asyncio.to_thread(self._registrar_resultado, chave, dados)
+
+    def _gerar_stream(self, prompt: str, modelo: Any = None) -> Iterator[str]:
+        """Repete a chamada apenas enquanto nenhum pedaço da resposta chegou."""
+        modelo = modelo or self._model
+        for tentativa in range(1, self._max_tentativas + 1):
+            self._aguardar_fila(prompt)
+            recebeu = False
+            try:
+                with self._telemetria.span("modelo", tentativa=tentativa, streaming=True) as span:
+                    inicio = time.perf_counter()
+                    resposta = modelo.generate_content(
+                        prompt,
+                        generation_config=self._configuracao_geracao,
+                        request_options={"timeout": self._timeout},
+                        stream=True,
+                    )
+                    ultimo = None
+                    partes = []
+                    geracao = 0.0
+                    for pedaco in resposta:
+                        # Só conta a espera pelo próximo pedaço, não o tempo de quem consome.
+                        decorrido = time.perf_counter() - inicio
+                        ultimo = pedaco
+                        texto = self._texto_do_pedaco(pedaco)
+                        if texto:
+                            if not recebeu:
+                                # Até o primeiro pedaço: rede e fila do servidor; depois, geração.
+                                self._registrar_etapa(span, "modelo.primeiro_pedaco", decorrido)
+                            else:
+                                geracao += decorrido
+                            recebeu = True
+                            partes.append(texto)
+                            yield texto
+                        inicio = time.perf_counter()
+                    self._registrar_etapa(span, "modelo.geracao", geracao + time.perf_counter() - inicio)
+                    self._telemetria.registrar_uso(ultimo, span)
+                    self._acumular_uso(ultimo, prompt, "".join(partes))
+                return
+            except Exception as exc:
+                if recebeu or not self._deve_repetir(exc, tentativa):
+                    self._logger.exception("Erro no streaming do modelo Gemini: %s", exc)
+                    raise
+                time.sleep(self._calcular_espera(tentativa))
+
+    @staticmethod
+    def _texto_do_pedaco(pedaco: Any) -> str:
         try:
-            resposta = self._model.generate_content(prompt)
-        except Exception as exc:  # pragma: no cover
-            self._logger.exception("Erro na chamada ao modelo Gemini: %s", exc)
-            raise
-        conteudo = resposta.text or ""
-        self._logger.info("Resposta recebida do Gemini com %d caracteres.", len(conteudo))
-        return self._validar_json(conteudo)
+            return pedaco.text or ""
+        except ValueError:
+            # Pedaços finais sem partes de texto (ex.: apenas finish_reason).
+            return ""
+
+    def _gerar(self, prompt: str, modelo: Any = None, configuracao: Optional[Dict[str, Any]] = None) -> str:
+        modelo = modelo or self._model
+        for tentativa in range(1, self._max_tentativas + 1):
+            self._aguardar_fila(prompt)
+            try:
+                with self._telemetria.span("modelo", tentativa=tentativa) as span:
+                    resposta = modelo.generate_content(
+                        prompt,
+                        generation_config=configuracao or self._configuracao_geracao,
+                        request_options={"timeout": self._timeout},
+                    )
+                    self._telemetria.registrar_uso(resposta, span)
+                texto = resposta.text or ""
+                self._acumular_uso(resposta, prompt, texto)
+                return texto
+            except Exception as exc:
+                if not self._deve_repetir(exc, tentativa):
+                    self._logger.exception("Erro na chamada ao modelo Gemini: %s", exc)
+                    raise
+                time.sleep(self._calcular_espera(tentativa))
+        raise RuntimeError("Número de tentativas esgotado.")  # pragma: no cover
+
+    async def _gerar_async(self, prompt: str, modelo: Any = None) -> str:
+        modelo = modelo or self._model
+        for tentativa in range(1, self._max_tentativas + 1):
+            espera = await self._limitador.aguardar_async(estimar_tokens(prompt))
+            self._telemetria.observar("modelo.fila", espera)
+            try:
+                with self._telemetria.span("modelo", tentativa=tentativa) as span:
+                    resposta = await asyncio.wait_for(
+                        modelo.generate_content_async(
+                            prompt,
+                            generation_config=self._configuracao_geracao,
+                            request_options={"timeout": self._timeout},
+                        ),
+                        timeout=self._timeout,
+                    )
+                    self._telemetria.registrar_uso(resposta, span)
+                texto = resposta.text or ""
+                self._acumular_uso(resposta, prompt, texto)
+                return texto
+            except Exception as exc:
+                if not self._deve_repetir(exc, tentativa):
+                    self._logger.exception("Erro na chamada assíncrona ao modelo Gemini: %s", exc)
+                    raise
+                await asyncio.sleep(self._calcular_espera(tentativa))
+        raise RuntimeError("Número de tentativas esgotado.")  # pragma: no cover
+
+    @staticmethod
+    def _acumular_uso(resposta: Any, prompt: str, texto: str) -> None:
+        uso = _uso_atual.get()
+        if uso is None:
+            return
+        metadados = getattr(resposta, "usage_metadata", None)
+        uso["chamadas"] += 1
+        if metadados is not None and getattr(metadados, "prompt_token_count", 0):
+            uso["entrada"] += metadados.prompt_token_count
+            uso["saida"] += getattr(metadados, "candidates_token_count", 0) or 0
+            uso["cache"] += getattr(metadados, "cached_content_token_count", 0) or 0
+        else:
+            uso["entrada"] += estimar_tokens(prompt)
+            uso["saida"] += estimar_tokens(texto)
+
+    def _aguardar_fila(self, prompt: str) -> None:
+        """Espera no limitador de taxa, registrada como a etapa `modelo.fila`."""
+        espera = self._limitador.aguardar(estimar_tokens(prompt))
+        self._telemetria.observar("modelo.fila", espera)
+
+    def _registrar_etapa(self, span: Any, etapa: str, segundos: float) -> None:
+        span.definir(**{etapa.split(".")[-1] + "_s": segundos})
+        self._telemetria.observar(etapa, segundos)
+
+    def estatisticas_prompt(self) -> Dict[str, int]:
+        """Tokens estimados acumulados: currículo original, enviado e prompt final."""
+        with self._trava_estatisticas:
+            return dict(self._estatisticas_prompt)
+
+    def estatisticas_json(self) -> Dict[str, int]:
+        """Quantas respostas foram lidas direto, reparadas localmente, corrigidas pelo modelo ou perdidas."""
+        with self._trava_estatisticas:
+            return dict(self._estatisticas_json)
+
+    def estatisticas_cache(self) -> Dict[str, int]:
+        return self._cache.estatisticas() if self._cache is not None else {}
+
+    def _chave_cache(self, texto_curriculo: str, texto_vaga: str) -> Optional[str]:
+        if self._cache is None:
+            return None
+        return CacheResultados.gerar_chave(texto_curriculo, texto_vaga, self._nome_modelo, self._versao_prompt)
+
+    def _consultar_cache(self, chave: Optional[str]) -> Optional[Dict[str, Any]]:
+        if chave is None or self._cache is None:
+            return None
+        resultado = self._cache.obter(chave)
+        self._telemetria.contar("cache_resultados", resultado="acerto" if resultado is not None else "falha")
+        if resultado is not None:
+            self._logger.info("Resultado recuperado do cache (%s).", chave[:12])
+        return resultado
+
+    def _registrar_resultado(self, chave: Optional[str], dados: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        resultado = self._normalizar_estrutura(dados)
+        # Uma nota preenchida pela estrutura padrão não pode ficar no cache pelo TTL inteiro.
+        if dados is not None and "pontuacao_compatibilidade" in dados and chave is not None and self._cache is not None:
+            self._cache.guardar(chave, resultado)
+        return resultado
+
+    def _deve_repetir(self, erro: Exception, tentativa: int) -> bool:
+        if tentativa >= self._max_tentativas:
+            return False
+        transitorio = isinstance(erro, (asyncio.TimeoutError, TimeoutError, ConnectionError)) or (
+            getattr(erro, "code", None) in CODIGOS_TRANSITORIOS
+        )
+        if transitorio:
+            self._telemetria.contar("retentativas", motivo=type(erro).__name__)
+            self._logger.warning(
+                "Falha transitória no Gemini (tentativa %d/%d): %r",
+                tentativa,
+                self._max_tentativas,
+                erro,
+            )
+        return transitorio
+
+    @staticmethod
+    def _calcular_espera(tentativa: int, base: float = 1.0, teto: float = 20.0) -> float:
+        """Backoff exponencial com jitter completo."""
+        return random.uniform(0, min(teto, base * 2 ** (tentativa - 1)))
 
     def _construir_prompt(self, texto_curriculo: str, texto_vaga: str) -> str:
+        with self._telemetria.span("prompt") as span:
+            prompt, orcamento = self._montar_prompt(texto_curriculo, texto_vaga)
+            span.definir(tokens_estimados=orcamento.tokens_prompt, recortado=orcamento.truncado)
+        if texto_curriculo:
+            self._registrar_orcamento(orcamento)
+        return prompt
+
+    def _montar_prompt(self, texto_curriculo: str, texto_vaga: str) -> Tuple[str, OrcamentoPrompt]:
+        curriculo_enviado = recortar_curriculo(texto_curriculo, texto_vaga, self._limite_tokens_curriculo)
+        prompt = (
+            f"{self._instrucoes_prompt()}\n\n"
+            f"CURRÍCULO:\n{curriculo_enviado}\n\n"
+            f"VAGA:\n{texto_vaga}"
+        )
+        orcamento = OrcamentoPrompt(
+            tokens_curriculo_original=estimar_tokens(texto_curriculo),
+            tokens_curriculo_enviado=estimar_tokens(curriculo_enviado),
+            tokens_prompt=estimar_tokens(prompt),
+        )
+        return prompt, orcamento
+
+    def _construir_prompt_curriculo(self, texto_curriculo: str, texto_vaga: str) -> str:
+        """Parte variável do prompt quando instruções e vaga já estão no prefixo da sessão."""
+        with self._telemetria.span("prompt", sessao=True) as span:
+            curriculo_enviado = recortar_curriculo(texto_curriculo, texto_vaga, self._limite_tokens_curriculo)
+            prompt = f"CURRÍCULO:\n{curriculo_enviado}"
+            span.definir(tokens_estimados=estimar_tokens(prompt))
+        self._registrar_orcamento(
+            OrcamentoPrompt(
+                tokens_curriculo_original=estimar_tokens(texto_curriculo),
+                tokens_curriculo_enviado=estimar_tokens(curriculo_enviado),
+                tokens_prompt=estimar_tokens(prompt),
+            )
+        )
+        return prompt
+
+    @staticmethod
+    def _instrucoes_prompt() -> str:
         instrucoes = (
             "Atue como analista de talentos sênior e assistente imparcial. Compare "
             "currículo e vaga, gerando JSON estrito e sem markdown. A chave "
@@ -51,17 +420,97 @@ class AgenteAnalisador:
             '"pontos_fortes": ["..."], "lacunas": ["..."], "sugestoes": ["..."], '
             '"analise_profissional": ["..."]}'
         )
-        prompt = (
+        return (
             f"{instrucoes}\n"
             f"Formato fixo: {formato}\n"
-            "Preencha somente com texto claro em português brasileiro.\n\n"
-            f"CURRÍCULO:\n{texto_curriculo}\n\n"
-            f"VAGA:\n{texto_vaga}"
+            "Preencha somente com texto claro em português brasileiro."
         )
-        return prompt
+
+    def _criar_modelo_sessao(self, instrucao_sistema: str, usar_cache_contexto: bool) -> Tuple[Any, Any]:
+        """Modelo com o prefixo fixo da vaga: cache de contexto do Gemini ou system_instruction.
+
+        Retorna o modelo e o conteúdo em cache (ou None), que deve ser removido ao final.
+        """
+        if usar_cache_contexto:
+            try:
+                ttl = datetime.timedelta(minutes=int(os.getenv("GEMINI_CACHE_CONTEXTO_MINUTOS", "60")))
+                modelo, conteudo = self._backend.criar_modelo_em_cache(self._nome_modelo, instrucao_sistema, ttl)
+                self._logger.info("Cache de contexto do Gemini criado para a vaga.")
+                return modelo, conteudo
+            except Exception as exc:
+                self._logger.info("Cache de contexto indisponível (%s); usando system_instruction.", exc)
+        return self._backend.criar_modelo(self._nome_modelo, instrucao_sistema), None
+
+    def _registrar_orcamento(self, orcamento: OrcamentoPrompt) -> None:
+        if orcamento.truncado:
+            self._logger.info(
+                "Currículo recortado para o orçamento: %d -> %d tokens estimados (prompt: %d).",
+                orcamento.tokens_curriculo_original,
+                orcamento.tokens_curriculo_enviado,
+                orcamento.tokens_prompt,
+            )
+        with self._trava_estatisticas:
+            self._estatisticas_prompt["prompts"] += 1
+            self._estatisticas_prompt["prompts_recortados"] += int(orcamento.truncado)
+            self._estatisticas_prompt["tokens_curriculo_original"] += orcamento.tokens_curriculo_original
+            self._estatisticas_prompt["tokens_curriculo_enviado"] += orcamento.tokens_curriculo_enviado
+            self._estatisticas_prompt["tokens_prompt"] += orcamento.tokens_prompt
+
+    def _construir_prompt_correcao(self, conteudo: str) -> str:
+        return (
+            "Corrija o conteúdo abaixo para que seja um único objeto JSON válido com as "
+            "chaves resumo_geral, pontuacao_compatibilidade, pontos_fortes, lacunas, "
+            "sugestoes e analise_profissional. Preserve o texto existente e responda "
+            "somente com o JSON, sem markdown.\n\n"
+            f"{conteudo}"
+        )
+
+    def _interpretar_resposta(self, conteudo: str) -> Optional[Dict[str, Any]]:
+        """Lê a resposta direto ou com reparo local; None indica que nada foi recuperado."""
+        with self._telemetria.span("json") as span:
+            dados = self._extrair_json(conteudo)
+            caminho = "direto"
+            if dados is None or "pontuacao_compatibilidade" not in dados:
+                dados = reparar_json(conteudo)
+                caminho = "reparado"
+                if dados is not None and not self._completo(dados):
+                    # Resposta cortada antes de algum campo: o reparo só produziria uma nota zero.
+                    self._logger.info("JSON reparado sem os campos %s; pedindo correção.", self._ausentes(dados))
+                    dados = None
+            span.definir(caminho=caminho if dados is not None else "falha")
+        if dados is None:
+            return None
+        if caminho == "reparado":
+            self._logger.info("JSON da resposta reparado localmente, sem nova chamada ao modelo.")
+        self._contar_caminho_json(caminho)
+        return dados
+
+    def _interpretar_correcao(self, conteudo: str) -> Optional[Dict[str, Any]]:
+        dados = self._extrair_json(conteudo) or reparar_json(conteudo)
+        if dados is not None and "pontuacao_compatibilidade" not in dados:
+            self._logger.warning("Correção do JSON sem pontuacao_compatibilidade; resultado não será guardado.")
+            self._contar_caminho_json("falha")
+            return dados
+        self._contar_caminho_json("retentativa" if dados is not None else "falha")
+        return dados
+
+    @staticmethod
+    def _ausentes(dados: Dict[str, Any]) -> List[str]:
+        return [campo for campo in ESQUEMA_RESPOSTA["required"] if campo not in dados]
+
+    @classmethod
+    def _completo(cls, dados: Dict[str, Any]) -> bool:
+        return not cls._ausentes(dados)
+
+    def _contar_caminho_json(self, caminho: str) -> None:
+        self._telemetria.contar("respostas_json", caminho=caminho)
+        with self._trava_estatisticas:
+            self._estatisticas_json[caminho] += 1
 
     def _validar_json(self, conteudo: str) -> Dict[str, Any]:
-        tentativa = self._extrair_json(conteudo)
+        return self._normalizar_estrutura(self._interpretar_resposta(conteudo))
+
+    def _normalizar_estrutura(self, tentativa: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         estrutura_base = {
             "resumo_geral": "",
             "pontuacao_compatibilidade": 0,
@@ -74,7 +523,7 @@ class AgenteAnalisador:
             self._logger.warning("Resposta fora do padrão JSON. Retornando estrutura vazia.")
             return estrutura_base
         combinado = {**estrutura_base, **tentativa}
-        for chave in ("pontos_fortes", "lacunas", "sugestoes", "analise_profissional"):
+        for chave in CAMPOS_LISTA:
             valor = combinado.get(chave)
             if isinstance(valor, str):
                 combinado[chave] = [valor]
@@ -94,6 +543,6 @@ class AgenteAnalisador:
         try:
             dados = json.loads(texto_json)
         except json.JSONDecodeError as exc:
-            self._logger.error("Falha ao decodificar JSON: %s", exc)
+            self._logger.debug("Falha ao decodificar JSON: %s", exc)
             return None
-        return dados
+        return dados if isinstance(dados, dict) else None
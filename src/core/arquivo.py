@@ -2,54 +2,380 @@
 
 from __future__ import annotations
 
+import codecs
+import functools
+import hashlib
 import io
+import os
 import re
+import threading
+import time
 import unicodedata
-from typing import BinaryIO
+import zlib
+from collections import OrderedDict
+from typing import Any, BinaryIO, Iterator, List, Optional, Tuple
 
-from PyPDF2 import PdfReader
+from src.core.telemetria import obter_telemetria
+
+
+# Controles C0 e DEL viram espaço; o restante da tabela ASCII passa intacto.
+TABELA_CONTROLES = bytes(32 if codigo < 32 or codigo == 127 else codigo for codigo in range(256))
+# Lixo comum na extração de PDFs: controles C0/C1 viram espaço; hífen suave, larguras
+# zero, marcas de direção, seletores de variação, BOM, uso privado, o caractere de
+# substituição e ícones (emojis usados como marcadores de seção) são removidos.
+LIXO_PDF = (
+    r"\x00-\x08\x0e-\x1f\x7f-\x9f\u00ad\u200b-\u200f\u202a-\u202e\u2060-\u206f\ufe00-\ufe0f\ufeff\ufffd"
+    r"\ue000-\uf8ff\U0001f000-\U0001faff\U000f0000-\U0010ffff"
+)
+# Formas de compatibilidade que a extração produz (ligaduras como "ﬁ", largura total,
+# reticências), trocadas pela forma NFKC.
+COMPATIBILIDADE_PDF = r"\u2024-\u2026\ufb00-\ufb4f\uff00-\uffef"
+PADRAO_LIXO = re.compile(f"[{LIXO_PDF}]")
+PADRAO_LIMPEZA = re.compile(f"[{LIXO_PDF}{COMPATIBILIDADE_PDF}]")
+PADRAO_COMBINANTE = re.compile(r"[\u0300-\u036f]")
+ESPACOS_CORTE = (" ", "\n", "\t", "\r")
+TAMANHO_BLOCO = 1 << 16
+MEGABYTE = 1024 * 1024
+
+
+class ArquivoRejeitado(ValueError):
+    """Arquivo recusado antes da leitura completa (tamanho, páginas ou conteúdo comprimido)."""
 
 
 class ArquivoHandler:
     """Cuida da leitura de currículos e descrições de vaga."""
 
+    LIMITE_PAGINAS = int(os.getenv("SELECT_AI_PDF_MAX_PAGINAS", "50"))
+    LIMITE_CARACTERES = int(os.getenv("SELECT_AI_PDF_MAX_CARACTERES", "100000"))
+    # RN001: currículos de até 10 MB; o limite vale antes de o arquivo ser lido por inteiro.
+    LIMITE_BYTES = int(float(os.getenv("SELECT_AI_MAX_ARQUIVO_MB", "10")) * MEGABYTE)
+    # Páginas declaradas na árvore do PDF e bytes descomprimidos das páginas lidas.
+    LIMITE_PAGINAS_DOCUMENTO = int(os.getenv("SELECT_AI_PDF_MAX_PAGINAS_DOCUMENTO", "500"))
+    LIMITE_DESCOMPRIMIDO = int(float(os.getenv("SELECT_AI_PDF_MAX_DESCOMPRIMIDO_MB", "20")) * MEGABYTE)
+    CAPACIDADE_CACHE = int(os.getenv("SELECT_AI_CACHE_TEXTOS", "128"))
+    PRESERVAR_ACENTOS = os.getenv("SELECT_AI_PRESERVAR_ACENTOS", "0") == "1"
+
+    _cache_textos: OrderedDict[Tuple[str, int, int, bool], str] = OrderedDict()
+    _trava_cache = threading.Lock()
+
     @staticmethod
     def ler_texto(arquivo: BinaryIO, nome_arquivo: str) -> str:
+        ArquivoHandler.verificar_tamanho(arquivo)
         nome = nome_arquivo.lower()
         if nome.endswith(".pdf"):
-            return ArquivoHandler._ler_pdf(arquivo)
+            with obter_telemetria().span("leitura", formato="pdf") as span:
+                texto = ArquivoHandler._ler_pdf(arquivo)
+                span.definir(caracteres=len(texto))
+                return texto
         if nome.endswith(".txt"):
-            return ArquivoHandler._ler_txt(arquivo)
+            with obter_telemetria().span("leitura", formato="txt") as span:
+                texto = ArquivoHandler._ler_txt(arquivo)
+                span.definir(caracteres=len(texto))
+                return texto
         raise ValueError("Formato de arquivo não suportado. Use PDF ou TXT.")
 
     @staticmethod
-    def _ler_pdf(arquivo: BinaryIO) -> str:
-        conteudo = arquivo.read()
-        pdf_stream = io.BytesIO(conteudo)
-        reader = PdfReader(pdf_stream)
-        paginas = [pagina.extract_text() or "" for pagina in reader.pages]
-        texto = "\n".join(paginas)
-        return ArquivoHandler._normalizar(texto)
+    def _ler_pdf(
+        arquivo: BinaryIO,
+        limite_paginas: Optional[int] = None,
+        limite_caracteres: Optional[int] = None,
+    ) -> str:
+        paginas = ArquivoHandler.LIMITE_PAGINAS if limite_paginas is None else limite_paginas
+        caracteres = ArquivoHandler.LIMITE_CARACTERES if limite_caracteres is None else limite_caracteres
+        arquivo = ArquivoHandler._garantir_seek(arquivo)
+        ArquivoHandler.verificar_tamanho(arquivo)
+        chave = (ArquivoHandler._calcular_digest(arquivo), paginas, caracteres, ArquivoHandler.PRESERVAR_ACENTOS)
+        texto = ArquivoHandler._consultar_cache(chave)
+        if texto is not None:
+            return texto
+        telemetria = obter_telemetria()
+        if telemetria.ativa:
+            # Extração e normalização se alternam por página; soma só o tempo de normalização.
+            normalizacao = 0.0
+            partes = []
+            for pagina in ArquivoHandler._iterar_paginas_protegido(arquivo, paginas, caracteres):
+                inicio = time.perf_counter()
+                partes.append(ArquivoHandler._normalizar(pagina))
+                normalizacao += time.perf_counter() - inicio
+            telemetria.observar("normalizacao", normalizacao)
+        else:
+            partes = (
+                ArquivoHandler._normalizar(pagina)
+                for pagina in ArquivoHandler._iterar_paginas_protegido(arquivo, paginas, caracteres)
+            )
+        texto = " ".join(parte for parte in partes if parte)
+        ArquivoHandler._guardar_cache(chave, texto)
+        return texto
+
+    @staticmethod
+    def _consultar_cache(chave: Tuple[str, int, int, bool]) -> Optional[str]:
+        with ArquivoHandler._trava_cache:
+            texto = ArquivoHandler._cache_textos.get(chave)
+            if texto is not None:
+                ArquivoHandler._cache_textos.move_to_end(chave)
+            return texto
+
+    @staticmethod
+    def _guardar_cache(chave: Tuple[str, int, int, bool], texto: str) -> None:
+        with ArquivoHandler._trava_cache:
+            ArquivoHandler._cache_textos[chave] = texto
+            ArquivoHandler._cache_textos.move_to_end(chave)
+            while len(ArquivoHandler._cache_textos) > ArquivoHandler.CAPACIDADE_CACHE:
+                ArquivoHandler._cache_textos.popitem(last=False)
+
+    @staticmethod
+    def _iterar_paginas_protegido(arquivo: BinaryIO, limite_paginas: int, limite_caracteres: int) -> Iterator[str]:
+        return ArquivoHandler.iterar_paginas_pdf(
+            arquivo,
+            limite_paginas,
+            limite_caracteres,
+            limite_paginas_documento=ArquivoHandler.LIMITE_PAGINAS_DOCUMENTO,
+            limite_descomprimido=ArquivoHandler.LIMITE_DESCOMPRIMIDO,
+        )
+
+    @staticmethod
+    def iterar_paginas_pdf(
+        arquivo: BinaryIO,
+        limite_paginas: int = 0,
+        limite_caracteres: int = 0,
+        limite_paginas_documento: int = 0,
+        limite_descomprimido: int = 0,
+    ) -> Iterator[str]:
+        """Extrai o texto página a página, parando ao atingir o orçamento (0 = sem limite).
+
+        `limite_paginas_documento` recusa PDFs que declaram mais páginas que isso
+        antes de a árvore de páginas ser percorrida, e `limite_descomprimido`
+        confere o tamanho descomprimido das streams de cada página antes da
+        extração, sem guardar a saída, o que barra PDFs do tipo bomba de
+        compressão.
+        """
+        from PyPDF2 import PdfReader
+
+        reader = PdfReader(arquivo)
+        if limite_paginas_documento:
+            declaradas = _paginas_declaradas(reader)
+            if declaradas > limite_paginas_documento:
+                raise ArquivoRejeitado(
+                    f"O PDF declara {declaradas} páginas; o limite é {limite_paginas_documento}."
+                )
+        total = 0
+        descomprimido = 0
+        for indice, pagina in enumerate(reader.pages):
+            if limite_paginas and indice >= limite_paginas:
+                return
+            if limite_descomprimido:
+                descomprimido += _tamanho_streams(pagina, limite_descomprimido - descomprimido + 1)
+                if descomprimido > limite_descomprimido:
+                    raise ArquivoRejeitado(
+                        "O conteúdo comprimido do PDF passa de "
+                        f"{limite_descomprimido / MEGABYTE:g} MB ao ser expandido."
+                    )
+            texto = pagina.extract_text() or ""
+            if limite_caracteres and total + len(texto) >= limite_caracteres:
+                yield texto[: limite_caracteres - total]
+                return
+            total += len(texto)
+            yield texto
+
+    @staticmethod
+    def verificar_tamanho(arquivo: Any, limite: Optional[int] = None) -> None:
+        """Recusa o arquivo acima do limite sem lê-lo; sem tamanho conhecido, quem lê confere em blocos."""
+        limite = ArquivoHandler.LIMITE_BYTES if limite is None else limite
+        tamanho = ArquivoHandler.medir_tamanho(arquivo)
+        if limite and tamanho is not None and tamanho > limite:
+            raise ArquivoRejeitado(
+                f"O arquivo tem {tamanho / MEGABYTE:.1f} MB; o limite é de {limite / MEGABYTE:g} MB."
+            )
+
+    @staticmethod
+    def medir_tamanho(arquivo: Any) -> Optional[int]:
+        """Bytes restantes do arquivo (uploads do Streamlit expõem `size`); None se não der para saber."""
+        tamanho = getattr(arquivo, "size", None)
+        if isinstance(tamanho, int):
+            return tamanho
+        getbuffer = getattr(arquivo, "getbuffer", None)
+        if getbuffer is not None:
+            return getbuffer().nbytes - arquivo.tell()
+        seekable = getattr(arquivo, "seekable", None)
+        if seekable is not None and seekable():
+            posicao = arquivo.tell()
+            fim = arquivo.seek(0, io.SEEK_END)
+            arquivo.seek(posicao)
+            return fim - posicao
+        return None
+
+    @staticmethod
+    def _garantir_seek(arquivo: BinaryIO) -> BinaryIO:
+        seekable = getattr(arquivo, "seekable", None)
+        if seekable is not None and seekable():
+            return arquivo
+        limite = ArquivoHandler.LIMITE_BYTES
+        conteudo = arquivo.read(limite + 1) if limite else arquivo.read()
+        if limite and len(conteudo) > limite:
+            raise ArquivoRejeitado(f"O arquivo passa do limite de {limite / MEGABYTE:g} MB.")
+        return io.BytesIO(conteudo)
+
+    @staticmethod
+    def _calcular_digest(arquivo: BinaryIO) -> str:
+        getbuffer = getattr(arquivo, "getbuffer", None)
+        if getbuffer is not None:
+            return hashlib.sha256(getbuffer()).hexdigest()
+        posicao = arquivo.tell()
+        digest = hashlib.sha256()
+        for bloco in iter(lambda: arquivo.read(1 << 16), b""):
+            digest.update(bloco)
+        arquivo.seek(posicao)
+        return digest.hexdigest()
 
     @staticmethod
     def _ler_txt(arquivo: BinaryIO) -> str:
-        conteudo = arquivo.read()
-        if isinstance(conteudo, bytes):
-            texto = conteudo.decode("utf-8", errors="ignore")
-        else:
-            texto = conteudo
-        return ArquivoHandler._normalizar(texto)
+        """Decodifica e normaliza em blocos: em memória ficam só a saída e o bloco atual.
+
+        A palavra cortada no fim de cada bloco segue para o próximo, e a leitura
+        para com erro assim que passa do limite de tamanho.
+        """
+        limite = ArquivoHandler.LIMITE_BYTES
+        decodificador = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        partes: List[str] = []
+        resto = ""
+        lidos = 0
+        with obter_telemetria().span("normalizacao"):
+            while True:
+                bloco = arquivo.read(TAMANHO_BLOCO)
+                if not bloco:
+                    break
+                lidos += len(bloco)
+                if limite and lidos > limite:
+                    raise ArquivoRejeitado(f"O arquivo passa do limite de {limite / MEGABYTE:g} MB.")
+                texto = resto + (decodificador.decode(bloco) if isinstance(bloco, bytes) else bloco)
+                corte = max(map(texto.rfind, ESPACOS_CORTE))
+                if corte < 0:
+                    resto = texto
+                    continue
+                resto = texto[corte + 1 :]
+                partes.append(ArquivoHandler._normalizar(texto[:corte]))
+            partes.append(ArquivoHandler._normalizar(resto + decodificador.decode(b"", final=True)))
+        return " ".join(parte for parte in partes if parte)
 
     @staticmethod
-    def _normalizar(texto: str) -> str:
+    def _normalizar(texto: str, preservar_acentos: Optional[bool] = None) -> str:
+        """Colapsa espaços e tira lixo de extração; acentos viram ASCII salvo SELECT_AI_PRESERVAR_ACENTOS=1.
+
+        Entradas grandes são tratadas em blocos cortados em espaços, de modo que o
+        pico de memória fica na saída mais um bloco, e não em cópias do texto inteiro.
+        """
         if not texto:
             return ""
-        texto = unicodedata.normalize("NFKD", texto)
-        texto = texto.encode("ascii", errors="ignore").decode("ascii")
-        texto = re.sub(r"\s+", " ", texto)
-        return texto.strip()
+        preservar = ArquivoHandler.PRESERVAR_ACENTOS if preservar_acentos is None else preservar_acentos
+        normalizar = ArquivoHandler._normalizar_preservando if preservar else ArquivoHandler._normalizar_ascii
+        if len(texto) <= TAMANHO_BLOCO:
+            return normalizar(texto)
+        return " ".join(parte for parte in map(normalizar, _dividir_em_blocos(texto, TAMANHO_BLOCO)) if parte)
+
+    @staticmethod
+    def _normalizar_ascii(texto: str) -> str:
+        if not texto.isascii():
+            texto = unicodedata.normalize("NFKD", texto)
+        dados = texto.encode("ascii", errors="ignore").translate(TABELA_CONTROLES)
+        return " ".join(dados.decode("ascii").split())
 
     @staticmethod
-    def limpar_texto(texto: str) -> str:
+    def _normalizar_preservando(texto: str) -> str:
+        # Só os caracteres problemáticos passam pelo NFKC; o resto do texto é copiado como está.
+        texto = PADRAO_LIMPEZA.sub(_substituir_caractere, texto)
+        if PADRAO_COMBINANTE.search(texto) is not None:
+            # Acentos combinantes soltos ("c" + U+0327) voltam a ser um caractere só ("ç").
+            texto = unicodedata.normalize("NFC", texto)
+        return " ".join(texto.split())
+
+    @staticmethod
+    def limpar_texto(texto: str, preservar_acentos: Optional[bool] = None) -> str:
         """Disponibiliza normalização para entradas textuais livres."""
-        return ArquivoHandler._normalizar(texto)
+        return ArquivoHandler._normalizar(texto, preservar_acentos)
+
+    @staticmethod
+    def remover_acentos(texto: str) -> str:
+        """Versão ASCII de um texto já normalizado, para comparar termos em qualquer modo."""
+        if texto.isascii():
+            return texto
+        return unicodedata.normalize("NFKD", texto).encode("ascii", errors="ignore").decode("ascii")
+
+
+def _substituir_caractere(correspondencia: "re.Match[str]") -> str:
+    return _substituto(correspondencia.group())
+
+
+@functools.lru_cache(maxsize=1024)
+def _substituto(caractere: str) -> str:
+    if PADRAO_LIXO.match(caractere) is None:
+        return unicodedata.normalize("NFKC", caractere)
+    return " " if caractere <= "\x9f" else ""
+
+
+def _paginas_declaradas(reader: Any) -> int:
+    """Contagem da raiz da árvore de páginas, lida sem percorrer a árvore."""
+    try:
+        return int(reader.trailer["/Root"]["/Pages"]["/Count"])
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def _tamanho_streams(pagina: Any, limite: int) -> int:
+    """Bytes das streams de conteúdo da página e dos seus formulários, já descomprimidas.
+
+    Streams em FlateDecode são expandidas em blocos e descartadas; a contagem
+    para ao passar de `limite`.
+    """
+    streams: List[Any] = []
+    conteudo = pagina.get("/Contents")
+    conteudo = conteudo.get_object() if conteudo is not None else None
+    if isinstance(conteudo, list):
+        streams.extend(item.get_object() for item in conteudo)
+    elif conteudo is not None:
+        streams.append(conteudo)
+    recursos = pagina.get("/Resources")
+    objetos = recursos.get_object().get("/XObject") if recursos is not None else None
+    for objeto in (objetos.get_object().values() if objetos is not None else ()):
+        objeto = objeto.get_object()
+        if objeto.get("/Subtype") == "/Form":
+            streams.append(objeto)
+    total = 0
+    for stream in streams:
+        filtros = stream.get("/Filter")
+        filtros = filtros.get_object() if filtros is not None else None
+        primeiro = filtros[0] if isinstance(filtros, list) and filtros else filtros
+        dados = getattr(stream, "_data", b"") or b""
+        total += _tamanho_flate(dados, limite - total) if primeiro == "/FlateDecode" else len(dados)
+        if total > limite:
+            break
+    return total
+
+
+def _tamanho_flate(dados: bytes, limite: int) -> int:
+    descompressor = zlib.decompressobj()
+    total = 0
+    try:
+        while total <= limite:
+            saida = descompressor.decompress(dados, TAMANHO_BLOCO)
+            total += len(saida)
+            dados = descompressor.unconsumed_tail
+            if not dados and len(saida) < TAMANHO_BLOCO:
+                break
+    except zlib.error:
+        # Stream corrompida: o PyPDF2 decide o que fazer com ela na extração.
+        pass
+    return total
+
+
+def _dividir_em_blocos(texto: str, tamanho: int) -> Iterator[str]:
+    """Fatia o texto em espaços; um trecho sem espaço maior que o bloco segue inteiro."""
+    inicio, total = 0, len(texto)
+    while inicio < total:
+        fim = inicio + tamanho
+        if fim < total:
+            corte = texto.rfind(" ", inicio, fim)
+            if corte <= inicio:
+                corte = texto.find(" ", fim)
+            fim = total if corte < 0 else corte
+        yield texto[inicio:fim]
+        inicio = fim
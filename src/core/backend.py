@@ -0,0 +1,276 @@
+"""Backends de modelo: o Gemini real ou um substituto local para medir sem chave."""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple
+
+from src.core.orcamento import estimar_tokens
+from src.core.resposta import CAMPOS_LISTA
+
+
+PADRAO_VAGA_AGRUPADA = re.compile(r"^VAGA (V\d+):", re.MULTILINE)
+PADRAO_TRIAGEM = re.compile(r'^Formato fixo: \{"pontuacao_compatibilidade": 0, "resumo_geral"', re.MULTILINE)
+PADRAO_CURRICULO = re.compile(r"CURRÍCULO:\n(.{0,400})", re.DOTALL)
+
+
+class BackendModelo(Protocol):
+    """Fábrica dos objetos de modelo usados pelo agente.
+
+    Os modelos devolvidos seguem a interface de `genai.GenerativeModel` usada
+    pelo projeto: `generate_content` (com `stream=True`) e
+    `generate_content_async`, com respostas que expõem `text`.
+    """
+
+    nome: str
+
+    def criar_modelo(self, nome_modelo: str, instrucao_sistema: Optional[str] = None) -> Any:
+        ...
+
+    def criar_modelo_em_cache(
+        self, nome_modelo: str, instrucao_sistema: str, ttl: datetime.timedelta
+    ) -> Tuple[Any, Any]:
+        """Modelo ligado a um cache de contexto e o conteúdo em cache (com `delete()`)."""
+        ...
+
+
+class BackendGemini:
+    """Chamadas reais à API do Gemini.
+
+    O SDK (quase 1 s de importação) só é carregado quando o backend é criado.
+    """
+
+    nome = "gemini"
+
+    def __init__(self, api_key: str) -> None:
+        if not api_key:
+            raise ValueError("Chave da API Gemini ausente.")
+        import google.generativeai as genai
+
+        self._genai = genai
+        genai.configure(api_key=api_key)
+
+    def criar_modelo(self, nome_modelo: str, instrucao_sistema: Optional[str] = None) -> Any:
+        if instrucao_sistema is None:
+            return self._genai.GenerativeModel(nome_modelo)
+        return self._genai.GenerativeModel(nome_modelo, system_instruction=instrucao_sistema)
+
+    def criar_modelo_em_cache(
+        self, nome_modelo: str, instrucao_sistema: str, ttl: datetime.timedelta
+    ) -> Tuple[Any, Any]:
+        from google.generativeai import caching
+
+        conteudo = caching.CachedContent.create(
+            model=f"models/{nome_modelo}",
+            system_instruction=instrucao_sistema,
+            ttl=ttl,
+        )
+        return self._genai.GenerativeModel.from_cached_content(conteudo), conteudo
+
+
+class ErroModeloFalso(Exception):
+    """Falha simulada com o código HTTP que a API real devolveria."""
+
+    def __init__(self, code: int) -> None:
+        super().__init__(f"Falha simulada do modelo (HTTP {code}).")
+        self.code = code
+
+
+@dataclass
+class UsoFalso:
+    prompt_token_count: int
+    candidates_token_count: int
+    cached_content_token_count: int = 0
+
+
+@dataclass
+class RespostaFalsa:
+    text: str
+    usage_metadata: UsoFalso
+
+
+class ConteudoCacheFalso:
+    def __init__(self) -> None:
+        self.removido = False
+
+    def delete(self) -> None:
+        self.removido = True
+
+
+class BackendFalso:
+    """Substituto local do Gemini com latência, erros e tamanho de resposta configuráveis.
+
+    A latência segue uma distribuição log-normal com mediana `latencia_ms` e
+    dispersão `dispersao` (desvio do logaritmo), o que reproduz a cauda longa
+    das chamadas reais; `latencias_modelo` define outra mediana por nome de
+    modelo (ex.: um modelo de triagem mais rápido). A pontuação parte do hash do
+    início do currículo, com um desvio de até 12 pontos derivado do prompt
+    inteiro: o mesmo prompt sempre recebe o mesmo resultado e modelos ou
+    prompts diferentes dão notas próximas para o mesmo currículo.
+    """
+
+    nome = "falso"
+
+    def __init__(
+        self,
+        latencia_ms: float = 800.0,
+        dispersao: float = 0.35,
+        taxa_erro: float = 0.0,
+        taxa_truncamento: float = 0.0,
+        itens_por_lista: int = 3,
+        palavras_por_item: int = 12,
+        semente: Optional[int] = None,
+        latencias_modelo: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.latencia_ms = latencia_ms
+        self.latencias_modelo = dict(latencias_modelo or {})
+        self.dispersao = dispersao
+        self.taxa_erro = taxa_erro
+        self.taxa_truncamento = taxa_truncamento
+        self.itens_por_lista = itens_por_lista
+        self.palavras_por_item = palavras_por_item
+        self._aleatorio = random.Random(semente)
+        self._trava = threading.Lock()
+        self.chamadas = 0
+
+    def criar_modelo(self, nome_modelo: str, instrucao_sistema: Optional[str] = None) -> "ModeloFalso":
+        return ModeloFalso(self, instrucao_sistema, latencia_ms=self.latencias_modelo.get(nome_modelo))
+
+    def criar_modelo_em_cache(
+        self, nome_modelo: str, instrucao_sistema: str, ttl: datetime.timedelta
+    ) -> Tuple["ModeloFalso", ConteudoCacheFalso]:
+        modelo = ModeloFalso(
+            self, instrucao_sistema, em_cache=True, latencia_ms=self.latencias_modelo.get(nome_modelo)
+        )
+        return modelo, ConteudoCacheFalso()
+
+    def sortear(self, latencia_ms: Optional[float] = None) -> Tuple[float, Optional[int], bool]:
+        """Latência (s), código de erro simulado (ou None) e se a resposta será truncada."""
+        mediana = self.latencia_ms if latencia_ms is None else latencia_ms
+        with self._trava:
+            self.chamadas += 1
+            latencia = mediana / 1000 * self._aleatorio.lognormvariate(0.0, self.dispersao)
+            erro = None
+            if self._aleatorio.random() < self.taxa_erro:
+                erro = self._aleatorio.choice((429, 503))
+            truncar = self._aleatorio.random() < self.taxa_truncamento
+        return latencia, erro, truncar
+
+    def gerar_texto(self, prompt: str, truncar: bool) -> str:
+        semente = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+        gerador = random.Random(semente)
+        palavras = prompt.split() or ["curriculo"]
+
+        def frase() -> str:
+            return " ".join(gerador.choice(palavras) for _ in range(self.palavras_por_item))
+
+        def avaliacao(base: Optional[int] = None) -> Dict[str, Any]:
+            pontuacao = gerador.randint(0, 100) if base is None else min(100, max(0, base + gerador.randint(-12, 12)))
+            return {
+                "resumo_geral": frase(),
+                "pontuacao_compatibilidade": pontuacao,
+                **{campo: [frase() for _ in range(self.itens_por_lista)] for campo in CAMPOS_LISTA},
+            }
+
+        vagas = PADRAO_VAGA_AGRUPADA.findall(prompt)
+        curriculo = PADRAO_CURRICULO.search(prompt)
+        base = None
+        if curriculo is not None:
+            base = int.from_bytes(hashlib.sha256(curriculo.group(1).encode("utf-8")).digest()[:4], "big") % 101
+        if vagas:
+            # Prompt com várias vagas: uma avaliação por identificador.
+            dados: Dict[str, Any] = {"avaliacoes": [{"vaga": vaga, **avaliacao()} for vaga in vagas]}
+        elif PADRAO_TRIAGEM.search(prompt):
+            # Prompt compacto da cascata: só nota e resumo.
+            completa = avaliacao(base)
+            dados = {campo: completa[campo] for campo in ("pontuacao_compatibilidade", "resumo_geral")}
+        else:
+            dados = avaliacao(base)
+        texto = json.dumps(dados, ensure_ascii=False)
+        if truncar:
+            texto = texto[: gerador.randint(len(texto) // 2, len(texto) - 2)]
+        return texto
+
+
+class ModeloFalso:
+    """Imitação de `genai.GenerativeModel` servida pelo `BackendFalso`."""
+
+    TAMANHO_PEDACO = 64
+
+    def __init__(
+        self,
+        backend: BackendFalso,
+        instrucao_sistema: Optional[str] = None,
+        em_cache: bool = False,
+        latencia_ms: Optional[float] = None,
+    ) -> None:
+        self._backend = backend
+        self._latencia_ms = latencia_ms
+        self._instrucao_sistema = instrucao_sistema or ""
+        self._em_cache = em_cache
+
+    def generate_content(self, prompt: str, stream: bool = False, **_: Any) -> Any:
+        latencia, erro, truncar = self._backend.sortear(self._latencia_ms)
+        if erro is not None:
+            time.sleep(latencia / 4)
+            raise ErroModeloFalso(erro)
+        resposta = self._responder(prompt, truncar)
+        if stream:
+            return self._em_pedacos(resposta, latencia)
+        time.sleep(latencia)
+        return resposta
+
+    async def generate_content_async(self, prompt: str, **_: Any) -> RespostaFalsa:
+        latencia, erro, truncar = self._backend.sortear(self._latencia_ms)
+        if erro is not None:
+            await asyncio.sleep(latencia / 4)
+            raise ErroModeloFalso(erro)
+        await asyncio.sleep(latencia)
+        return self._responder(prompt, truncar)
+
+    def _responder(self, prompt: str, truncar: bool) -> RespostaFalsa:
+        texto = self._backend.gerar_texto(self._instrucao_sistema + prompt, truncar)
+        prefixo = estimar_tokens(self._instrucao_sistema)
+        uso = UsoFalso(
+            prompt_token_count=estimar_tokens(prompt) + prefixo,
+            candidates_token_count=estimar_tokens(texto),
+            cached_content_token_count=prefixo if self._em_cache else 0,
+        )
+        return RespostaFalsa(texto, uso)
+
+    def _em_pedacos(self, resposta: RespostaFalsa, latencia: float) -> Iterator[RespostaFalsa]:
+        texto = resposta.text
+        pedacos: List[str] = [texto[i : i + self.TAMANHO_PEDACO] for i in range(0, len(texto), self.TAMANHO_PEDACO)]
+        intervalo = latencia / (2 * max(len(pedacos), 1))
+        time.sleep(latencia / 2)
+        for pedaco in pedacos:
+            yield RespostaFalsa(pedaco, resposta.usage_metadata)
+            time.sleep(intervalo)
+
+
+def obter_backend(api_key: str) -> BackendModelo:
+    """Backend definido por SELECT_AI_BACKEND (`gemini` ou `falso`)."""
+    if os.getenv("SELECT_AI_BACKEND", "gemini").strip().lower() != "falso":
+        return BackendGemini(api_key)
+    return BackendFalso(
+        latencia_ms=float(os.getenv("SELECT_AI_FALSO_LATENCIA_MS", "800")),
+        dispersao=float(os.getenv("SELECT_AI_FALSO_DISPERSAO", "0.35")),
+        taxa_erro=float(os.getenv("SELECT_AI_FALSO_TAXA_ERRO", "0")),
+        taxa_truncamento=float(os.getenv("SELECT_AI_FALSO_TAXA_TRUNCAMENTO", "0")),
+        itens_por_lista=int(os.getenv("SELECT_AI_FALSO_ITENS", "3")),
+        latencias_modelo={
+            nome.strip(): float(valor)
+            for nome, _, valor in (
+                item.partition("=") for item in os.getenv("SELECT_AI_FALSO_LATENCIAS", "").split(",") if "=" in item
+            )
+        },
+    )
@@ -0,0 +1,153 @@
+"""Cache de resultados de análise endereçado por conteúdo."""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+class CacheResultados:
+    """LRU em memória na frente de uma camada SQLite local.
+
+    Em conformidade com a RN005, nenhum texto de currículo ou vaga é gravado:
+    a chave é um hash SHA-256 das entradas e o valor é apenas o resultado
+    estruturado devolvido pelo modelo.
+    """
+
+    def __init__(
+        self,
+        caminho: Optional[str] = None,
+        capacidade_memoria: int = 256,
+        max_entradas_disco: int = 5000,
+        ttl_segundos: float = 7 * 24 * 3600,
+    ) -> None:
+        self._capacidade_memoria = capacidade_memoria
+        self._max_entradas_disco = max_entradas_disco
+        self._ttl = ttl_segundos
+        self._memoria: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._trava = threading.Lock()
+        self._contadores = {"acertos_memoria": 0, "acertos_disco": 0, "falhas": 0, "gravacoes": 0}
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._conexao: Optional[sqlite3.Connection] = None
+        if caminho:
+            Path(caminho).parent.mkdir(parents=True, exist_ok=True)
+            self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS resultados ("
+                " chave TEXT PRIMARY KEY,"
+                " resultado TEXT NOT NULL,"
+                " criado_em REAL NOT NULL,"
+                " acessado_em REAL NOT NULL)"
+            )
+            self._conexao.execute(
+                "CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados (acessado_em)"
+            )
+            self._conexao.commit()
+
+    @staticmethod
+    def gerar_chave(texto_curriculo: str, texto_vaga: str, modelo: str, versao_prompt: str) -> str:
+        digest = hashlib.sha256()
+        for parte in (texto_curriculo, texto_vaga, modelo, versao_prompt):
+            dados = parte.encode("utf-8")
+            digest.update(len(dados).to_bytes(8, "big"))
+            digest.update(dados)
+        return digest.hexdigest()
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        agora = time.time()
+        with self._trava:
+            entrada = self._memoria.get(chave)
+            if entrada is not None:
+                criado_em, resultado = entrada
+                if agora - criado_em <= self._ttl:
+                    self._memoria.move_to_end(chave)
+                    self._contadores["acertos_memoria"] += 1
+                    return copy.deepcopy(resultado)
+                del self._memoria[chave]
+            if self._conexao is not None:
+                linha = self._conexao.execute(
+                    "SELECT resultado, criado_em FROM resultados WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None and agora - linha[1] <= self._ttl:
+                    self._conexao.execute(
+                        "UPDATE resultados SET acessado_em = ? WHERE chave = ?", (agora, chave)
+                    )
+                    self._conexao.commit()
+                    resultado = json.loads(linha[0])
+                    self._guardar_memoria(chave, linha[1], resultado)
+                    self._contadores["acertos_disco"] += 1
+                    return copy.deepcopy(resultado)
+            self._contadores["falhas"] += 1
+            return None
+
+    def guardar(self, chave: str, resultado: Dict[str, Any]) -> None:
+        agora = time.time()
+        with self._trava:
+            self._guardar_memoria(chave, agora, copy.deepcopy(resultado))
+            self._contadores["gravacoes"] += 1
+            if self._conexao is None:
+                return
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO resultados (chave, resultado, criado_em, acessado_em)"
+                " VALUES (?, ?, ?, ?)",
+                (chave, json.dumps(resultado, ensure_ascii=False), agora, agora),
+            )
+            self._conexao.execute("DELETE FROM resultados WHERE criado_em < ?", (agora - self._ttl,))
+            self._conexao.execute(
+                "DELETE FROM resultados WHERE chave IN ("
+                " SELECT chave FROM resultados ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)",
+                (self._max_entradas_disco,),
+            )
+            self._conexao.commit()
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._memoria.clear()
+            if self._conexao is not None:
+                self._conexao.execute("DELETE FROM resultados")
+                self._conexao.commit()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._trava:
+            return dict(self._contadores, entradas_memoria=len(self._memoria))
+
+    def _guardar_memoria(self, chave: str, criado_em: float, resultado: Dict[str, Any]) -> None:
+        self._memoria[chave] = (criado_em, resultado)
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self._capacidade_memoria:
+            self._memoria.popitem(last=False)
+
+
+_CACHE_GLOBAL: Optional[CacheResultados] = None
+_TRAVA_GLOBAL = threading.Lock()
+
+
+def obter_cache() -> Optional[CacheResultados]:
+    """Cache do processo conforme SELECT_AI_CACHE (disco, memoria ou desativado)."""
+    global _CACHE_GLOBAL
+    modo = os.getenv("SELECT_AI_CACHE", "disco").strip().lower()
+    if modo in ("0", "desativado", "false", "nao"):
+        return None
+    with _TRAVA_GLOBAL:
+        if _CACHE_GLOBAL is None:
+            caminho = None
+            if modo == "disco":
+                caminho = os.getenv(
+                    "SELECT_AI_CACHE_CAMINHO",
+                    str(Path.home() / ".cache" / "select_ai" / "resultados.sqlite3"),
+                )
+            _CACHE_GLOBAL = CacheResultados(
+                caminho=caminho,
+                ttl_segundos=float(os.getenv("SELECT_AI_CACHE_TTL_HORAS", "168")) * 3600,
+                max_entradas_disco=int(os.getenv("SELECT_AI_CACHE_MAX_ENTRADAS", "5000")),
+            )
+        return _CACHE_GLOBAL
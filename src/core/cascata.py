@@ -0,0 +1,310 @@
+"""Cascata de modelos: triagem barata para todos, análise completa só para a faixa que importa."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.core.cache import CacheResultados
+from src.core.orcamento import estimar_tokens, recortar_curriculo
+from src.core.resposta import ESQUEMA_RESPOSTA_TRIAGEM, reparar_json
+
+
+AnalisarCurriculo = Callable[[str], Dict[str, Any]]
+
+# Tokens de entrada servidos pelo cache de contexto custam uma fração do preço normal.
+FATOR_PRECO_CACHE = 0.25
+
+
+def _ler_faixa(texto: str) -> Tuple[int, int]:
+    """Converte "45-100" em (45, 100)."""
+    try:
+        minimo, maximo = (int(parte) for parte in texto.split("-", 1))
+    except ValueError as exc:
+        raise ValueError(f"Faixa de escalonamento inválida: '{texto}' (use, por exemplo, 45-100).") from exc
+    if not 0 <= minimo <= maximo <= 100:
+        raise ValueError("A faixa de escalonamento deve estar entre 0 e 100.")
+    return minimo, maximo
+
+
+def _ler_preco(texto: str) -> Tuple[float, float]:
+    """Converte "0.10,0.40" em (entrada, saída), em US$ por milhão de tokens."""
+    entrada, saida = (float(parte) for parte in texto.split(",", 1))
+    return entrada, saida
+
+
+class AnalisadorCascata:
+    """Pontua todos os currículos com um modelo barato e prompt compacto.
+
+    Só os currículos cuja nota de triagem cai na `faixa` (limítrofes e os
+    melhores) seguem para o modelo do agente e recebem a análise completa de
+    seis campos; os demais ficam com a nota e o resumo da triagem. Uma fração
+    `auditoria` dos que ficariam de fora também é escalada, para medir quantos
+    o modelo completo teria posto na faixa.
+
+    Cada resultado leva em "cascata" a camada que o produziu, o motivo, a nota
+    de triagem e a latência, os tokens e o custo de cada camada, tirados do
+    uso informado pelas próprias chamadas (uma análise completa atendida pelo
+    cache de resultados custa zero e é marcada em `completa_em_cache`);
+    `resumir_cascata` agrega isso por camada para calibrar a faixa.
+    """
+
+    def __init__(
+        self,
+        agente: Any,
+        modelo_triagem: Optional[str] = None,
+        faixa: Optional[Tuple[int, int]] = None,
+        auditoria: Optional[float] = None,
+        limite_tokens_curriculo: Optional[int] = None,
+        preco_triagem: Optional[Tuple[float, float]] = None,
+        preco_completo: Optional[Tuple[float, float]] = None,
+    ) -> None:
+        self._agente = agente
+        self._nome_triagem = modelo_triagem or os.getenv("GEMINI_MODELO_TRIAGEM", "gemini-2.5-flash-lite")
+        self._modelo_triagem = agente._backend.criar_modelo(self._nome_triagem)
+        self._faixa = faixa or _ler_faixa(os.getenv("SELECT_AI_CASCATA_FAIXA", "45-100"))
+        self._auditoria = (
+            float(os.getenv("SELECT_AI_CASCATA_AUDITORIA", "0")) if auditoria is None else auditoria
+        )
+        if not 0 <= self._auditoria <= 1:
+            raise ValueError("A fração de auditoria deve estar entre 0 e 1.")
+        self._limite_tokens_curriculo = limite_tokens_curriculo or int(
+            os.getenv("SELECT_AI_CASCATA_TOKENS_CURRICULO", "1500")
+        )
+        self._preco_triagem = preco_triagem or _ler_preco(os.getenv("SELECT_AI_PRECO_TRIAGEM", "0.10,0.40"))
+        self._preco_completo = preco_completo or _ler_preco(os.getenv("SELECT_AI_PRECO_COMPLETO", "0.30,2.50"))
+        self._configuracao: Optional[Dict[str, Any]] = (
+            {"response_mime_type": "application/json", "response_schema": ESQUEMA_RESPOSTA_TRIAGEM}
+            if agente._configuracao_geracao is not None
+            else None
+        )
+        modelo_prompt = self._montar_prompt("", "") + str(self._limite_tokens_curriculo)
+        self._versao_prompt = hashlib.sha256(modelo_prompt.encode("utf-8")).hexdigest()[:12]
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def faixa(self) -> Tuple[int, int]:
+        return self._faixa
+
+    @property
+    def modelo_triagem(self) -> str:
+        return self._nome_triagem
+
+    def envolver(self, analisar_completo: AnalisarCurriculo, texto_vaga: str) -> AnalisarCurriculo:
+        """Adapta uma análise completa (ex.: `SessaoVaga.analisar`) para passar antes pela triagem."""
+        return partial(self.analisar, texto_vaga=texto_vaga, analisar_completo=analisar_completo)
+
+    def analisar(
+        self,
+        texto_curriculo: str,
+        texto_vaga: str,
+        analisar_completo: Optional[AnalisarCurriculo] = None,
+    ) -> Dict[str, Any]:
+        """Triagem e, se a nota pedir, análise completa com o modelo do agente."""
+        agente = self._agente
+        with agente._telemetria.span("cascata") as span:
+            inicio = time.perf_counter()
+            triagem, tokens_triagem = self._triar(texto_curriculo, texto_vaga)
+            meta: Dict[str, Any] = {
+                "camada": "triagem",
+                "motivo": "fora_da_faixa",
+                "pontuacao_triagem": None,
+                "segundos_triagem": time.perf_counter() - inicio,
+                "tokens_triagem": list(tokens_triagem),
+                "custo_triagem": self._custo(tokens_triagem, self._preco_triagem),
+            }
+            if triagem is None:
+                meta["motivo"] = "triagem_invalida"
+            else:
+                meta["pontuacao_triagem"] = self._pontuacao(triagem)
+                if self._na_faixa(meta["pontuacao_triagem"]):
+                    meta["motivo"] = "faixa"
+                elif self._auditar(texto_curriculo):
+                    meta["motivo"] = "auditoria"
+            span.definir(motivo=meta["motivo"], pontuacao_triagem=meta["pontuacao_triagem"])
+            if meta["motivo"] == "fora_da_faixa":
+                return {**agente._normalizar_estrutura(triagem), "cascata": meta}
+
+            completo = analisar_completo or partial(agente.analisar, texto_vaga=texto_vaga)
+            inicio = time.perf_counter()
+            with agente.medir_uso() as uso:
+                resultado = dict(completo(texto_curriculo))
+            tokens_completo = (uso["entrada"], uso["saida"], uso["cache"])
+            meta.update(
+                camada="completa",
+                segundos_completa=time.perf_counter() - inicio,
+                tokens_completa=list(tokens_completo),
+                custo_completa=self._custo(tokens_completo, self._preco_completo),
+                completa_em_cache=uso["chamadas"] == 0,
+            )
+            if meta["pontuacao_triagem"] is not None:
+                meta["pontuacao_completa"] = self._pontuacao(resultado)
+                meta["concorda_faixa"] = self._na_faixa(meta["pontuacao_completa"]) == self._na_faixa(
+                    meta["pontuacao_triagem"]
+                )
+            resultado["cascata"] = meta
+            return resultado
+
+    def _triar(self, texto_curriculo: str, texto_vaga: str) -> Tuple[Optional[Dict[str, Any]], Tuple[int, int]]:
+        """Nota e resumo do modelo de triagem (None se a resposta não for aproveitável) e tokens usados."""
+        agente = self._agente
+        chave = (
+            CacheResultados.gerar_chave(
+                texto_curriculo, texto_vaga, self._nome_triagem, f"{self._versao_prompt}:triagem"
+            )
+            if agente._cache is not None
+            else None
+        )
+        em_cache = agente._consultar_cache(chave)
+        if em_cache is not None:
+            return em_cache, (0, 0)
+        prompt = self._montar_prompt(texto_curriculo, texto_vaga)
+        try:
+            with agente.medir_uso() as uso:
+                conteudo = agente._gerar(prompt, modelo=self._modelo_triagem, configuracao=self._configuracao)
+        except Exception as exc:
+            self._logger.warning(
+                "Falha na triagem com %s; escalando para a análise completa: %s", self._nome_triagem, exc
+            )
+            return None, (estimar_tokens(prompt), 0)
+        tokens = (uso["entrada"], uso["saida"])
+        dados = agente._extrair_json(conteudo) or reparar_json(conteudo)
+        if not isinstance(dados, dict) or "pontuacao_compatibilidade" not in dados:
+            return None, tokens
+        triagem = {
+            "pontuacao_compatibilidade": self._pontuacao(dados),
+            "resumo_geral": str(dados.get("resumo_geral", "")),
+        }
+        if chave is not None:
+            agente._cache.guardar(chave, triagem)
+        return triagem, tokens
+
+    def _montar_prompt(self, texto_curriculo: str, texto_vaga: str) -> str:
+        curriculo_enviado = recortar_curriculo(texto_curriculo, texto_vaga, self._limite_tokens_curriculo)
+        return (
+            "Atue como triador de currículos imparcial. Dê uma nota de 0 a 100 para a "
+            "aderência do currículo à vaga e um resumo de uma frase, em JSON estrito e sem markdown.\n"
+            'Formato fixo: {"pontuacao_compatibilidade": 0, "resumo_geral": "..."}\n'
+            "Preencha somente com texto claro em português brasileiro.\n\n"
+            f"CURRÍCULO:\n{curriculo_enviado}\n\n"
+            f"VAGA:\n{texto_vaga}"
+        )
+
+    def _na_faixa(self, pontuacao: int) -> bool:
+        return self._faixa[0] <= pontuacao <= self._faixa[1]
+
+    def _auditar(self, texto_curriculo: str) -> bool:
+        """Amostra determinística: o mesmo currículo é sempre (ou nunca) auditado."""
+        if self._auditoria <= 0:
+            return False
+        sorteio = int.from_bytes(hashlib.sha256(texto_curriculo.encode("utf-8")).digest()[:4], "big") / 2**32
+        return sorteio < self._auditoria
+
+    @staticmethod
+    def _pontuacao(dados: Dict[str, Any]) -> int:
+        try:
+            return max(0, min(100, int(dados.get("pontuacao_compatibilidade", 0) or 0)))
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def _custo(tokens: Sequence[int], preco: Tuple[float, float]) -> float:
+        """Custo de (entrada, saída[, entrada em cache]); a entrada inclui os tokens em cache."""
+        em_cache = tokens[2] if len(tokens) > 2 else 0
+        entrada = tokens[0] - em_cache + em_cache * FATOR_PRECO_CACHE
+        return (entrada * preco[0] + tokens[1] * preco[1]) / 1_000_000
+
+
+def resumir_cascata(resultados: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Latência, tokens e custo por camada e concordância entre triagem e análise completa.
+
+    Recebe os dicionários de resultado (ignora os que não passaram pela cascata).
+    `custo_so_completo` projeta quanto o lote custaria mandando todos ao modelo
+    completo, pelo custo médio dos que foram escalados.
+    """
+    metas = [resultado["cascata"] for resultado in resultados if isinstance(resultado.get("cascata"), dict)]
+    if not metas:
+        return {}
+    camadas: List[Dict[str, Any]] = []
+    for camada in ("triagem", "completa"):
+        chamadas = [meta for meta in metas if f"segundos_{camada}" in meta]
+        segundos = sum(meta[f"segundos_{camada}"] for meta in chamadas)
+        custo = sum(meta[f"custo_{camada}"] for meta in chamadas)
+        camadas.append(
+            {
+                "Camada": camada,
+                "Currículos": len(chamadas),
+                "Latência média (s)": round(segundos / len(chamadas), 3) if chamadas else None,
+                "Tokens entrada": sum(meta[f"tokens_{camada}"][0] for meta in chamadas),
+                "Tokens saída": sum(meta[f"tokens_{camada}"][1] for meta in chamadas),
+                "Tokens em cache": sum(sum(meta[f"tokens_{camada}"][2:]) for meta in chamadas),
+                "Do cache de resultados": sum(bool(meta.get(f"{camada}_em_cache")) for meta in chamadas),
+                "Custo (US$)": round(custo, 6),
+            }
+        )
+    escalados = [meta for meta in metas if meta["camada"] == "completa"]
+    comparados = [meta for meta in escalados if "concorda_faixa" in meta]
+    diferencas = [abs(meta["pontuacao_triagem"] - meta["pontuacao_completa"]) for meta in comparados]
+    custo_total = sum(meta["custo_triagem"] + meta.get("custo_completa", 0.0) for meta in metas)
+    custo_completo_medio = (
+        sum(meta["custo_completa"] for meta in escalados) / len(escalados) if escalados else 0.0
+    )
+    motivos: Dict[str, int] = {}
+    for meta in metas:
+        motivos[meta["motivo"]] = motivos.get(meta["motivo"], 0) + 1
+    return {
+        "curriculos": len(metas),
+        "escalados": len(escalados),
+        "motivos": motivos,
+        "camadas": camadas,
+        "latencia_por_curriculo": sum(
+            meta["segundos_triagem"] + meta.get("segundos_completa", 0.0) for meta in metas
+        ) / len(metas),
+        "custo_total": custo_total,
+        "custo_por_curriculo": custo_total / len(metas),
+        "custo_so_completo": custo_completo_medio * len(metas),
+        "comparados": len(comparados),
+        "diferenca_media": sum(diferencas) / len(diferencas) if diferencas else None,
+        "ate_10_pontos": sum(diferenca <= 10 for diferenca in diferencas) / len(diferencas) if diferencas else None,
+        "concordancia_faixa": (
+            sum(meta["concorda_faixa"] for meta in comparados) / len(comparados) if comparados else None
+        ),
+        "perdidos_auditoria": sum(
+            1 for meta in comparados if meta["motivo"] == "auditoria" and not meta["concorda_faixa"]
+        ),
+    }
+
+
+def descrever_cascata(resumo: Dict[str, Any]) -> str:
+    """Uma linha com os números de `resumir_cascata`, para logs e para a interface."""
+    if not resumo:
+        return ""
+    motivos = ", ".join(
+        f"{motivo} {quantidade}"
+        for motivo, quantidade in sorted(resumo["motivos"].items())
+        if motivo != "fora_da_faixa"
+    )
+    texto = (
+        f"Cascata: {resumo['escalados']} de {resumo['curriculos']} currículos escalados ({motivos or 'nenhum'}); "
+        f"{resumo['latencia_por_curriculo']:.2f}s e US$ {resumo['custo_por_curriculo']:.5f} por currículo "
+        f"(só o modelo completo: US$ {resumo['custo_so_completo'] / resumo['curriculos']:.5f})"
+    )
+    if resumo["comparados"]:
+        texto += (
+            f"; triagem x completa em {resumo['comparados']}: diferença média de "
+            f"{resumo['diferenca_media']:.1f} pontos, {resumo['ate_10_pontos']:.0%} até 10 pontos, "
+            f"{resumo['concordancia_faixa']:.0%} na mesma decisão, "
+            f"perdidos na auditoria: {resumo['perdidos_auditoria']}"
+        )
+    return texto + "."
+
+
+def criar_cascata(agente: Any) -> Optional[AnalisadorCascata]:
+    """Cascata para um lote; desligada a menos que SELECT_AI_CASCATA=1."""
+    if os.getenv("SELECT_AI_CASCATA", "0") != "1":
+        return None
+    return AnalisadorCascata(agente)
@@ -0,0 +1,150 @@
+"""Detecção de currículos quase duplicados (MinHash + LSH) antes de pagar pela análise."""
+
+from __future__ import annotations
+
+import os
+import threading
+import zlib
+from typing import TYPE_CHECKING, Dict, Hashable, List, Optional, Union
+
+from src.core.prefiltro import tokenizar
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class DetectorDuplicatas:
+    """Agrupa textos quase iguais pela similaridade de Jaccard estimada por MinHash.
+
+    Cada texto vira o conjunto dos seus shingles (sequências de `tamanho_shingle`
+    termos) e uma assinatura de `permutacoes` valores de 32 bits. A assinatura é
+    dividida em `bandas`; textos que coincidem em alguma banda inteira são
+    candidatos, e só os candidatos têm a similaridade conferida. Assim cada
+    registro custa O(bandas) consultas, não uma comparação com todo o lote.
+
+    O primeiro texto de cada grupo é o representante. Todo texto registrado fica
+    indexado apontando para ele, para que uma variante entre no grupo pela
+    semelhança com qualquer membro. Por texto são guardados só a assinatura
+    (uint32) e as entradas das bandas, cerca de 1 KB.
+    """
+
+    def __init__(
+        self,
+        limiar: Optional[float] = None,
+        permutacoes: int = 64,
+        bandas: int = 8,
+        tamanho_shingle: int = 5,
+        semente: int = 1,
+    ) -> None:
+        import numpy as np
+
+        limiar = limiar if limiar is not None else float(os.getenv("SELECT_AI_DUPLICATAS_LIMIAR", "0.85"))
+        if not 0 < limiar <= 1:
+            raise ValueError("O limiar de similaridade deve estar entre 0 e 1.")
+        if bandas < 1 or permutacoes % bandas:
+            raise ValueError("O número de permutações deve ser múltiplo do número de bandas.")
+        self._limiar = limiar
+        self._permutacoes = permutacoes
+        self._bandas = bandas
+        self._linhas = permutacoes // bandas
+        self._tamanho_shingle = max(tamanho_shingle, 1)
+        aleatorio = np.random.default_rng(semente)
+        # Hash multiplica-desloca: (a * x + b) mod 2^64, 32 bits altos, com `a` ímpar de 64 bits.
+        maximo = np.iinfo(np.uint64).max
+        self._a = aleatorio.integers(0, maximo, permutacoes, dtype=np.uint64, endpoint=True) | np.uint64(1)
+        self._b = aleatorio.integers(0, maximo, permutacoes, dtype=np.uint64, endpoint=True)
+        self._assinaturas = np.empty((0, permutacoes), dtype=np.uint32)
+        self._chaves: List[Hashable] = []
+        self._indices: List[Dict[int, Union[int, List[int]]]] = [{} for _ in range(bandas)]
+        self._representantes = 0
+        self._trava = threading.Lock()
+
+    @property
+    def limiar(self) -> float:
+        return self._limiar
+
+    @property
+    def representantes(self) -> int:
+        return self._representantes
+
+    @property
+    def duplicatas(self) -> int:
+        return len(self._chaves) - self._representantes
+
+    def assinar(self, texto: str) -> Optional[np.ndarray]:
+        """Assinatura MinHash do texto; None quando não há termos. Pode rodar em qualquer thread."""
+        import numpy as np
+
+        termos = tokenizar(texto)
+        if not termos:
+            return None
+        tamanho = min(self._tamanho_shingle, len(termos))
+        shingles = {
+            zlib.crc32(" ".join(termos[inicio : inicio + tamanho]).encode())
+            for inicio in range(len(termos) - tamanho + 1)
+        }
+        valores = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+        with np.errstate(over="ignore"):
+            hashes = (self._a[:, None] * valores[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashes.min(axis=1).astype(np.uint32)
+
+    def registrar(self, assinatura: Optional[np.ndarray], chave: Hashable) -> Optional[Hashable]:
+        """Devolve a chave do representante quando `assinatura` é quase duplicata dele.
+
+        Caso contrário o texto passa a representar um novo grupo sob `chave` e o
+        retorno é None. Textos sem assinatura nunca são agrupados.
+        """
+        import numpy as np
+
+        if assinatura is None:
+            return None
+        bandas = [
+            hash(assinatura[banda * self._linhas : (banda + 1) * self._linhas].tobytes())
+            for banda in range(self._bandas)
+        ]
+        with self._trava:
+            candidatos = set()
+            for indice, balde in zip(self._indices, bandas):
+                encontrados = indice.get(balde)
+                if isinstance(encontrados, list):
+                    candidatos.update(encontrados)
+                elif encontrados is not None:
+                    candidatos.add(encontrados)
+            if candidatos:
+                ordem = np.fromiter(candidatos, dtype=np.int64, count=len(candidatos))
+                similaridades = (self._assinaturas[ordem] == assinatura).mean(axis=1)
+                melhor = int(similaridades.argmax())
+                if similaridades[melhor] >= self._limiar:
+                    representante = self._chaves[int(ordem[melhor])]
+                    self._adicionar(assinatura, representante, bandas)
+                    return representante
+            self._representantes += 1
+            self._adicionar(assinatura, chave, bandas)
+        return None
+
+    def _adicionar(self, assinatura: np.ndarray, chave: Hashable, bandas: List[int]) -> None:
+        import numpy as np
+
+        posicao = len(self._chaves)
+        if posicao == len(self._assinaturas):
+            # Cresce em dobro para não copiar a matriz a cada registro.
+            maior = np.empty((max(2 * posicao, 64), self._permutacoes), dtype=np.uint32)
+            maior[:posicao] = self._assinaturas
+            self._assinaturas = maior
+        self._assinaturas[posicao] = assinatura
+        self._chaves.append(chave)
+        for indice, balde in zip(self._indices, bandas):
+            existentes = indice.get(balde)
+            if existentes is None:
+                indice[balde] = posicao
+            elif isinstance(existentes, list):
+                existentes.append(posicao)
+            else:
+                indice[balde] = [existentes, posicao]
+
+
+def criar_detector() -> Optional[DetectorDuplicatas]:
+    """Detector para um lote; SELECT_AI_DUPLICATAS=0 desliga o agrupamento."""
+    if os.getenv("SELECT_AI_DUPLICATAS", "1") != "1":
+        return None
+    return DetectorDuplicatas()
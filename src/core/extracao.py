@@ -0,0 +1,279 @@
+"""Backends de extração de texto: no próprio processo ou em um pool de processos."""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing.connection import Connection
+from typing import Any, BinaryIO, List, Optional, Tuple, Union
+
+from src.core.arquivo import MEGABYTE, ArquivoHandler, ArquivoRejeitado
+from src.core.telemetria import obter_telemetria
+
+
+def _inicializar_processo(teto_memoria: int = 0) -> None:
+    if teto_memoria:
+        try:
+            import resource
+        except ImportError:  # pragma: no cover  (Windows)
+            pass
+        else:
+            # Um PDF malicioso que escape das verificações esgota só este processo, com MemoryError.
+            resource.setrlimit(resource.RLIMIT_AS, (teto_memoria, teto_memoria))
+    import PyPDF2  # noqa: F401  (carrega o parser antes do primeiro documento)
+
+
+def _extrair_pdf(conteudo: bytes, limite_paginas: int, limite_caracteres: int) -> str:
+    return ArquivoHandler._ler_pdf(io.BytesIO(conteudo), limite_paginas, limite_caracteres)
+
+
+def _atender(conexao: Connection, teto_memoria: int) -> None:
+    """Laço de um processo de extração: um documento por vez, respondido pelo mesmo pipe."""
+    _inicializar_processo(teto_memoria)
+    conexao.send(os.getpid())
+    while True:
+        try:
+            tarefa = conexao.recv()
+        except EOFError:
+            return
+        if tarefa is None:
+            return
+        try:
+            resposta: Tuple[bool, Any] = (True, _extrair_pdf(*tarefa))
+        except Exception as exc:
+            resposta = (False, exc)
+        try:
+            conexao.send(resposta)
+        except Exception:
+            # Exceções do parser que não podem ser serializadas.
+            conexao.send((False, RuntimeError(str(resposta[1]))))
+
+
+class _ProcessoExtracao:
+    """Um processo dedicado e o pipe por onde recebe documentos."""
+
+    def __init__(self, contexto: Any, teto_memoria: int) -> None:
+        self._conexao, filho = contexto.Pipe()
+        self._processo = contexto.Process(target=_atender, args=(filho, teto_memoria), daemon=True)
+        self._processo.start()
+        filho.close()
+
+    def aguardar_pronto(self, timeout: float) -> bool:
+        try:
+            return self._conexao.poll(timeout) and bool(self._conexao.recv())
+        except (EOFError, OSError):
+            return False
+
+    def executar(self, tarefa: Tuple[bytes, int, int], timeout: float) -> Tuple[bool, Any]:
+        """Envia o documento e espera a resposta; o prazo só corre a partir daqui.
+
+        TimeoutError indica que o prazo estourou; EOFError/OSError, que o processo morreu.
+        """
+        self._conexao.send(tarefa)
+        if not self._conexao.poll(timeout):
+            raise TimeoutError
+        return self._conexao.recv()
+
+    def encerrar(self) -> None:
+        if self._processo.is_alive():
+            self._processo.kill()
+        self._processo.join(timeout=5)
+        self._conexao.close()
+
+
+class ExtratorLocal:
+    """Extrai o texto na thread de quem chama (comportamento original)."""
+
+    def ler_texto(self, arquivo: BinaryIO, nome_arquivo: str) -> str:
+        return ArquivoHandler.ler_texto(arquivo, nome_arquivo)
+
+    def encerrar(self) -> None:
+        return None
+
+
+class ExtratorProcessos:
+    """Executa a extração de PDFs em processos dedicados, pré-aquecidos.
+
+    Tira o parsing (CPU-bound, puro Python) do GIL das sessões do Streamlit.
+    Cada processo atende um documento por vez; quem chama espera um processo
+    livre e o prazo do documento só começa quando ele é entregue ao processo.
+    Ao estourar o prazo ou morrer, só aquele processo é encerrado, e um
+    substituto é criado em segundo plano, sem bloquear as demais leituras. Um
+    documento que derruba o processo duas vezes é recusado; só quando nenhum
+    processo pode ser criado a extração cai para o modo local. Cada
+    processo roda com o espaço de endereçamento limitado a `teto_memoria_mb`
+    (SELECT_AI_EXTRACAO_MEMORIA_MB, 0 = sem limite).
+    """
+
+    def __init__(
+        self,
+        max_processos: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_paginas: Optional[int] = None,
+        teto_memoria_mb: Optional[int] = None,
+    ) -> None:
+        self._max_processos = max_processos or int(
+            os.getenv("SELECT_AI_EXTRACAO_PROCESSOS", str(min(4, os.cpu_count() or 1)))
+        )
+        self._timeout = timeout or float(os.getenv("SELECT_AI_EXTRACAO_TIMEOUT", "20"))
+        self._max_paginas = ArquivoHandler.LIMITE_PAGINAS if max_paginas is None else max_paginas
+        self._teto_memoria = (
+            int(os.getenv("SELECT_AI_EXTRACAO_MEMORIA_MB", "1024")) if teto_memoria_mb is None else teto_memoria_mb
+        ) * MEGABYTE
+        self._local = ExtratorLocal()
+        self._contexto = multiprocessing.get_context("spawn")
+        self._livres: "queue.Queue[_ProcessoExtracao]" = queue.Queue()
+        self._trava = threading.Lock()
+        self._ativos = 0
+        self._encerrado = False
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._iniciar()
+
+    def ler_texto(self, arquivo: BinaryIO, nome_arquivo: str) -> str:
+        if not nome_arquivo.lower().endswith(".pdf"):
+            return self._local.ler_texto(arquivo, nome_arquivo)
+        ArquivoHandler.verificar_tamanho(arquivo)
+        conteudo = ArquivoHandler._garantir_seek(arquivo).read()
+        chave = (
+            hashlib.sha256(conteudo).hexdigest(),
+            self._max_paginas,
+            ArquivoHandler.LIMITE_CARACTERES,
+            ArquivoHandler.PRESERVAR_ACENTOS,
+        )
+        texto = ArquivoHandler._consultar_cache(chave)
+        if texto is not None:
+            return texto
+        with obter_telemetria().span("leitura", formato="pdf", processo=True) as span:
+            texto = self._extrair(conteudo, nome_arquivo)
+            span.definir(caracteres=len(texto))
+        ArquivoHandler._guardar_cache(chave, texto)
+        return texto
+
+    def encerrar(self) -> None:
+        with self._trava:
+            self._encerrado = True
+        while True:
+            try:
+                self._livres.get_nowait().encerrar()
+            except queue.Empty:
+                return
+
+    def _extrair(self, conteudo: bytes, nome_arquivo: str, repetir: bool = True) -> str:
+        processo = self._obter_processo()
+        if processo is None:
+            return self._extrair_local(conteudo)
+        try:
+            sucesso, valor = processo.executar(
+                (conteudo, self._max_paginas, ArquivoHandler.LIMITE_CARACTERES), self._timeout
+            )
+        except TimeoutError:
+            self._logger.warning(
+                "Extração de '%s' excedeu %gs; encerrando o processo que a executava.",
+                nome_arquivo,
+                self._timeout,
+            )
+            self._descartar(processo)
+            raise TimeoutError(
+                f"A leitura do PDF excedeu o limite de {self._timeout:g} segundos."
+            ) from None
+        except (EOFError, OSError):
+            self._descartar(processo)
+            if repetir:
+                return self._extrair(conteudo, nome_arquivo, repetir=False)
+            # Duas quedas no mesmo documento: em geral o teto de memória derrubou o processo.
+            # Ler localmente executaria o mesmo PDF sem teto algum.
+            self._logger.warning("Processo de extração caiu duas vezes com '%s'; documento recusado.", nome_arquivo)
+            raise ArquivoRejeitado(
+                "A leitura do PDF derrubou o processo de extração duas vezes; o arquivo foi recusado."
+            ) from None
+        if isinstance(valor, MemoryError):
+            self._descartar(processo)
+            self._logger.warning("Extração de '%s' esgotou o teto de memória do processo.", nome_arquivo)
+            raise ArquivoRejeitado(
+                f"A leitura do PDF passou do teto de {self._teto_memoria / MEGABYTE:g} MB de memória."
+            )
+        self._devolver(processo)
+        if not sucesso:
+            raise valor
+        return valor
+
+    def _extrair_local(self, conteudo: bytes) -> str:
+        return ArquivoHandler._ler_pdf(io.BytesIO(conteudo), limite_paginas=self._max_paginas)
+
+    def _iniciar(self) -> None:
+        processos: List[_ProcessoExtracao] = []
+        try:
+            processos = [_ProcessoExtracao(self._contexto, self._teto_memoria) for _ in range(self._max_processos)]
+            if not all(processo.aguardar_pronto(60) for processo in processos):
+                raise RuntimeError("processo não respondeu ao aquecimento")
+        except Exception as exc:  # pragma: no cover
+            self._logger.warning("Não foi possível iniciar os processos de extração (%s); usando modo local.", exc)
+            for processo in processos:
+                processo.encerrar()
+            return
+        for processo in processos:
+            self._livres.put(processo)
+        self._ativos = len(processos)
+        self._logger.info("Extração iniciada com %d processos.", self._max_processos)
+
+    def _obter_processo(self) -> Optional[_ProcessoExtracao]:
+        """Espera um processo livre; None quando não há nenhum vivo (modo local)."""
+        while True:
+            with self._trava:
+                if self._encerrado or self._ativos == 0:
+                    return None
+            try:
+                return self._livres.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    def _devolver(self, processo: _ProcessoExtracao) -> None:
+        with self._trava:
+            encerrado = self._encerrado
+        if encerrado:
+            processo.encerrar()
+        else:
+            self._livres.put(processo)
+
+    def _descartar(self, processo: _ProcessoExtracao) -> None:
+        """Encerra só este processo e cria o substituto fora do caminho de quem chama."""
+        processo.encerrar()
+        threading.Thread(target=self._repor, name="repor-extracao", daemon=True).start()
+
+    def _repor(self) -> None:
+        try:
+            processo = _ProcessoExtracao(self._contexto, self._teto_memoria)
+            pronto = processo.aguardar_pronto(60)
+        except Exception as exc:  # pragma: no cover
+            self._logger.warning("Não foi possível repor o processo de extração: %s", exc)
+            pronto, processo = False, None
+        if not pronto:
+            if processo is not None:
+                processo.encerrar()
+            with self._trava:
+                self._ativos -= 1
+                restantes = self._ativos
+            self._logger.warning("Processo de extração não foi reposto; restam %d.", restantes)
+            return
+        self._devolver(processo)
+
+
+Extrator = Union[ExtratorLocal, ExtratorProcessos]
+
+_EXTRATOR_GLOBAL: Optional[Extrator] = None
+_TRAVA_GLOBAL = threading.Lock()
+
+
+def obter_extrator() -> Extrator:
+    """Extrator do processo conforme SELECT_AI_EXTRACAO (local ou processos)."""
+    global _EXTRATOR_GLOBAL
+    with _TRAVA_GLOBAL:
+        if _EXTRATOR_GLOBAL is None:
+            modo = os.getenv("SELECT_AI_EXTRACAO", "local").strip().lower()
+            _EXTRATOR_GLOBAL = ExtratorProcessos() if modo == "processos" else ExtratorLocal()
+        return _EXTRATOR_GLOBAL
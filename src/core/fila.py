@@ -0,0 +1,261 @@
+"""Fila local de tarefas em segundo plano, compartilhada por todas as sessões do processo."""
+
+from __future__ import annotations
+
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+CANCELADA = "cancelada"
+ERRO = "erro"
+
+FINALIZADOS = (CONCLUIDA, CANCELADA, ERRO)
+
+
+class TarefaCancelada(Exception):
+    """Levantada dentro da tarefa quando o cancelamento foi pedido."""
+
+
+class Tarefa:
+    """Uma análise enfileirada, com progresso e resultado parcial consultáveis de outra thread.
+
+    A função da tarefa recebe o próprio objeto e informa o andamento com
+    `atualizar`/`publicar`; o cancelamento é cooperativo, verificado por
+    `verificar_cancelamento` entre as etapas.
+    """
+
+    def __init__(
+        self,
+        tipo: str,
+        funcao: Callable[["Tarefa"], Any],
+        descricao: str,
+        prioridade: int,
+        dono: Optional[str],
+    ) -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.tipo = tipo
+        self.descricao = descricao
+        self.prioridade = prioridade
+        self.dono = dono
+        self.status = PENDENTE
+        self.feito = 0
+        self.total = 0
+        self.mensagem = ""
+        self.parcial: Any = None
+        self.resultado: Any = None
+        self.erro = ""
+        self.criada_em = time.time()
+        self.iniciada_em: Optional[float] = None
+        self.finalizada_em: Optional[float] = None
+        self._funcao = funcao
+        self._contexto = contextvars.copy_context()
+        self._cancelamento = threading.Event()
+        self._fim = threading.Event()
+        self._trava = threading.Lock()
+
+    @property
+    def cancelamento_pedido(self) -> bool:
+        return self._cancelamento.is_set()
+
+    @property
+    def finalizada(self) -> bool:
+        return self.status in FINALIZADOS
+
+    @property
+    def progresso(self) -> float:
+        if self.status == CONCLUIDA:
+            return 1.0
+        return min(self.feito / self.total, 1.0) if self.total else 0.0
+
+    def atualizar(
+        self, feito: Optional[int] = None, total: Optional[int] = None, mensagem: Optional[str] = None
+    ) -> None:
+        with self._trava:
+            if feito is not None:
+                self.feito = feito
+            if total is not None:
+                self.total = total
+            if mensagem is not None:
+                self.mensagem = mensagem
+
+    def publicar(self, parcial: Any) -> None:
+        """Disponibiliza um resultado parcial para quem acompanha a tarefa."""
+        with self._trava:
+            self.parcial = parcial
+
+    def verificar_cancelamento(self) -> None:
+        if self._cancelamento.is_set():
+            raise TarefaCancelada(self.id)
+
+    def aguardar(self, timeout: Optional[float] = None) -> bool:
+        return self._fim.wait(timeout)
+
+    def como_dict(self) -> Dict[str, Any]:
+        with self._trava:
+            return {
+                "ID": self.id,
+                "Tipo": self.tipo,
+                "Descrição": self.descricao,
+                "Prioridade": self.prioridade,
+                "Status": self.status,
+                "Progresso": f"{self.feito}/{self.total}" if self.total else "",
+                "Mensagem": self.mensagem,
+                "Espera (s)": round((self.iniciada_em or time.time()) - self.criada_em, 1),
+                "Duração (s)": round((self.finalizada_em or time.time()) - self.iniciada_em, 1)
+                if self.iniciada_em
+                else None,
+            }
+
+    def _executar(self) -> None:
+        if self.finalizada:
+            # Cancelada enquanto saía da fila.
+            return
+        with self._trava:
+            self.status = EXECUTANDO
+            self.iniciada_em = time.time()
+        try:
+            self.verificar_cancelamento()
+            resultado = self._contexto.run(self._funcao, self)
+        except TarefaCancelada:
+            self._finalizar(CANCELADA)
+        except Exception as exc:
+            logging.getLogger(FilaTarefas.__name__).exception("Tarefa %s (%s) falhou: %s", self.id, self.tipo, exc)
+            self._finalizar(ERRO, erro=str(exc))
+        else:
+            self._finalizar(CANCELADA if self._cancelamento.is_set() else CONCLUIDA, resultado=resultado)
+
+    def _finalizar(self, status: str, resultado: Any = None, erro: str = "") -> None:
+        with self._trava:
+            self.status = status
+            self.resultado = resultado
+            self.erro = erro
+            self.finalizada_em = time.time()
+        self._fim.set()
+
+
+class FilaTarefas:
+    """Pool de threads que atende tarefas por prioridade (maior primeiro) e ordem de chegada.
+
+    As tarefas sobrevivem aos reruns do Streamlit porque vivem no processo, não
+    na sessão; qualquer sessão pode listar a fila e cancelar tarefas pelo ID.
+    As finalizadas mais antigas são descartadas além de `max_finalizadas`.
+    """
+
+    def __init__(self, max_trabalhadores: int = 2, max_finalizadas: int = 200) -> None:
+        if max_trabalhadores < 1:
+            raise ValueError("A fila precisa de pelo menos 1 trabalhador.")
+        self._max_finalizadas = max_finalizadas
+        self._heap: List[Tuple[int, int, Tarefa]] = []
+        self._tarefas: "OrderedDict[str, Tarefa]" = OrderedDict()
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._encerrada = False
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._trabalhadores = [
+            threading.Thread(target=self._trabalhar, name=f"fila-{indice}", daemon=True)
+            for indice in range(max_trabalhadores)
+        ]
+        for trabalhador in self._trabalhadores:
+            trabalhador.start()
+
+    def enviar(
+        self,
+        tipo: str,
+        funcao: Callable[[Tarefa], Any],
+        descricao: str = "",
+        prioridade: int = 0,
+        dono: Optional[str] = None,
+    ) -> Tarefa:
+        tarefa = Tarefa(tipo, funcao, descricao, prioridade, dono)
+        with self._condicao:
+            if self._encerrada:
+                raise RuntimeError("A fila de tarefas foi encerrada.")
+            self._tarefas[tarefa.id] = tarefa
+            heapq.heappush(self._heap, (-prioridade, next(self._sequencia), tarefa))
+            self._descartar_antigas()
+            self._condicao.notify()
+        self._logger.info("Tarefa %s (%s, prioridade %d) enfileirada.", tarefa.id, tipo, prioridade)
+        return tarefa
+
+    def obter(self, id_tarefa: str) -> Optional[Tarefa]:
+        with self._condicao:
+            return self._tarefas.get(id_tarefa)
+
+    def listar(self) -> List[Tarefa]:
+        """Tarefas conhecidas, das mais recentes para as mais antigas."""
+        with self._condicao:
+            return list(reversed(self._tarefas.values()))
+
+    def posicao(self, id_tarefa: str) -> Optional[int]:
+        """Posição (1 = próxima) de uma tarefa pendente na fila."""
+        with self._condicao:
+            ordem = sorted(item for item in self._heap if item[2].status == PENDENTE)
+        for posicao, (_, _, tarefa) in enumerate(ordem, start=1):
+            if tarefa.id == id_tarefa:
+                return posicao
+        return None
+
+    def cancelar(self, id_tarefa: str) -> bool:
+        """Pede o cancelamento; pendentes saem da fila na hora, em execução param na próxima etapa."""
+        with self._condicao:
+            tarefa = self._tarefas.get(id_tarefa)
+            if tarefa is None or tarefa.finalizada:
+                return False
+            tarefa._cancelamento.set()
+            if tarefa.status == PENDENTE:
+                self._heap = [item for item in self._heap if item[2] is not tarefa]
+                heapq.heapify(self._heap)
+                tarefa._finalizar(CANCELADA)
+        self._logger.info("Cancelamento pedido para a tarefa %s.", id_tarefa)
+        return True
+
+    def encerrar(self, aguardar: bool = True) -> None:
+        with self._condicao:
+            self._encerrada = True
+            for _, _, tarefa in self._heap:
+                tarefa._cancelamento.set()
+                tarefa._finalizar(CANCELADA)
+            self._heap.clear()
+            self._condicao.notify_all()
+        if aguardar:
+            for trabalhador in self._trabalhadores:
+                trabalhador.join()
+
+    def _trabalhar(self) -> None:
+        while True:
+            with self._condicao:
+                while not self._heap and not self._encerrada:
+                    self._condicao.wait()
+                if self._encerrada and not self._heap:
+                    return
+                _, _, tarefa = heapq.heappop(self._heap)
+            tarefa._executar()
+
+    def _descartar_antigas(self) -> None:
+        finalizadas = [id_tarefa for id_tarefa, tarefa in self._tarefas.items() if tarefa.finalizada]
+        for id_tarefa in finalizadas[: max(len(finalizadas) - self._max_finalizadas, 0)]:
+            del self._tarefas[id_tarefa]
+
+
+_FILA_GLOBAL: Optional[FilaTarefas] = None
+_TRAVA_GLOBAL = threading.Lock()
+
+
+def obter_fila() -> FilaTarefas:
+    """Fila do processo; SELECT_AI_FILA_TRABALHADORES define quantas tarefas rodam ao mesmo tempo."""
+    global _FILA_GLOBAL
+    with _TRAVA_GLOBAL:
+        if _FILA_GLOBAL is None:
+            _FILA_GLOBAL = FilaTarefas(max_trabalhadores=int(os.getenv("SELECT_AI_FILA_TRABALHADORES", "2")))
+        return _FILA_GLOBAL
@@ -0,0 +1,85 @@
+"""Limitador de taxa compartilhado pelas chamadas ao Gemini no processo."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Optional
+
+
+class LimitadorTaxa:
+    """Token bucket duplo: requisições por minuto e tokens por minuto.
+
+    Cada chamada reserva sua cota imediatamente (o saldo pode ficar negativo)
+    e recebe o tempo que precisa aguardar, o que mantém a ordem de chegada
+    entre threads e event loops distintos. Limites iguais a zero desativam o
+    respectivo balde.
+    """
+
+    def __init__(self, requisicoes_por_minuto: float = 0, tokens_por_minuto: float = 0) -> None:
+        self._rpm = float(requisicoes_por_minuto)
+        self._tpm = float(tokens_por_minuto)
+        self._saldo_requisicoes = self._rpm
+        self._saldo_tokens = self._tpm
+        self._ultima_recarga = time.monotonic()
+        self._trava = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self._rpm > 0 or self._tpm > 0
+
+    def reservar(self, tokens: int = 0) -> float:
+        """Debita a cota e devolve quantos segundos esperar antes da chamada."""
+        if not self.ativo:
+            return 0.0
+        with self._trava:
+            self._recarregar()
+            espera = 0.0
+            if self._rpm > 0:
+                self._saldo_requisicoes -= 1
+                if self._saldo_requisicoes < 0:
+                    espera = max(espera, -self._saldo_requisicoes * 60.0 / self._rpm)
+            if self._tpm > 0 and tokens:
+                self._saldo_tokens -= min(tokens, self._tpm)
+                if self._saldo_tokens < 0:
+                    espera = max(espera, -self._saldo_tokens * 60.0 / self._tpm)
+            return espera
+
+    def aguardar(self, tokens: int = 0) -> float:
+        espera = self.reservar(tokens)
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    async def aguardar_async(self, tokens: int = 0) -> float:
+        espera = self.reservar(tokens)
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return espera
+
+    def _recarregar(self) -> None:
+        agora = time.monotonic()
+        decorrido = agora - self._ultima_recarga
+        self._ultima_recarga = agora
+        if self._rpm > 0:
+            self._saldo_requisicoes = min(self._rpm, self._saldo_requisicoes + decorrido * self._rpm / 60.0)
+        if self._tpm > 0:
+            self._saldo_tokens = min(self._tpm, self._saldo_tokens + decorrido * self._tpm / 60.0)
+
+
+_LIMITADOR_GLOBAL: Optional[LimitadorTaxa] = None
+_TRAVA_GLOBAL = threading.Lock()
+
+
+def obter_limitador() -> LimitadorTaxa:
+    """Instância única do processo, configurada por GEMINI_RPM e GEMINI_TPM."""
+    global _LIMITADOR_GLOBAL
+    with _TRAVA_GLOBAL:
+        if _LIMITADOR_GLOBAL is None:
+            _LIMITADOR_GLOBAL = LimitadorTaxa(
+                requisicoes_por_minuto=float(os.getenv("GEMINI_RPM", "0")),
+                tokens_por_minuto=float(os.getenv("GEMINI_TPM", "0")),
+            )
+        return _LIMITADOR_GLOBAL
@@ -0,0 +1,476 @@
+"""Triagem em lote de vários currículos contra uma única vaga."""
+
+from __future__ import annotations
+
+import contextvars
+import io
+import itertools
+import logging
+import os
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.core.acervo import AcervoAnalises, obter_acervo
+from src.core.agente import AgenteAnalisador
+from src.core.arquivo import MEGABYTE, ArquivoHandler, ArquivoRejeitado
+from src.core.cascata import AnalisadorCascata, criar_cascata
+from src.core.duplicatas import DetectorDuplicatas, criar_detector
+from src.core.extracao import obter_extrator
+from src.core.prefiltro import PreFiltro
+from src.core.sessao_vaga import SessaoVaga
+
+
+EXTENSOES_SUPORTADAS = (".pdf", ".txt")
+
+AnalisarDocumento = Callable[[str, str], Dict[str, Any]]
+
+
+@dataclass
+class DocumentoLote:
+    """Currículo já carregado em memória, pronto para leitura.
+
+    `erro` marca um arquivo recusado antes de ser lido (ex.: acima do limite
+    de tamanho); ele aparece no resultado do lote como falha de leitura.
+    `referencia` é um identificador livre de quem chama (ex.: o digest do
+    arquivo), devolvido em `ResultadoLote.referencia`, já que nomes podem se
+    repetir no mesmo lote.
+    """
+
+    nome: str
+    conteudo: bytes
+    erro: str = ""
+    referencia: Optional[str] = None
+
+
+@dataclass
+class ResultadoLote:
+    """Situação de um currículo dentro do lote."""
+
+    nome_arquivo: str
+    status: str
+    resultado: Dict[str, Any] = field(default_factory=dict)
+    erro: str = ""
+    duracao: float = 0.0
+    pontuacao_preliminar: Optional[float] = None
+    duplicata_de: Optional[str] = None
+    referencia: Optional[str] = None
+
+    @property
+    def pontuacao(self) -> int:
+        try:
+            return int(self.resultado.get("pontuacao_compatibilidade", 0) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def como_linha(self) -> Dict[str, Any]:
+        return {
+            "Arquivo": self.nome_arquivo,
+            "Compatibilidade": self.pontuacao if self.status == "concluido" else None,
+            "Pré-filtro": None if self.pontuacao_preliminar is None else round(self.pontuacao_preliminar, 1),
+            "Status": self.status,
+            "Duplicata de": self.duplicata_de or "",
+            "Camada": self.resultado.get("cascata", {}).get("camada", ""),
+            "Tempo (s)": round(self.duracao, 2),
+            "Erro": self.erro,
+        }
+
+    def copiar_para(
+        self, nome_arquivo: str, duracao: float, referencia: Optional[str] = None
+    ) -> "ResultadoLote":
+        """Mesmo resultado atribuído a uma quase duplicata deste currículo."""
+        return ResultadoLote(
+            nome_arquivo,
+            self.status,
+            resultado=dict(self.resultado),
+            erro=self.erro,
+            duracao=duracao,
+            pontuacao_preliminar=self.pontuacao_preliminar,
+            duplicata_de=self.nome_arquivo,
+            referencia=referencia,
+        )
+
+
+def expandir_arquivos(arquivos: Iterable[Any]) -> List[DocumentoLote]:
+    """Converte uploads (PDF, TXT ou ZIP) em documentos individuais.
+
+    Arquivos acima do limite de tamanho não são lidos e viram documentos com
+    `erro`. Num ZIP, cada currículo é descomprimido no máximo até o limite e o
+    total expandido fica em SELECT_AI_MAX_ZIP_MB, o que barra bombas de
+    compressão mesmo quando o cabeçalho mente o tamanho.
+    """
+    limite_zip = int(float(os.getenv("SELECT_AI_MAX_ZIP_MB", "200")) * MEGABYTE)
+    documentos: List[DocumentoLote] = []
+    for arquivo in arquivos:
+        nome = getattr(arquivo, "name", "desconhecido")
+        compactado = nome.lower().endswith(".zip")
+        try:
+            ArquivoHandler.verificar_tamanho(arquivo, limite_zip if compactado else None)
+        except ArquivoRejeitado as exc:
+            documentos.append(DocumentoLote(nome=nome, conteudo=b"", erro=str(exc)))
+            continue
+        if compactado:
+            documentos.extend(_extrair_zip(arquivo.read(), limite_zip))
+        else:
+            documentos.append(DocumentoLote(nome=nome, conteudo=arquivo.read()))
+    return documentos
+
+
+def _extrair_zip(conteudo: bytes, orcamento: int) -> List[DocumentoLote]:
+    limite = ArquivoHandler.LIMITE_BYTES
+    documentos: List[DocumentoLote] = []
+    with zipfile.ZipFile(io.BytesIO(conteudo)) as pacote:
+        for info in pacote.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(EXTENSOES_SUPORTADAS):
+                continue
+            nome = os.path.basename(info.filename)
+            maximo = min(limite, orcamento) if limite else orcamento
+            erro = ""
+            if info.file_size > maximo:
+                erro = (
+                    f"O arquivo tem {info.file_size / MEGABYTE:.1f} MB descomprimido; "
+                    f"o limite é de {maximo / MEGABYTE:.3g} MB."
+                )
+            else:
+                with pacote.open(info) as membro:
+                    # O tamanho do cabeçalho pode ser falso: a leitura nunca passa do máximo.
+                    dados = membro.read(maximo + 1)
+                if len(dados) > maximo:
+                    erro = f"O arquivo descomprimido passa do limite de {maximo / MEGABYTE:.3g} MB."
+            if erro:
+                documentos.append(DocumentoLote(nome=nome, conteudo=b"", erro=erro))
+                continue
+            orcamento -= len(dados)
+            documentos.append(DocumentoLote(nome=nome, conteudo=dados))
+    return documentos
+
+
+def ranquear(resultados: Iterable[ResultadoLote]) -> List[ResultadoLote]:
+    """Ordena por compatibilidade; descartados pelo pré-filtro e falhas vão ao final."""
+    ordem_status = {"concluido": 0, "filtrado": 1}
+    return sorted(
+        resultados,
+        key=lambda item: (
+            ordem_status.get(item.status, 2),
+            -item.pontuacao,
+            -(item.pontuacao_preliminar or 0.0),
+            item.nome_arquivo,
+        ),
+    )
+
+
+class AnalisadorLote:
+    """Lê currículos em paralelo e limita as chamadas simultâneas ao Gemini.
+
+    Currículos quase idênticos no mesmo lote (o candidato que se inscreve mais
+    de uma vez com PDFs levemente diferentes) são agrupados antes da análise:
+    só o primeiro de cada grupo vai ao modelo e os demais recebem o resultado
+    dele, com `duplicata_de` apontando o arquivo analisado.
+
+    Com a cascata ativa (SELECT_AI_CASCATA=1), cada currículo passa antes por
+    um modelo de triagem e só os da faixa configurada recebem a análise
+    completa; o pré-filtro local, quando usado, funciona como camada zero.
+    """
+
+    def __init__(
+        self,
+        agente: AgenteAnalisador,
+        max_concorrencia: Optional[int] = None,
+        max_leitores: Optional[int] = None,
+        acervo: Optional[AcervoAnalises] = None,
+        cascata: Optional[AnalisadorCascata] = None,
+    ) -> None:
+        limite = max_concorrencia or int(os.getenv("SELECT_AI_CONCORRENCIA", "4"))
+        if limite < 1:
+            raise ValueError("A concorrência do lote deve ser de pelo menos 1.")
+        self._agente = agente
+        self._max_concorrencia = limite
+        self._max_leitores = max_leitores or min(8, os.cpu_count() or 1)
+        self._usar_sessao = os.getenv("SELECT_AI_SESSAO_VAGA", "1") == "1"
+        self._acervo = acervo or obter_acervo()
+        self._cascata = cascata or criar_cascata(agente)
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def max_concorrencia(self) -> int:
+        return self._max_concorrencia
+
+    @property
+    def cascata(self) -> Optional[AnalisadorCascata]:
+        return self._cascata
+
+    def analisar(
+        self,
+        documentos: Iterable[DocumentoLote],
+        texto_vaga: str,
+        top_k: Optional[int] = None,
+        limiar: Optional[float] = None,
+    ) -> Iterator[ResultadoLote]:
+        """Entrega cada resultado assim que sua análise termina.
+
+        Com `top_k` ou `limiar`, todos os currículos são lidos e pontuados pelo
+        pré-filtro local antes do envio; só os selecionados chegam ao Gemini.
+        """
+        vaga = ArquivoHandler.limpar_texto(texto_vaga)
+        sessao = self._agente.abrir_sessao(texto_vaga) if self._usar_sessao else None
+        try:
+            analisar = self._preparar(sessao, vaga, texto_vaga)
+            yield from self._processar(list(documentos), vaga, analisar, top_k, limiar)
+        finally:
+            if sessao is not None:
+                sessao.encerrar()
+
+    def analisar_continuo(self, documentos: Iterable[DocumentoLote], texto_vaga: str) -> Iterator[ResultadoLote]:
+        """Variante sem pré-filtro que consome `documentos` sob demanda.
+
+        No máximo o dobro da concorrência fica em memória ao mesmo tempo, o que
+        permite processar diretórios grandes ou uma entrada contínua (stdin).
+        Quase duplicatas não ocupam trabalhadores: recebem a cópia do resultado
+        do representante quando ele termina. Só os resultados dos últimos
+        SELECT_AI_DUPLICATAS_JANELA representantes ficam guardados; uma
+        duplicata de um representante mais antigo é analisada de novo.
+        """
+        vaga = ArquivoHandler.limpar_texto(texto_vaga)
+        sessao = self._agente.abrir_sessao(texto_vaga) if self._usar_sessao else None
+        analisar = self._preparar(sessao, vaga, texto_vaga)
+        limite = 2 * self._max_concorrencia
+        detector = criar_detector()
+        janela = int(os.getenv("SELECT_AI_DUPLICATAS_JANELA", "256"))
+        # Chaves são o representante do grupo (posição na entrada): resultados recentes e cópias à espera.
+        finais: "OrderedDict[int, ResultadoLote]" = OrderedDict()
+        copias: Dict[int, List[Tuple[str, Optional[str], float]]] = {}
+        posicoes = itertools.count()
+        pendentes: Dict[Future, Tuple[str, int, str, Optional[str], float]] = {}
+        try:
+            with ThreadPoolExecutor(self._max_concorrencia, thread_name_prefix="lote-continuo") as executor:
+                restantes = iter(documentos)
+                esgotado = False
+                while True:
+                    while not esgotado and len(pendentes) < limite:
+                        documento = next(restantes, None)
+                        if documento is None:
+                            esgotado = True
+                            break
+                        futuro = executor.submit(self._ler_e_assinar, documento, detector)
+                        pendentes[futuro] = (
+                            "leitura", next(posicoes), documento.nome, documento.referencia, time.perf_counter()
+                        )
+                    if not pendentes:
+                        return
+                    concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        etapa, chave, nome, referencia, inicio = pendentes.pop(futuro)
+                        if etapa == "analise":
+                            resultado = futuro.result()
+                            yield resultado
+                            if detector is not None:
+                                finais[chave] = resultado
+                                while len(finais) > janela:
+                                    finais.popitem(last=False)
+                            for nome_copia, referencia_copia, inicio_copia in copias.pop(chave, []):
+                                yield resultado.copiar_para(
+                                    nome_copia, time.perf_counter() - inicio_copia, referencia_copia
+                                )
+                            continue
+                        try:
+                            texto, assinatura = futuro.result()
+                        except Exception as exc:
+                            self._logger.warning("Falha ao ler '%s': %s", nome, exc)
+                            yield ResultadoLote(
+                                nome, "erro_leitura", erro=str(exc), duracao=time.perf_counter() - inicio,
+                                referencia=referencia,
+                            )
+                            continue
+                        original = detector.registrar(assinatura, chave) if detector is not None else None
+                        if original is not None:
+                            chave = original
+                            if original in finais:
+                                finais.move_to_end(original)
+                                yield finais[original].copiar_para(nome, time.perf_counter() - inicio, referencia)
+                                continue
+                            if original in copias:
+                                copias[original].append((nome, referencia, inicio))
+                                continue
+                        copias[chave] = []
+                        proximo = executor.submit(
+                            contextvars.copy_context().run,
+                            self._analisar_lido, nome, texto, analisar, inicio, referencia,
+                        )
+                        pendentes[proximo] = ("analise", chave, nome, referencia, inicio)
+        finally:
+            for futuro in pendentes:
+                futuro.cancel()
+            if sessao is not None:
+                sessao.encerrar()
+
+    def _preparar(self, sessao: Optional[SessaoVaga], vaga: str, texto_vaga: str) -> AnalisarDocumento:
+        """Análise de um currículo já lido: sessão ou agente, com a cascata à frente quando ativa."""
+        analisar = sessao.analisar if sessao is not None else partial(self._agente.analisar, texto_vaga=vaga)
+        if self._cascata is not None:
+            analisar = self._cascata.envolver(analisar, vaga)
+        return self._arquivando(analisar, texto_vaga)
+
+    def _arquivando(self, analisar: Callable[[str], Dict[str, Any]], texto_vaga: str) -> AnalisarDocumento:
+        """Adapta `analisar` para receber o nome do arquivo e, com o acervo ativo, gravar o resultado."""
+        acervo = self._acervo
+
+        def analisar_documento(texto: str, nome: str) -> Dict[str, Any]:
+            resultado = analisar(texto)
+            if acervo is not None:
+                acervo.registrar(texto, texto_vaga, resultado, nome=nome)
+            return resultado
+
+        return analisar_documento
+
+    def _analisar_lido(
+        self, nome: str, texto: str, analisar: AnalisarDocumento, inicio: float, referencia: Optional[str] = None
+    ) -> ResultadoLote:
+        try:
+            resultado = analisar(texto, nome)
+        except Exception as exc:
+            self._logger.warning("Falha ao analisar '%s': %s", nome, exc)
+            return ResultadoLote(
+                nome, "erro_modelo", erro=str(exc), duracao=time.perf_counter() - inicio, referencia=referencia
+            )
+        return ResultadoLote(
+            nome, "concluido", resultado=resultado, duracao=time.perf_counter() - inicio, referencia=referencia
+        )
+
+    def _processar(
+        self,
+        documentos: List[DocumentoLote],
+        vaga: str,
+        analisar: AnalisarDocumento,
+        top_k: Optional[int],
+        limiar: Optional[float],
+    ) -> Iterator[ResultadoLote]:
+        filtrar = top_k is not None or limiar is not None
+        detector = criar_detector()
+        self._logger.info(
+            "Lote iniciado com %d currículos (concorrência %d, pré-filtro %s).",
+            len(documentos),
+            self._max_concorrencia,
+            "ativo" if filtrar else "inativo",
+        )
+        # Quase duplicatas aguardam o resultado do original (chaves são posições em `documentos`).
+        copias: Dict[int, List[Tuple[DocumentoLote, float]]] = {}
+        finais: Dict[int, ResultadoLote] = {}
+
+        def entregar(posicao: int, resultado: ResultadoLote) -> Iterator[ResultadoLote]:
+            yield resultado
+            if detector is not None:
+                finais[posicao] = resultado
+                for copia, inicio in copias.pop(posicao, []):
+                    yield resultado.copiar_para(copia.nome, time.perf_counter() - inicio, copia.referencia)
+
+        with ThreadPoolExecutor(self._max_leitores, thread_name_prefix="lote-leitura") as leitores, \
+                ThreadPoolExecutor(self._max_concorrencia, thread_name_prefix="lote-gemini") as analistas:
+            pendentes: Dict[Future, Tuple[str, int, float, Optional[float]]] = {}
+            for posicao, documento in enumerate(documentos):
+                futuro = leitores.submit(self._ler_e_assinar, documento, detector)
+                pendentes[futuro] = ("leitura", posicao, time.perf_counter(), None)
+            lidos: List[Tuple[int, str, float]] = []
+            try:
+                while pendentes:
+                    concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        etapa, posicao, inicio, preliminar = pendentes.pop(futuro)
+                        documento = documentos[posicao]
+                        if etapa == "leitura":
+                            try:
+                                texto, assinatura = futuro.result()
+                            except Exception as exc:
+                                self._logger.warning("Falha ao ler '%s': %s", documento.nome, exc)
+                                yield ResultadoLote(
+                                    documento.nome, "erro_leitura", erro=str(exc),
+                                    duracao=time.perf_counter() - inicio, referencia=documento.referencia,
+                                )
+                                continue
+                            original = detector.registrar(assinatura, posicao) if detector is not None else None
+                            if original is not None:
+                                if original in finais:
+                                    yield finais[original].copiar_para(
+                                        documento.nome, time.perf_counter() - inicio, documento.referencia
+                                    )
+                                else:
+                                    copias.setdefault(original, []).append((documento, inicio))
+                                continue
+                            if filtrar:
+                                lidos.append((posicao, texto, inicio))
+                                continue
+                            proximo = analistas.submit(
+                                contextvars.copy_context().run, analisar, texto, documento.nome
+                            )
+                            pendentes[proximo] = ("analise", posicao, inicio, None)
+                            continue
+                        duracao = time.perf_counter() - inicio
+                        try:
+                            resultado = futuro.result()
+                        except Exception as exc:
+                            self._logger.warning("Falha ao analisar '%s': %s", documento.nome, exc)
+                            yield from entregar(
+                                posicao,
+                                ResultadoLote(
+                                    documento.nome, "erro_modelo", erro=str(exc), duracao=duracao,
+                                    pontuacao_preliminar=preliminar, referencia=documento.referencia,
+                                ),
+                            )
+                            continue
+                        yield from entregar(
+                            posicao,
+                            ResultadoLote(
+                                documento.nome, "concluido", resultado=resultado, duracao=duracao,
+                                pontuacao_preliminar=preliminar, referencia=documento.referencia,
+                            ),
+                        )
+                    if filtrar and not any(item[0] == "leitura" for item in pendentes.values()):
+                        filtrar = False
+                        pontuacoes = PreFiltro(vaga).pontuar([texto for _, texto, _ in lidos])
+                        selecionados = set(PreFiltro.selecionar(pontuacoes, top_k=top_k, limiar=limiar))
+                        self._logger.info(
+                            "Pré-filtro selecionou %d de %d currículos.", len(selecionados), len(lidos)
+                        )
+                        for indice, (posicao, texto, inicio) in enumerate(lidos):
+                            preliminar = float(pontuacoes[indice])
+                            documento = documentos[posicao]
+                            if indice in selecionados:
+                                proximo = analistas.submit(
+                                    contextvars.copy_context().run, analisar, texto, documento.nome
+                                )
+                                pendentes[proximo] = ("analise", posicao, inicio, preliminar)
+                            else:
+                                yield from entregar(
+                                    posicao,
+                                    ResultadoLote(
+                                        documento.nome, "filtrado",
+                                        duracao=time.perf_counter() - inicio,
+                                        pontuacao_preliminar=preliminar, referencia=documento.referencia,
+                                    ),
+                                )
+                        lidos = []
+            finally:
+                # Encerrado antes do fim (ex.: cancelamento): não inicia o que ficou na fila.
+                for futuro in pendentes:
+                    futuro.cancel()
+        if detector is not None and detector.duplicatas:
+            self._logger.info(
+                "%d quase duplicatas reaproveitaram a análise de outro currículo do lote.", detector.duplicatas
+            )
+
+    @staticmethod
+    def _ler_e_assinar(documento: DocumentoLote, detector: Optional[DetectorDuplicatas]) -> Tuple[str, Any]:
+        texto = AnalisadorLote._ler(documento)
+        return texto, detector.assinar(texto) if detector is not None else None
+
+    @staticmethod
+    def _ler(documento: DocumentoLote) -> str:
+        if documento.erro:
+            raise ArquivoRejeitado(documento.erro)
+        texto = obter_extrator().ler_texto(io.BytesIO(documento.conteudo), documento.nome)
+        if not texto:
+            raise ValueError("Nenhum texto extraído do arquivo.")
+        return texto
@@ -0,0 +1,260 @@
+"""Comparação de um currículo com várias vagas, agrupando vagas por chamada ao modelo."""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from src.core.acervo import AcervoAnalises, obter_acervo
+from src.core.arquivo import ArquivoHandler
+from src.core.orcamento import OrcamentoPrompt, estimar_tokens, recortar_curriculo
+from src.core.prefiltro import PreFiltro, cobertura_vagas
+from src.core.resposta import ESQUEMA_RESPOSTA_VAGAS, PADRAO_CERCA, reparar_json
+
+
+@dataclass
+class ResultadoVaga:
+    """Situação de uma vaga na comparação com o currículo."""
+
+    titulo: str
+    status: str
+    resultado: Dict[str, Any] = field(default_factory=dict)
+    erro: str = ""
+    duracao: float = 0.0
+    pontuacao_preliminar: Optional[float] = None
+
+    @property
+    def pontuacao(self) -> int:
+        try:
+            return int(self.resultado.get("pontuacao_compatibilidade", 0) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    def como_linha(self) -> Dict[str, Any]:
+        return {
+            "Vaga": self.titulo,
+            "Compatibilidade": self.pontuacao if self.status == "concluido" else None,
+            "Cobertura (%)": None if self.pontuacao_preliminar is None else round(self.pontuacao_preliminar, 1),
+            "Status": self.status,
+            "Tempo (s)": round(self.duracao, 2),
+            "Erro": self.erro,
+        }
+
+
+def ranquear_vagas(resultados: Iterable[ResultadoVaga]) -> List[ResultadoVaga]:
+    """Ordena por compatibilidade; vagas fora da pré-seleção e falhas vão ao final."""
+    ordem_status = {"concluido": 0, "filtrado": 1}
+    return sorted(
+        resultados,
+        key=lambda item: (
+            ordem_status.get(item.status, 2),
+            -item.pontuacao,
+            -(item.pontuacao_preliminar or 0.0),
+            item.titulo,
+        ),
+    )
+
+
+class AnalisadorMultiVaga:
+    """Pontua um currículo contra N vagas com poucas chamadas ao Gemini.
+
+    O currículo é normalizado uma vez, as vagas são pré-ranqueadas localmente
+    pela cobertura dos seus termos e as selecionadas seguem em grupos de
+    `vagas_por_chamada`: cada chamada leva o currículo uma única vez e devolve
+    uma avaliação por vaga. Vagas que faltarem na resposta (ex.: saída
+    truncada) são analisadas individualmente.
+    """
+
+    def __init__(
+        self,
+        agente: Any,
+        vagas_por_chamada: Optional[int] = None,
+        max_concorrencia: Optional[int] = None,
+        acervo: Optional[AcervoAnalises] = None,
+    ) -> None:
+        por_chamada = vagas_por_chamada or int(os.getenv("SELECT_AI_VAGAS_POR_CHAMADA", "5"))
+        limite = max_concorrencia or int(os.getenv("SELECT_AI_CONCORRENCIA", "4"))
+        if por_chamada < 1 or limite < 1:
+            raise ValueError("Vagas por chamada e concorrência devem ser de pelo menos 1.")
+        self._agente = agente
+        self._vagas_por_chamada = por_chamada
+        self._max_concorrencia = limite
+        self._acervo = acervo or obter_acervo()
+        self._configuracao: Optional[Dict[str, Any]] = (
+            {"response_mime_type": "application/json", "response_schema": ESQUEMA_RESPOSTA_VAGAS}
+            if agente._configuracao_geracao is not None
+            else None
+        )
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def analisar(
+        self,
+        texto_curriculo: str,
+        vagas: Mapping[str, str],
+        top_k: Optional[int] = None,
+        limiar: Optional[float] = None,
+        nome_curriculo: Optional[str] = None,
+    ) -> Iterator[ResultadoVaga]:
+        """Entrega os resultados conforme cada grupo de vagas é concluído.
+
+        Vagas fora do `top_k` ou abaixo do `limiar` de cobertura são entregues
+        primeiro, com status "filtrado", sem passar pelo modelo.
+        """
+        curriculo = ArquivoHandler.limpar_texto(texto_curriculo)
+        titulos = list(vagas)
+        textos = [ArquivoHandler.limpar_texto(vagas[titulo]) for titulo in titulos]
+        coberturas = cobertura_vagas(curriculo, textos)
+        selecionadas = PreFiltro.selecionar(coberturas, top_k=top_k, limiar=limiar)
+        escolhidas = set(selecionadas)
+        for indice, titulo in enumerate(titulos):
+            if indice not in escolhidas:
+                yield ResultadoVaga(titulo, "filtrado", pontuacao_preliminar=coberturas[indice])
+
+        pendentes: List[Tuple[str, str, float]] = []
+        for indice in selecionadas:
+            titulo, texto, cobertura = titulos[indice], textos[indice], coberturas[indice]
+            em_cache = self._agente._consultar_cache(self._chave_cache(curriculo, texto))
+            if em_cache is not None:
+                yield ResultadoVaga(titulo, "concluido", resultado=em_cache, pontuacao_preliminar=cobertura)
+            else:
+                pendentes.append((titulo, texto, cobertura))
+        grupos = [
+            pendentes[inicio : inicio + self._vagas_por_chamada]
+            for inicio in range(0, len(pendentes), self._vagas_por_chamada)
+        ]
+        self._logger.info(
+            "Comparando currículo com %d de %d vagas em %d chamadas.", len(pendentes), len(titulos), len(grupos)
+        )
+        with ThreadPoolExecutor(self._max_concorrencia, thread_name_prefix="multivaga") as executor:
+            futuros: Dict[Future, List[Tuple[str, str, float]]] = {
+                executor.submit(
+                    contextvars.copy_context().run, self._analisar_grupo, curriculo, grupo, nome_curriculo
+                ): grupo
+                for grupo in grupos
+            }
+            try:
+                while futuros:
+                    concluidos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        grupo = futuros.pop(futuro)
+                        try:
+                            yield from futuro.result()
+                        except Exception as exc:
+                            self._logger.warning("Falha ao analisar grupo de %d vagas: %s", len(grupo), exc)
+                            for titulo, _, cobertura in grupo:
+                                yield ResultadoVaga(
+                                    titulo, "erro_modelo", erro=str(exc), pontuacao_preliminar=cobertura
+                                )
+            finally:
+                for futuro in futuros:
+                    futuro.cancel()
+
+    def _analisar_grupo(
+        self, curriculo: str, grupo: Sequence[Tuple[str, str, float]], nome_curriculo: Optional[str]
+    ) -> List[ResultadoVaga]:
+        agente = self._agente
+        inicio = time.perf_counter()
+        with agente._telemetria.span("analise", modo="multivaga", vagas=len(grupo)):
+            identificadores = [f"V{posicao}" for posicao in range(1, len(grupo) + 1)]
+            prompt = self._construir_prompt(
+                curriculo, [(ident, texto) for ident, (_, texto, _) in zip(identificadores, grupo)]
+            )
+            conteudo = agente._gerar(prompt, configuracao=self._configuracao)
+            avaliacoes = self._interpretar(conteudo)
+            resultados: List[ResultadoVaga] = []
+            for ident, (titulo, texto, cobertura) in zip(identificadores, grupo):
+                chave = self._chave_cache(curriculo, texto)
+                dados = avaliacoes.get(ident)
+                try:
+                    if dados is None:
+                        self._logger.info(
+                            "Vaga '%s' ausente ou incompleta na resposta agrupada; analisando individualmente.", titulo
+                        )
+                        resultado = agente.analisar(curriculo, texto)
+                    else:
+                        resultado = agente._registrar_resultado(chave, dados)
+                except Exception as exc:
+                    resultados.append(
+                        ResultadoVaga(titulo, "erro_modelo", erro=str(exc), pontuacao_preliminar=cobertura)
+                    )
+                    continue
+                if self._acervo is not None:
+                    self._acervo.registrar(curriculo, texto, resultado, nome=nome_curriculo, titulo_vaga=titulo)
+                resultados.append(
+                    ResultadoVaga(
+                        titulo, "concluido", resultado=resultado,
+                        duracao=time.perf_counter() - inicio, pontuacao_preliminar=cobertura,
+                    )
+                )
+        return resultados
+
+    def _construir_prompt(self, curriculo: str, vagas: Sequence[Tuple[str, str]]) -> str:
+        agente = self._agente
+        with agente._telemetria.span("prompt", vagas=len(vagas)) as span:
+            referencia = "\n".join(texto for _, texto in vagas)
+            curriculo_enviado = recortar_curriculo(curriculo, referencia, agente._limite_tokens_curriculo)
+            blocos = "\n\n".join(f"VAGA {ident}:\n{texto}" for ident, texto in vagas)
+            prompt = f"{self._instrucoes(len(vagas))}\n\nCURRÍCULO:\n{curriculo_enviado}\n\n{blocos}"
+            orcamento = OrcamentoPrompt(
+                tokens_curriculo_original=estimar_tokens(curriculo),
+                tokens_curriculo_enviado=estimar_tokens(curriculo_enviado),
+                tokens_prompt=estimar_tokens(prompt),
+            )
+            span.definir(tokens_estimados=orcamento.tokens_prompt, recortado=orcamento.truncado)
+        agente._registrar_orcamento(orcamento)
+        return prompt
+
+    @staticmethod
+    def _instrucoes(quantidade: int) -> str:
+        formato = (
+            '{"avaliacoes": [{"vaga": "V1", "resumo_geral": "...", "pontuacao_compatibilidade": 0, '
+            '"pontos_fortes": ["..."], "lacunas": ["..."], "sugestoes": ["..."], '
+            '"analise_profissional": ["..."]}]}'
+        )
+        return (
+            "Atue como analista de talentos sênior e assistente imparcial. Compare o "
+            f"currículo com cada uma das {quantidade} vagas abaixo, avaliando cada vaga de "
+            "forma independente, e gere JSON estrito e sem markdown. A chave "
+            '"analise_profissional" deve trazer observações neutras para orientar o '
+            "recrutador, sem juízos de valor definitivos.\n"
+            f"Formato fixo: {formato}\n"
+            'Inclua exatamente uma avaliação por vaga, com o identificador em "vaga".\n'
+            "Preencha somente com texto claro em português brasileiro."
+        )
+
+    def _interpretar(self, conteudo: str) -> Dict[str, Dict[str, Any]]:
+        """Avaliações por identificador; itens sem algum campo obrigatório (truncados) são descartados.
+
+        As vagas descartadas caem na análise individual em `_analisar_grupo`.
+        """
+        with self._agente._telemetria.span("json", vagas=True) as span:
+            texto = PADRAO_CERCA.sub("", conteudo.strip())
+            caminho = "direto"
+            dados = self._agente._extrair_json(texto) if texto.startswith("{") else None
+            if dados is None:
+                caminho = "reparado"
+                # Sem saída estruturada o modelo às vezes devolve só a lista.
+                dados = reparar_json(f'{{"avaliacoes": {texto}}}' if texto.startswith("[") else texto)
+            itens = dados.get("avaliacoes") if isinstance(dados, dict) else None
+            span.definir(caminho=caminho if isinstance(itens, list) else "falha")
+        self._agente._contar_caminho_json(caminho if isinstance(itens, list) else "falha")
+        avaliacoes: Dict[str, Dict[str, Any]] = {}
+        for item in itens if isinstance(itens, list) else []:
+            if isinstance(item, dict):
+                ident = str(item.pop("vaga", "")).strip().upper()
+                if self._agente._completo(item):
+                    avaliacoes.setdefault(ident, item)
+        return avaliacoes
+
+    def _chave_cache(self, curriculo: str, texto_vaga: str) -> Optional[str]:
+        agente = self._agente
+        if agente._cache is None:
+            return None
+        return agente._cache.gerar_chave(
+            curriculo, texto_vaga, agente._nome_modelo, f"{agente._versao_prompt}:multivaga"
+        )
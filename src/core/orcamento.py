@@ -0,0 +1,121 @@
+"""Orçamento de tokens do prompt e recorte do currículo por relevância."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from src.core.arquivo import ArquivoHandler
+from src.core.prefiltro import extrair_termos_vaga, tokenizar
+
+
+CARACTERES_POR_TOKEN = 4.0
+PALAVRAS_POR_TRECHO = 60
+
+PESOS_SECAO = {
+    "experiencia": 3.0,
+    "habilidades": 3.0,
+    "competencias": 3.0,
+    "tecnologias": 3.0,
+    "projetos": 2.5,
+    "formacao": 2.0,
+    "educacao": 2.0,
+    "escolaridade": 2.0,
+    "certificacoes": 1.5,
+    "cursos": 1.5,
+    "idiomas": 1.2,
+    "resumo": 1.5,
+    "perfil": 1.5,
+    "objetivo": 1.0,
+    "atividades": 0.6,
+    "interesses": 0.3,
+    "hobbies": 0.2,
+    "dados pessoais": 0.2,
+    "contato": 0.2,
+    "referencias": 0.1,
+}
+PESO_PADRAO = 1.0
+
+# Títulos de seção casam com ou sem acento ("Experiência", "Formação").
+VARIANTES_ACENTO = {"a": "[aáàâã]", "e": "[eéê]", "i": "[ií]", "o": "[oóôõ]", "u": "[uú]", "c": "[cç]"}
+
+
+def _tolerar_acentos(secao: str) -> str:
+    return "".join(VARIANTES_ACENTO.get(letra, re.escape(letra)) for letra in secao)
+
+
+PADRAO_SECAO = re.compile(
+    r"\b(" + "|".join(map(_tolerar_acentos, sorted(PESOS_SECAO, key=len, reverse=True))) + r")\b",
+    re.IGNORECASE,
+)
+PADRAO_SENTENCA = re.compile(r"(?<=[.;!?])\s+")
+
+
+def estimar_tokens(texto: str) -> int:
+    """Estimativa local e barata (~4 caracteres por token nos modelos Gemini)."""
+    if not texto:
+        return 0
+    return int(len(texto) / CARACTERES_POR_TOKEN) + 1
+
+
+@dataclass
+class OrcamentoPrompt:
+    """Contagem de tokens de um prompt montado."""
+
+    tokens_curriculo_original: int
+    tokens_curriculo_enviado: int
+    tokens_prompt: int
+
+    @property
+    def truncado(self) -> bool:
+        return self.tokens_curriculo_enviado < self.tokens_curriculo_original
+
+
+def segmentar(texto: str) -> List[Tuple[str, str]]:
+    """Divide o currículo em trechos curtos rotulados pela seção em que aparecem."""
+    segmentos: List[Tuple[str, str]] = []
+    secao = ""
+    posicao = 0
+    marcas = [
+        (m.start(), ArquivoHandler.remover_acentos(m.group(1)).lower()) for m in PADRAO_SECAO.finditer(texto)
+    ]
+    marcas.append((len(texto), ""))
+    for inicio, proxima in marcas:
+        bloco = texto[posicao:inicio].strip()
+        for sentenca in PADRAO_SENTENCA.split(bloco):
+            palavras = sentenca.split()
+            for indice in range(0, len(palavras), PALAVRAS_POR_TRECHO):
+                trecho = " ".join(palavras[indice : indice + PALAVRAS_POR_TRECHO])
+                if trecho:
+                    segmentos.append((secao, trecho))
+        secao, posicao = proxima, inicio
+    return segmentos
+
+
+def recortar_curriculo(texto_curriculo: str, texto_vaga: str, limite_tokens: int) -> str:
+    """Mantém os trechos mais relevantes para a vaga dentro do limite de tokens.
+
+    Cada trecho recebe o peso da sua seção (experiência, habilidades e
+    formação acima de dados pessoais e referências) multiplicado pela
+    sobreposição com os termos da vaga. Os escolhidos voltam à ordem original.
+    """
+    if limite_tokens <= 0 or estimar_tokens(texto_curriculo) <= limite_tokens:
+        return texto_curriculo
+    termos = set(extrair_termos_vaga(texto_vaga))
+    segmentos = segmentar(texto_curriculo)
+    relevancia = []
+    for indice, (secao, trecho) in enumerate(segmentos):
+        peso = PESOS_SECAO.get(secao, PESO_PADRAO)
+        sobreposicao = len(termos.intersection(tokenizar(trecho)))
+        relevancia.append((peso * (1 + sobreposicao), -indice))
+    escolhidos = []
+    usados = 0
+    for _, negativo in sorted(relevancia, reverse=True):
+        indice = -negativo
+        custo = estimar_tokens(segmentos[indice][1]) + 1
+        if usados + custo > limite_tokens:
+            continue
+        escolhidos.append(indice)
+        usados += custo
+    return " ... ".join(segmentos[indice][1] for indice in sorted(escolhidos))
@@ -0,0 +1,127 @@
+"""Pré-filtro local (BM25) para ranquear currículos antes de chamar o Gemini."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from src.core.arquivo import ArquivoHandler
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+PADRAO_TERMO = re.compile(r"[a-z0-9][a-z0-9+#._/-]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset(
+    """
+    a ao aos as ate com como da das de do dos e em entre na nas no nos o os ou
+    para pela pelas pelo pelos por que se sem sob sobre um uma umas uns the and
+    of to in for with on at by an or is are be as from this that
+    responsavel responsaveis atuacao atuar experiencia experiencias conhecimento
+    conhecimentos necessario necessaria desejavel diferencial diferenciais
+    requisitos requisito vaga buscamos profissional habilidades dominio uso
+    usando incluindo ferramentas obrigatorias nocao basico basica junto
+    desde todo toda todos todas ciclo ambiente ambientes oferece clara claro
+    planejar desenvolver manter aplicando principios criar definir elaboracao
+    construcao apoio suporte junto partir similares comprovada boa bom
+    """.split()
+)
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Quebra texto normalizado em termos minúsculos, preservando nomes como scikit-learn e ci/cd.
+
+    Acentos são removidos antes, para que "programação" e "programacao" gerem o
+    mesmo termo com ou sem SELECT_AI_PRESERVAR_ACENTOS.
+    """
+    return PADRAO_TERMO.findall(ArquivoHandler.remover_acentos(texto).lower())
+
+
+def extrair_termos_vaga(texto_vaga: str) -> List[str]:
+    """Termos relevantes da vaga (ferramentas, tecnologias, competências), sem repetição."""
+    termos: Dict[str, None] = {}
+    for termo in tokenizar(ArquivoHandler.limpar_texto(texto_vaga)):
+        if len(termo) < 2 or termo in STOPWORDS or termo.isdigit():
+            continue
+        termos.setdefault(termo, None)
+        for parte in re.split(r"[/]", termo):
+            if parte != termo and len(parte) > 1 and parte not in STOPWORDS:
+                termos.setdefault(parte, None)
+    return list(termos)
+
+
+class PreFiltro:
+    """Pontua currículos contra os termos da vaga usando BM25 vetorizado.
+
+    A pontuação preliminar (0-100) é o BM25 dividido pelo valor máximo que os
+    termos da vaga poderiam atingir, o que a mantém comparável entre execuções
+    e permite usar um limiar fixo.
+    """
+
+    def __init__(self, texto_vaga: str, k1: float = 1.5, b: float = 0.75) -> None:
+        self._termos = extrair_termos_vaga(texto_vaga)
+        self._indice = {termo: coluna for coluna, termo in enumerate(self._termos)}
+        self._k1 = k1
+        self._b = b
+
+    @property
+    def termos(self) -> List[str]:
+        return list(self._termos)
+
+    def pontuar(self, textos: Sequence[str]) -> np.ndarray:
+        """Pontuação preliminar de cada texto, na mesma ordem recebida."""
+        import numpy as np
+
+        if not textos or not self._termos:
+            return np.zeros(len(textos), dtype=np.float64)
+        frequencias = np.zeros((len(textos), len(self._termos)), dtype=np.float32)
+        tamanhos = np.empty(len(textos), dtype=np.float32)
+        for linha, texto in enumerate(textos):
+            tokens = tokenizar(texto)
+            tamanhos[linha] = len(tokens)
+            for termo, quantidade in Counter(tokens).items():
+                coluna = self._indice.get(termo)
+                if coluna is not None:
+                    frequencias[linha, coluna] = quantidade
+        total = len(textos)
+        presenca = np.count_nonzero(frequencias, axis=0)
+        idf = np.log1p((total - presenca + 0.5) / (presenca + 0.5))
+        media = max(float(tamanhos.mean()), 1.0)
+        saturacao = self._k1 * (1 - self._b + self._b * tamanhos / media)
+        bm25 = (frequencias * (self._k1 + 1) / (frequencias + saturacao[:, None])) @ idf
+        maximo = float(idf.sum() * (self._k1 + 1))
+        return 100 * bm25 / maximo if maximo > 0 else np.zeros(total)
+
+    @staticmethod
+    def selecionar(
+        pontuacoes: Sequence[float],
+        top_k: Optional[int] = None,
+        limiar: Optional[float] = None,
+    ) -> List[int]:
+        """Índices que seguem para o modelo, do mais para o menos aderente."""
+        import numpy as np
+
+        valores = np.asarray(pontuacoes, dtype=np.float64)
+        ordem = np.argsort(-valores, kind="stable")
+        if limiar is not None:
+            ordem = ordem[valores[ordem] >= limiar]
+        if top_k is not None:
+            ordem = ordem[:top_k]
+        return ordem.tolist()
+
+
+def cobertura_vagas(texto_curriculo: str, textos_vagas: Sequence[str]) -> List[float]:
+    """Percentual dos termos de cada vaga presentes no currículo (0-100), na ordem recebida.
+
+    É o pré-ranking do caminho inverso (um currículo, várias vagas): o currículo
+    é tokenizado uma vez e cada vaga conta só com os próprios termos.
+    """
+    presentes = set(tokenizar(ArquivoHandler.limpar_texto(texto_curriculo)))
+    coberturas: List[float] = []
+    for texto_vaga in textos_vagas:
+        termos = extrair_termos_vaga(texto_vaga)
+        encontrados = sum(1 for termo in termos if termo in presentes)
+        coberturas.append(100 * encontrados / len(termos) if termos else 0.0)
+    return coberturas
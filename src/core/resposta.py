@@ -0,0 +1,172 @@
+"""Esquema da resposta do modelo e reparo local de JSON quase válido."""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+CAMPOS_LISTA = ("pontos_fortes", "lacunas", "sugestoes", "analise_profissional")
+
+ESQUEMA_RESPOSTA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "resumo_geral": {"type": "string"},
+        "pontuacao_compatibilidade": {"type": "integer"},
+        **{campo: {"type": "array", "items": {"type": "string"}} for campo in CAMPOS_LISTA},
+    },
+    "required": ["resumo_geral", "pontuacao_compatibilidade", *CAMPOS_LISTA],
+}
+
+ESQUEMA_RESPOSTA_TRIAGEM: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "pontuacao_compatibilidade": {"type": "integer"},
+        "resumo_geral": {"type": "string"},
+    },
+    "required": ["pontuacao_compatibilidade", "resumo_geral"],
+}
+
+ESQUEMA_RESPOSTA_VAGAS: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "avaliacoes": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"vaga": {"type": "string"}, **ESQUEMA_RESPOSTA["properties"]},
+                "required": ["vaga", *ESQUEMA_RESPOSTA["required"]],
+            },
+        },
+    },
+    "required": ["avaliacoes"],
+}
+
+DECODIFICADOR = json.JSONDecoder()
+PADRAO_CERCA = re.compile(r"^```[a-zA-Z]*\s*|\s*```\s*$")
+PADRAO_VIRGULA_FINAL = re.compile(r",\s*([}\]])")
+
+
+def reparar_json(conteudo: str) -> Optional[Dict[str, Any]]:
+    """Tenta recuperar um objeto de JSON quase válido sem nova chamada ao modelo.
+
+    Cobre os defeitos mais comuns: cercas de markdown, texto antes do objeto,
+    vírgulas finais e respostas truncadas (strings, listas e objetos abertos).
+    """
+    texto = PADRAO_CERCA.sub("", conteudo.strip())
+    inicio = texto.find("{")
+    if inicio == -1:
+        return None
+    texto = _fechar_estruturas(texto[inicio:])
+    texto = PADRAO_VIRGULA_FINAL.sub(r"\1", texto)
+    try:
+        dados = json.loads(texto)
+    except json.JSONDecodeError:
+        return None
+    return dados if isinstance(dados, dict) else None
+
+
+def _fechar_estruturas(texto: str) -> str:
+    """Corta o que vem depois do objeto raiz ou fecha o que ficou aberto."""
+    pilha: List[str] = []
+    em_string = False
+    escapado = False
+    ultimo_seguro = 0
+    for posicao, caractere in enumerate(texto):
+        if em_string:
+            if escapado:
+                escapado = False
+            elif caractere == "\\":
+                escapado = True
+            elif caractere == '"':
+                em_string = False
+            continue
+        if caractere == '"':
+            em_string = True
+        elif caractere in "{[":
+            pilha.append("}" if caractere == "{" else "]")
+        elif caractere in "}]":
+            if pilha:
+                pilha.pop()
+            if not pilha:
+                return texto[: posicao + 1]
+        if caractere in ",[{":
+            ultimo_seguro = posicao + (0 if caractere == "," else 1)
+    if em_string:
+        texto += '"'
+    em_objeto = bool(pilha) and pilha[-1] == "}"
+    if texto.rstrip().endswith((":", ",")) or (em_objeto and _termina_em_chave(texto)):
+        texto = texto[:ultimo_seguro]
+    return texto.rstrip().rstrip(",") + "".join(reversed(pilha))
+
+
+def _termina_em_chave(texto: str) -> bool:
+    """Detecta um par chave/valor interrompido logo após a chave."""
+    return re.search(r'[{,]\s*"[^"]*"\s*$', texto) is not None
+
+
+class ParserJsonParcial:
+    """Lê um objeto JSON que chega em pedaços e libera cada campo ao se completar.
+
+    Só campos de primeiro nível totalmente recebidos são entregues; números no
+    fim do buffer aguardam o próximo pedaço, pois ainda podem ganhar dígitos.
+    """
+
+    def __init__(self) -> None:
+        self._texto = ""
+        self._posicao: Optional[int] = None
+        self._campos: Dict[str, Any] = {}
+
+    @property
+    def campos(self) -> Dict[str, Any]:
+        return dict(self._campos)
+
+    @property
+    def texto(self) -> str:
+        return self._texto
+
+    def alimentar(self, trecho: str) -> Dict[str, Any]:
+        """Acrescenta um pedaço e devolve os campos concluídos por ele."""
+        self._texto += trecho
+        if self._posicao is None:
+            inicio = self._texto.find("{")
+            if inicio == -1:
+                return {}
+            self._posicao = inicio + 1
+        novos: Dict[str, Any] = {}
+        while True:
+            par = self._ler_par(self._posicao)
+            if par is None:
+                return novos
+            chave, valor, fim = par
+            self._campos[chave] = valor
+            novos[chave] = valor
+            self._posicao = fim
+
+    def _ler_par(self, posicao: int) -> Optional[Tuple[str, Any, int]]:
+        texto = self._texto
+        posicao = self._pular(texto, posicao, " \t\r\n,")
+        if posicao >= len(texto) or texto[posicao] != '"':
+            return None
+        try:
+            chave, posicao = DECODIFICADOR.raw_decode(texto, posicao)
+        except json.JSONDecodeError:
+            return None
+        posicao = self._pular(texto, posicao, " \t\r\n")
+        if posicao >= len(texto) or texto[posicao] != ":":
+            return None
+        posicao = self._pular(texto, posicao + 1, " \t\r\n")
+        try:
+            valor, fim = DECODIFICADOR.raw_decode(texto, posicao)
+        except json.JSONDecodeError:
+            return None
+        if fim >= len(texto) and isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            return None
+        return chave, valor, fim
+
+    @staticmethod
+    def _pular(texto: str, posicao: int, caracteres: str) -> int:
+        while posicao < len(texto) and texto[posicao] in caracteres:
+            posicao += 1
+        return posicao
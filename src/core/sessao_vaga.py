@@ -0,0 +1,179 @@
+"""Sessão de vaga: prepara a vaga uma única vez para comparar com vários currículos."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.core.arquivo import ArquivoHandler
+from src.core.orcamento import estimar_tokens
+from src.core.prefiltro import extrair_termos_vaga
+
+
+PADRAO_SENTENCA_VAGA = re.compile(r"(?<=[.;!?])\s+|\s+-\s+|\s+•\s+")
+MARCAS_DESEJAVEL = ("desejavel", "diferencia", "plus", "nice to have", "sera um", "e um plus")
+MARCAS_OBRIGATORIO = ("obrigatori", "necessari", "requisito", "exigid", "imprescindive", "essencia", "must")
+
+
+@dataclass
+class RequisitosVaga:
+    """Requisitos extraídos localmente do texto normalizado da vaga."""
+
+    obrigatorios: List[str] = field(default_factory=list)
+    desejaveis: List[str] = field(default_factory=list)
+    termos: List[str] = field(default_factory=list)
+
+
+def extrair_requisitos(texto_vaga: str) -> RequisitosVaga:
+    """Separa sentenças da vaga em obrigatórias e desejáveis por palavras-chave.
+
+    Rótulos como "Diferenciais:" valem para os itens seguintes até o próximo
+    rótulo. Trechos sem marca e com termos relevantes contam como obrigatórios.
+    """
+    requisitos = RequisitosVaga(termos=extrair_termos_vaga(texto_vaga))
+    contexto: Optional[str] = None
+    sentencas = (
+        sentenca
+        for linha in texto_vaga.splitlines()
+        for sentenca in PADRAO_SENTENCA_VAGA.split(ArquivoHandler.limpar_texto(linha))
+    )
+    for sentenca in sentencas:
+        if ":" in sentenca:
+            rotulo, sentenca = sentenca.split(":", 1)
+            contexto = _classificar(rotulo) or contexto
+        sentenca = sentenca.strip(" .;:-")
+        if not sentenca:
+            continue
+        classe = _classificar(sentenca) or contexto
+        if classe is None and extrair_termos_vaga(sentenca):
+            classe = "obrigatorio"
+        if classe == "desejavel":
+            requisitos.desejaveis.append(sentenca)
+        elif classe == "obrigatorio":
+            requisitos.obrigatorios.append(sentenca)
+    return requisitos
+
+
+def _classificar(trecho: str) -> Optional[str]:
+    minusculo = ArquivoHandler.remover_acentos(trecho).lower()
+    if any(marca in minusculo for marca in MARCAS_DESEJAVEL):
+        return "desejavel"
+    if any(marca in minusculo for marca in MARCAS_OBRIGATORIO):
+        return "obrigatorio"
+    return None
+
+
+class SessaoVaga:
+    """Mantém instruções, formato e vaga num prefixo fixo reaproveitado por currículo.
+
+    O prefixo vai como `system_instruction` do modelo ou, quando grande o bastante
+    (GEMINI_CACHE_CONTEXTO_MIN_TOKENS), para o cache de contexto do Gemini, de modo
+    que cada chamada envie apenas o currículo.
+    """
+
+    def __init__(self, agente: Any, texto_vaga: str, usar_cache_contexto: Optional[bool] = None) -> None:
+        self._agente = agente
+        self._texto_vaga = ArquivoHandler.limpar_texto(texto_vaga)
+        self._requisitos = extrair_requisitos(texto_vaga)
+        if usar_cache_contexto is None:
+            minimo = int(os.getenv("GEMINI_CACHE_CONTEXTO_MIN_TOKENS", "1024"))
+            usar_cache_contexto = (
+                os.getenv("GEMINI_CACHE_CONTEXTO", "1") == "1"
+                and estimar_tokens(self._montar_instrucao_sistema(incluir_requisitos=False)) >= minimo
+            )
+        self._usar_cache_contexto = usar_cache_contexto
+        self._instrucao_sistema = self._montar_instrucao_sistema(incluir_requisitos=usar_cache_contexto)
+        self._modelo: Any = None
+        self._conteudo_cache: Any = None
+        self._trava = threading.Lock()
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def texto_vaga(self) -> str:
+        return self._texto_vaga
+
+    @property
+    def requisitos(self) -> RequisitosVaga:
+        return self._requisitos
+
+    @property
+    def tokens_prefixo(self) -> int:
+        return estimar_tokens(self._instrucao_sistema)
+
+    @property
+    def usa_cache_contexto(self) -> bool:
+        return self._conteudo_cache is not None
+
+    def analisar(self, texto_curriculo: str) -> Dict[str, Any]:
+        """Mesmo resultado de `AgenteAnalisador.analisar`, enviando só o currículo."""
+        agente = self._agente
+        with agente._telemetria.span("analise", modo="sessao"):
+            chave = self._chave_cache(texto_curriculo)
+            em_cache = agente._consultar_cache(chave)
+            if em_cache is not None:
+                return em_cache
+            prompt = agente._construir_prompt_curriculo(texto_curriculo, self._texto_vaga)
+            self._logger.info("Enviando currículo (%d caracteres) na sessão da vaga.", len(texto_curriculo))
+            conteudo = agente._gerar(prompt, self._obter_modelo())
+            return agente._concluir(chave, conteudo)
+
+    async def analisar_async(self, texto_curriculo: str) -> Dict[str, Any]:
+        agente = self._agente
+        with agente._telemetria.span("analise", modo="sessao_assincrona"):
+            chave = self._chave_cache(texto_curriculo)
+            em_cache = await asyncio.to_thread(agente._consultar_cache, chave)
+            if em_cache is not None:
+                return em_cache
+            prompt = agente._construir_prompt_curriculo(texto_curriculo, self._texto_vaga)
+            conteudo = await agente._gerar_async(prompt, self._obter_modelo())
+            return await agente._concluir_async(chave, conteudo)
+
+    def encerrar(self) -> None:
+        """Remove o cache de contexto criado no Gemini, se houver."""
+        with self._trava:
+            conteudo, self._conteudo_cache, self._modelo = self._conteudo_cache, None, None
+        if conteudo is None:
+            return
+        try:
+            conteudo.delete()
+        except Exception as exc:
+            self._logger.warning("Não foi possível remover o cache de contexto: %s", exc)
+
+    def __enter__(self) -> "SessaoVaga":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.encerrar()
+
+    def _obter_modelo(self) -> Any:
+        with self._trava:
+            if self._modelo is None:
+                self._modelo, self._conteudo_cache = self._agente._criar_modelo_sessao(
+                    self._instrucao_sistema, self._usar_cache_contexto
+                )
+            return self._modelo
+
+    def _chave_cache(self, texto_curriculo: str) -> Optional[str]:
+        agente = self._agente
+        if agente._cache is None:
+            return None
+        return agente._cache.gerar_chave(
+            texto_curriculo, self._texto_vaga, agente._nome_modelo, f"{agente._versao_prompt}:sessao"
+        )
+
+    def _montar_instrucao_sistema(self, incluir_requisitos: bool) -> str:
+        """Instruções, formato e vaga; os requisitos extraídos só entram no cache de contexto.
+
+        Sem cache o prefixo é cobrado a cada chamada, então não vale acrescentar texto.
+        """
+        linhas = [self._agente._instrucoes_prompt(), "", f"VAGA:\n{self._texto_vaga}"]
+        if incluir_requisitos and self._requisitos.obrigatorios:
+            linhas += ["", "REQUISITOS OBRIGATÓRIOS:"] + [f"- {item}" for item in self._requisitos.obrigatorios]
+        if incluir_requisitos and self._requisitos.desejaveis:
+            linhas += ["", "REQUISITOS DESEJÁVEIS:"] + [f"- {item}" for item in self._requisitos.desejaveis]
+        return "\n".join(linhas)
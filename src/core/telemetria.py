@@ -0,0 +1,318 @@
+"""Telemetria do caminho crítico: spans por etapa, contadores e exportação Prometheus."""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+
+LIMITES_HISTOGRAMA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_span_atual: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("select_ai_span", default=None)
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+class Span:
+    """Intervalo de uma etapa, no formato dos spans do OpenTelemetry."""
+
+    __slots__ = (
+        "_telemetria", "nome", "id_traco", "id_span", "id_pai",
+        "inicio_ns", "fim_ns", "atributos", "status", "_token",
+    )
+
+    def __init__(self, telemetria: "Telemetria", nome: str, atributos: Dict[str, Any]) -> None:
+        pai = _span_atual.get()
+        self._telemetria = telemetria
+        self.nome = nome
+        self.id_traco = pai.id_traco if pai is not None else secrets.token_hex(16)
+        self.id_span = secrets.token_hex(8)
+        self.id_pai = pai.id_span if pai is not None else None
+        self.atributos = atributos
+        self.status = "ok"
+        self.inicio_ns = 0
+        self.fim_ns = 0
+        self._token: Any = None
+
+    @property
+    def duracao(self) -> float:
+        return (self.fim_ns - self.inicio_ns) / 1e9
+
+    def definir(self, **atributos: Any) -> None:
+        self.atributos.update(atributos)
+
+    def acumular(self, chave: str, valor: float) -> None:
+        self.atributos[chave] = self.atributos.get(chave, 0) + valor
+
+    def __enter__(self) -> "Span":
+        self._token = _span_atual.set(self)
+        self.inicio_ns = time.time_ns()
+        return self
+
+    def __exit__(self, tipo: Any, erro: Any, _: Any) -> None:
+        self.fim_ns = time.time_ns()
+        try:
+            _span_atual.reset(self._token)
+        except ValueError:
+            # Geradores podem ser encerrados em outro contexto; o pai já não importa.
+            pass
+        if erro is not None:
+            self.status = "erro"
+            self.atributos["erro"] = tipo.__name__
+        self._telemetria._finalizar(self)
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.id_traco,
+            "span_id": self.id_span,
+            "parent_span_id": self.id_pai,
+            "name": self.nome,
+            "start_time_unix_nano": self.inicio_ns,
+            "end_time_unix_nano": self.fim_ns,
+            "attributes": self.atributos,
+            "status": self.status,
+        }
+
+
+class _SpanNulo:
+    """Span sem efeito usado quando a telemetria está desligada."""
+
+    __slots__ = ()
+
+    def definir(self, **_: Any) -> None:
+        pass
+
+    def acumular(self, chave: str, valor: float) -> None:
+        pass
+
+    def __enter__(self) -> "_SpanNulo":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        pass
+
+
+SPAN_NULO = _SpanNulo()
+
+
+class ExportadorSpans(Protocol):
+    def exportar(self, span: Span) -> None:
+        ...
+
+
+class ExportadorLog:
+    """Escreve cada span concluído no log, como uma linha JSON."""
+
+    def __init__(self) -> None:
+        self._logger = logging.getLogger("select_ai.telemetria")
+
+    def exportar(self, span: Span) -> None:
+        self._logger.info(json.dumps(span.como_dict(), ensure_ascii=False, default=str))
+
+
+class ExportadorJsonl:
+    """Acrescenta cada span a um arquivo JSON Lines."""
+
+    def __init__(self, caminho: Path) -> None:
+        self._caminho = Path(caminho)
+        self._caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._trava = threading.Lock()
+
+    def exportar(self, span: Span) -> None:
+        linha = json.dumps(span.como_dict(), ensure_ascii=False, default=str)
+        with self._trava, self._caminho.open("a", encoding="utf-8") as arquivo:
+            arquivo.write(linha + "\n")
+
+
+class ExportadorMemoria:
+    """Guarda os spans em memória (benchmarks e inspeção manual)."""
+
+    def __init__(self, limite: int = 10000) -> None:
+        self._limite = limite
+        self._trava = threading.Lock()
+        self.spans: List[Span] = []
+
+    def exportar(self, span: Span) -> None:
+        with self._trava:
+            if len(self.spans) < self._limite:
+                self.spans.append(span)
+
+
+class Telemetria:
+    """Registra spans, contadores e histogramas de duração por etapa.
+
+    Desligada, `span` devolve um objeto nulo compartilhado e os demais métodos
+    retornam na primeira linha, então o custo no caminho crítico é desprezível.
+    """
+
+    def __init__(self, ativa: bool = False, exportadores: Optional[List[ExportadorSpans]] = None) -> None:
+        self.ativa = ativa
+        self._exportadores: List[ExportadorSpans] = list(exportadores or [])
+        self._trava = threading.Lock()
+        self._contadores: Dict[Tuple[str, Rotulos], float] = defaultdict(float)
+        self._histogramas: Dict[Rotulos, List[float]] = {}
+        self._logger = logging.getLogger(self.__class__.__name__)
+
+    def span(self, nome: str, **atributos: Any) -> Any:
+        if not self.ativa:
+            return SPAN_NULO
+        return Span(self, nome, atributos)
+
+    def adicionar_exportador(self, exportador: ExportadorSpans) -> None:
+        with self._trava:
+            self._exportadores.append(exportador)
+
+    def contar(self, nome: str, valor: float = 1, **rotulos: str) -> None:
+        if not self.ativa:
+            return
+        chave = (nome, tuple(sorted(rotulos.items())))
+        with self._trava:
+            self._contadores[chave] += valor
+
+    def observar(self, etapa: str, segundos: float) -> None:
+        """Acrescenta uma duração ao histograma da etapa sem criar um span."""
+        if not self.ativa:
+            return
+        rotulos = (("etapa", etapa),)
+        with self._trava:
+            baldes = self._histogramas.setdefault(rotulos, [0.0] * (len(LIMITES_HISTOGRAMA) + 2))
+            for indice, limite in enumerate(LIMITES_HISTOGRAMA):
+                if segundos <= limite:
+                    baldes[indice] += 1
+            baldes[-2] += 1
+            baldes[-1] += segundos
+
+    def registrar_uso(self, resposta: Any, span: Any = SPAN_NULO) -> None:
+        """Tokens reais informados em `usage_metadata` pela resposta do modelo."""
+        if not self.ativa:
+            return
+        uso = getattr(resposta, "usage_metadata", None)
+        if uso is None:
+            return
+        for campo, tipo in (
+            ("prompt_token_count", "entrada"),
+            ("candidates_token_count", "saida"),
+            ("cached_content_token_count", "cache"),
+        ):
+            valor = getattr(uso, campo, 0) or 0
+            if valor:
+                self.contar("tokens", valor, tipo=tipo)
+                span.definir(**{f"tokens_{tipo}": valor})
+
+    def exportar_prometheus(self) -> str:
+        """Métricas no formato de exposição de texto do Prometheus."""
+        with self._trava:
+            contadores = dict(self._contadores)
+            histogramas = {rotulos: list(baldes) for rotulos, baldes in self._histogramas.items()}
+        linhas: List[str] = []
+        for nome in sorted({nome for nome, _ in contadores}):
+            linhas.append(f"# TYPE select_ai_{nome}_total counter")
+            for (atual, rotulos), valor in sorted(contadores.items()):
+                if atual == nome:
+                    linhas.append(f"select_ai_{nome}_total{_formatar_rotulos(rotulos)} {valor:g}")
+        if histogramas:
+            linhas.append("# TYPE select_ai_etapa_segundos histogram")
+        for rotulos, baldes in sorted(histogramas.items()):
+            for indice, limite in enumerate(LIMITES_HISTOGRAMA):
+                rotulo = _formatar_rotulos(rotulos + (("le", f"{limite:g}"),))
+                linhas.append(f"select_ai_etapa_segundos_bucket{rotulo} {baldes[indice]:g}")
+            linhas.append(f"select_ai_etapa_segundos_bucket{_formatar_rotulos(rotulos + (('le', '+Inf'),))} {baldes[-2]:g}")
+            linhas.append(f"select_ai_etapa_segundos_count{_formatar_rotulos(rotulos)} {baldes[-2]:g}")
+            linhas.append(f"select_ai_etapa_segundos_sum{_formatar_rotulos(rotulos)} {baldes[-1]:.6f}")
+        return "\n".join(linhas) + "\n"
+
+    def resumo_etapas(self) -> Dict[str, Dict[str, float]]:
+        """Quantidade, tempo total e médio de cada etapa observada."""
+        with self._trava:
+            itens = list(self._histogramas.items())
+        return {
+            dict(rotulos)["etapa"]: {
+                "quantidade": baldes[-2],
+                "total_s": baldes[-1],
+                "media_s": baldes[-1] / baldes[-2] if baldes[-2] else 0.0,
+            }
+            for rotulos, baldes in itens
+        }
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def iniciar_servidor_prometheus(self, porta: int, endereco: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Publica `/metrics` numa thread em segundo plano."""
+        telemetria = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 (nome exigido pelo http.server)
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                corpo = telemetria.exportar_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        servidor = ThreadingHTTPServer((endereco, porta), Manipulador)
+        threading.Thread(target=servidor.serve_forever, name="prometheus", daemon=True).start()
+        self._logger.info("Métricas Prometheus em http://%s:%d/metrics", endereco, porta)
+        return servidor
+
+    def _finalizar(self, span: Span) -> None:
+        self.observar(span.nome, span.duracao)
+        for exportador in self._exportadores:
+            try:
+                exportador.exportar(span)
+            except Exception as exc:
+                self._logger.warning("Falha ao exportar span '%s': %s", span.nome, exc)
+
+
+def _formatar_rotulos(rotulos: Rotulos) -> str:
+    if not rotulos:
+        return ""
+    pares = ",".join(f'{chave}="{str(valor).replace(chr(34), chr(39))}"' for chave, valor in rotulos)
+    return "{" + pares + "}"
+
+
+_telemetria: Optional[Telemetria] = None
+_trava_telemetria = threading.Lock()
+
+
+def obter_telemetria() -> Telemetria:
+    """Instância do processo, configurada por SELECT_AI_TELEMETRIA e variáveis relacionadas."""
+    global _telemetria
+    if _telemetria is not None:
+        return _telemetria
+    with _trava_telemetria:
+        if _telemetria is None:
+            ativa = os.getenv("SELECT_AI_TELEMETRIA", "0") == "1"
+            telemetria = Telemetria(ativa=ativa)
+            if ativa:
+                destino = os.getenv("SELECT_AI_TELEMETRIA_EXPORTADOR", "log").strip().lower()
+                if destino == "log":
+                    telemetria.adicionar_exportador(ExportadorLog())
+                elif destino == "jsonl":
+                    caminho = os.getenv(
+                        "SELECT_AI_TELEMETRIA_ARQUIVO",
+                        str(Path.home() / ".cache" / "select_ai" / "spans.jsonl"),
+                    )
+                    telemetria.adicionar_exportador(ExportadorJsonl(Path(caminho)))
+                porta = int(os.getenv("SELECT_AI_PROMETHEUS_PORTA", "0"))
+                if porta:
+                    telemetria.iniciar_servidor_prometheus(porta)
+            _telemetria = telemetria
+    return _telemetria
@@ -2,16 +2,27 @@
 
 from __future__ import annotations
 
+import io
 import logging
 import os
+import re
+import time
+import uuid
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import streamlit as st
 from dotenv import load_dotenv
 
+from src.core.acervo import RegistroAcervo, obter_acervo
 from src.core.agente import AgenteAnalisador
-from src.core.arquivo import ArquivoHandler
+from src.core.arquivo import ArquivoHandler, ArquivoRejeitado
+from src.core.cascata import descrever_cascata, resumir_cascata
+from src.core.extracao import obter_extrator
+from src.core.fila import CANCELADA, ERRO, PENDENTE, Tarefa, obter_fila
+from src.core.lote import AnalisadorLote, ResultadoLote, expandir_arquivos, ranquear
+from src.core.multivaga import AnalisadorMultiVaga, ResultadoVaga, ranquear_vagas
+from src.core.telemetria import obter_telemetria
 
 
 load_dotenv()
@@ -79,10 +90,18 @@ class SelectAIApp:
             " colaboração, aprendizado contínuo e trilha de desenvolvimento."
         ),
     }
+    MAX_VAGAS_DIGITADAS = 10
+    # Tabelas de resultados são desenhadas uma página por vez; cards mostram os primeiros itens.
+    ITENS_POR_PAGINA = int(os.getenv("SELECT_AI_UI_ITENS_POR_PAGINA", "50"))
+    MAX_ITENS_CARD = int(os.getenv("SELECT_AI_UI_MAX_ITENS_CARD", "10"))
+    TIPOS_TAREFA = {"Individual": "individual", "Lote": "lote", "Multivagas": "multivaga"}
+    # Análises interativas passam à frente de lotes longos na fila compartilhada.
+    PRIORIDADES = {"individual": 10, "multivaga": 5, "lote": 0}
 
     def __init__(self) -> None:
         self._agente: Optional[AgenteAnalisador] = None
         self._configurar_pagina()
+        self._renderizar_configuracao()
         self._carregar_css()
         self._inicializar_agente()
 
@@ -94,11 +113,20 @@ class SelectAIApp:
             unsafe_allow_html=True,
         )
 
+    def _renderizar_configuracao(self) -> None:
+        """Relê o `.env` e descarta agente e CSS compartilhados antes de recriá-los neste mesmo rerun."""
+        with st.sidebar:
+            st.caption("Trocou a chave ou o modelo no `.env`? Vale para todas as sessões abertas.")
+            if st.button("⟳ Recarregar configuração", key="recarregar_configuracao", use_container_width=True):
+                LOGGER.info("Botao 'Recarregar configuração' acionado.")
+                recarregar_configuracao()
+                st.toast("Configuração recarregada.")
+
     def _carregar_css(self) -> None:
         caminho_css = Path(__file__).resolve().parent / "styles.css"
         if caminho_css.exists():
-            with caminho_css.open("r", encoding="utf-8") as css:
-                st.markdown(f"<style>{css.read()}</style>", unsafe_allow_html=True)
+            estilo = _carregar_estilo(str(caminho_css), caminho_css.stat().st_mtime)
+            st.markdown(estilo, unsafe_allow_html=True)
 
     def _inicializar_agente(self) -> None:
         chave = os.getenv("GEMINI_API_KEY", "")
@@ -107,8 +135,7 @@ class SelectAIApp:
             LOGGER.warning("Variável GEMINI_API_KEY não encontrada.")
             return
         try:
-            self._agente = AgenteAnalisador(api_key=chave)
-            LOGGER.info("Agente inicializado com sucesso.")
+            self._agente = _obter_agente(chave, os.getenv("GEMINI_MODEL", ""))
         except ValueError as erro:
             st.error(str(erro))
             LOGGER.error("Falha ao inicializar agente: %s", erro)
@@ -124,20 +151,83 @@ class SelectAIApp:
         
         # Seção de entrada - Upload e Descrição lado a lado
         st.markdown("<h2 class='section-title'>Entrada de Dados</h2>", unsafe_allow_html=True)
+        modo = st.radio(
+            "Modo de análise",
+            ["Individual", "Lote", "Multivagas", "Acervo"],
+            horizontal=True,
+            key="modo_analise",
+            label_visibility="collapsed",
+        )
+        if modo == "Acervo":
+            self._renderizar_acervo()
+            return
         col_upload, col_vaga = st.columns([1, 1])
         
         with col_upload:
-            st.markdown("**Upload do Currículo**")
-            curriculo = st.file_uploader("Currículo (PDF ou TXT)", type=["pdf", "txt"], key="curriculo", label_visibility="collapsed")
+            if modo == "Lote":
+                st.markdown("**Upload dos Currículos**")
+                curriculo = st.file_uploader(
+                    "Currículos (PDF, TXT ou ZIP)",
+                    type=["pdf", "txt", "zip"],
+                    accept_multiple_files=True,
+                    key="curriculos_lote",
+                    label_visibility="collapsed",
+                )
+                concorrencia = st.slider(
+                    "Chamadas simultâneas ao Gemini",
+                    min_value=1,
+                    max_value=16,
+                    value=int(os.getenv("SELECT_AI_CONCORRENCIA", "4")),
+                    key="concorrencia_lote",
+                )
+                prefiltro = st.checkbox(
+                    "Pré-filtro local antes do Gemini",
+                    key="prefiltro_lote",
+                    help="Pontua os currículos pelos termos da vaga (BM25) e envia ao modelo só os melhores.",
+                )
+                col_topk, col_limiar = st.columns(2)
+                with col_topk:
+                    top_k = st.number_input(
+                        "Top-K", min_value=1, value=20, step=1, key="prefiltro_top_k", disabled=not prefiltro
+                    )
+                with col_limiar:
+                    limiar = st.number_input(
+                        "Pontuação mínima", min_value=0.0, max_value=100.0, value=0.0, step=1.0,
+                        key="prefiltro_limiar", disabled=not prefiltro,
+                    )
+            elif modo == "Multivagas":
+                st.markdown("**Upload do Currículo**")
+                curriculo = st.file_uploader(
+                    "Currículo (PDF ou TXT)", type=["pdf", "txt"], key="curriculo_multivaga",
+                    label_visibility="collapsed",
+                )
+                top_k_vagas = st.number_input(
+                    "Vagas enviadas ao Gemini (as de maior cobertura de termos)",
+                    min_value=1, value=10, step=1, key="multivaga_top_k",
+                )
+            else:
+                st.markdown("**Upload do Currículo**")
+                curriculo = st.file_uploader("Currículo (PDF ou TXT)", type=["pdf", "txt"], key="curriculo", label_visibility="collapsed")
         
         with col_vaga:
-            st.markdown("**Descrição da Vaga**")
-            self._renderizar_seletor_vaga()
+            if modo == "Multivagas":
+                st.markdown("**Vagas Abertas**")
+                vagas_exemplo = st.multiselect(
+                    "Vagas de exemplo",
+                    list(self.AMOSTRAS_VAGA.keys()),
+                    default=list(self.AMOSTRAS_VAGA.keys()),
+                    key="multivaga_exemplos",
+                )
+                st.caption("Outras vagas podem ser digitadas abaixo, separadas por uma linha com ---.")
+            else:
+                st.markdown("**Descrição da Vaga**")
+                self._renderizar_seletor_vaga()
         
         # Text area para descrição da vaga (full width)
+        limite_caracteres = 1500 * (self.MAX_VAGAS_DIGITADAS if modo == "Multivagas" else 1)
         vaga_texto = st.text_area(
             "Digite os requisitos ou utilize uma vaga de exemplo",
-            max_chars=1500,
+            max_chars=limite_caracteres,
             height=150,
             key="vaga_texto_area",
             label_visibility="collapsed"
@@ -146,22 +236,47 @@ class SelectAIApp:
         
         col_info, col_btn = st.columns([3, 1])
         with col_info:
-            st.caption(f"Caracteres utilizados: {len(vaga_texto)}/1500")
+            st.caption(f"Caracteres utilizados: {len(vaga_texto)}/{limite_caracteres}")
         with col_btn:
             pronto = st.button("🔍 Analisar", use_container_width=True, type="primary")
         
         if pronto:
             LOGGER.info("Botao 'Analisar' acionado.")
-            self._processar_analise(curriculo, st.session_state.get("vaga_texto", ""))
+            if modo == "Lote":
+                self._enfileirar_lote(
+                    curriculo,
+                    st.session_state.get("vaga_texto", ""),
+                    concorrencia,
+                    top_k=int(top_k) if prefiltro else None,
+                    limiar=float(limiar) if prefiltro and limiar > 0 else None,
+                )
+            elif modo == "Multivagas":
+                vagas = {titulo: self.AMOSTRAS_VAGA[titulo] for titulo in vagas_exemplo}
+                vagas.update(self._separar_vagas_digitadas(vaga_texto))
+                self._enfileirar_multivaga(curriculo, vagas, int(top_k_vagas))
+            else:
+                self._enfileirar_analise(curriculo, st.session_state.get("vaga_texto", ""))
         
         # Separador visual
         st.markdown("---")
         
         # Seção de resultados - ocupando toda a largura
         st.markdown("<h2 class='section-title'>Resultados da Análise</h2>", unsafe_allow_html=True)
-        self._renderizar_resultados()
+        tipo = self.TIPOS_TAREFA[modo]
+        erro = st.session_state.pop(f"erro_{tipo}", None)
+        if erro:
+            st.error(erro)
+        if st.session_state.get(f"tarefa_{tipo}"):
+            self._acompanhar_tarefa(tipo)
+        if modo == "Lote":
+            self._renderizar_resultados_lote()
+        elif modo == "Multivagas":
+            self._renderizar_resultados_multivaga()
+        else:
+            self._renderizar_resultados()
+        self._renderizar_fila()
 
-    def _processar_analise(self, curriculo, vaga_texto: str) -> None:
+    def _enfileirar_analise(self, curriculo, vaga_texto: str) -> None:
         if self._agente is None:
             st.error("Serviço Gemini não disponível. Configure a chave e recarregue a página.")
             LOGGER.error("Análise abortada: Agente não inicializado.")
@@ -177,76 +292,346 @@ class SelectAIApp:
             LOGGER.warning("Análise abortada: descrição da vaga vazia.")
             st.session_state["etapa"] = ""
             return
-        LOGGER.info("Iniciando leitura do currículo '%s'.", getattr(curriculo, "name", "desconhecido"))
-        status_box = st.empty()
-
-        def atualizar_status(mensagem: str, emoji: str = "⏳", tipo: str = "info") -> None:
-            texto = f"{emoji} {mensagem}"
-            if tipo == "error":
-                status_box.error(texto)
-            elif tipo == "success":
-                status_box.success(texto)
-            else:
-                status_box.info(texto)
-
-        st.session_state["etapa"] = "Lendo currículo"
-        progresso = st.progress(0)
-        st.session_state["feedback"] = "Lendo arquivos..."
-        atualizar_status("Lendo currículo")
         try:
-            texto_curriculo = ArquivoHandler.ler_texto(curriculo, curriculo.name)
-            LOGGER.info("Currículo lido: %d caracteres normalizados.", len(texto_curriculo))
-            atualizar_status("Currículo lido", emoji="✅")
-        except Exception as exc:  # pragma: no cover
-            progresso.empty()
-            LOGGER.exception("Erro ao ler currículo: %s", exc)
-            st.error("Não foi possível ler o currículo: {}".format(exc))
-            atualizar_status("Falha ao ler currículo", emoji="⚠️", tipo="error")
+            ArquivoHandler.verificar_tamanho(curriculo)
+        except ArquivoRejeitado as exc:
+            st.error(str(exc))
+            LOGGER.warning("Análise abortada: %s", exc)
             st.session_state["etapa"] = ""
             return
-        progresso.progress(30)
-        st.session_state["etapa"] = "Normalizando vaga"
-        st.session_state["feedback"] = "Preparando descrição da vaga..."
-        atualizar_status("Normalizando descrição da vaga")
+        agente = self._agente
+        nome, conteudo = curriculo.name, curriculo.getvalue()
+        texto_vaga = ArquivoHandler.limpar_texto(vaga_texto)
+        titulo_vaga = self._titulo_exemplo(vaga_texto)
+        LOGGER.info("Descrição da vaga tratada: %d caracteres.", len(texto_vaga))
+
+        def executar(tarefa: Tarefa) -> Dict[str, object]:
+            tarefa.atualizar(0, 3, "Lendo currículo")
+            texto_curriculo = obter_extrator().ler_texto(io.BytesIO(conteudo), nome)
+            LOGGER.info("Currículo lido: %d caracteres normalizados.", len(texto_curriculo))
+            tarefa.verificar_cancelamento()
+            tarefa.atualizar(1, mensagem="Consultando Agente (Por favor Aguarde)")
+            resultado: Dict[str, object] = {}
+            for parcial in agente.analisar_stream(texto_curriculo, texto_vaga):
+                tarefa.verificar_cancelamento()
+                resultado = parcial
+                tarefa.publicar(parcial)
+            LOGGER.info("Resposta do Gemini recebida com pontuação %s.", resultado.get("pontuacao_compatibilidade"))
+            acervo = obter_acervo()
+            if acervo is not None:
+                acervo.registrar(texto_curriculo, texto_vaga, resultado, nome=nome, titulo_vaga=titulo_vaga)
+            tarefa.atualizar(3, mensagem="Resposta do Gemini recebida")
+            return resultado
+
+        st.session_state["etapa"] = "Consultando Agente"
+        self._enviar_tarefa("individual", executar, nome)
+
+    def _enfileirar_lote(
+        self,
+        curriculos,
+        vaga_texto: str,
+        concorrencia: int,
+        top_k: Optional[int] = None,
+        limiar: Optional[float] = None,
+    ) -> None:
+        if self._agente is None:
+            st.error("Serviço Gemini não disponível. Configure a chave e recarregue a página.")
+            LOGGER.error("Lote abortado: Agente não inicializado.")
+            return
+        if not curriculos:
+            st.error("Carregue ao menos um currículo antes de iniciar.")
+            LOGGER.warning("Lote abortado: nenhum currículo enviado.")
+            return
+        if not vaga_texto.strip():
+            st.error("Informe os requisitos da vaga ou selecione um exemplo.")
+            LOGGER.warning("Lote abortado: descrição da vaga vazia.")
+            return
         try:
-            texto_vaga = ArquivoHandler.limpar_texto(vaga_texto)
-            LOGGER.info("Descrição da vaga tratada: %d caracteres.", len(texto_vaga))
-            atualizar_status("Descrição preparada", emoji="✅")
+            documentos = expandir_arquivos(curriculos)
         except Exception as exc:  # pragma: no cover
-            progresso.empty()
-            LOGGER.exception("Erro ao tratar vaga: %s", exc)
-            st.error("Não foi possível preparar a descrição da vaga: {}".format(exc))
-            atualizar_status("Falha ao tratar descrição", emoji="⚠️", tipo="error")
-            st.session_state["etapa"] = ""
+            LOGGER.exception("Erro ao abrir arquivos do lote: %s", exc)
+            st.error("Não foi possível abrir os arquivos enviados: {}".format(exc))
             return
-        progresso.progress(60)
-        st.session_state["etapa"] = "Consultando Agente"
-        st.session_state["feedback"] = "Enviando para o modelo Gemini..."
-        atualizar_status("Consultando Agente (Por favor Aguarde)")
-        try:
-            resultado = self._agente.analisar(texto_curriculo, texto_vaga)
+        if not documentos:
+            st.error("Nenhum currículo PDF ou TXT encontrado nos arquivos enviados.")
+            return
+        agente = self._agente
+        total = len(documentos)
+
+        def executar(tarefa: Tarefa) -> List[ResultadoLote]:
+            resultados: List[ResultadoLote] = []
+            tarefa.atualizar(0, total, "Lendo currículos")
+            inicio = time.perf_counter()
+            analisador = AnalisadorLote(agente, max_concorrencia=concorrencia)
+            for item in analisador.analisar(documentos, vaga_texto, top_k=top_k, limiar=limiar):
+                resultados.append(item)
+                decorrido = time.perf_counter() - inicio
+                ritmo = len(resultados) / decorrido * 60 if decorrido > 0 else 0.0
+                tarefa.atualizar(
+                    len(resultados), mensagem=f"{len(resultados)}/{total} currículos analisados ({ritmo:.1f} CVs/min)"
+                )
+                tarefa.publicar(ranquear(resultados))
+                if tarefa.cancelamento_pedido:
+                    # Fechar o gerador descarta o que ainda não começou; o parcial é mantido.
+                    break
             LOGGER.info(
-                "Resposta do Gemini recebida com pontuação %s.",
-                resultado.get("pontuacao_compatibilidade"),
-            )
-            atualizar_status("Resposta do Gemini recebida", emoji="✅")
-        except Exception as erro:  # pragma: no cover
-            LOGGER.exception("Falha na chamada ao Gemini: %s", erro)
-            st.error(
-                "Falha na comunicação com o Gemini: {}. Confirme a chave e o"
-                " modelo configurado em GEMINI_MODEL.".format(erro)
+                "Lote finalizado: %d de %d currículos em %.1fs.", len(resultados), total, time.perf_counter() - inicio
             )
-            progresso.empty()
-            atualizar_status("Erro ao consultar o modelo", emoji="⚠️", tipo="error")
-            st.session_state["etapa"] = ""
+            return ranquear(resultados)
+
+        self._enviar_tarefa("lote", executar, f"{total} currículos")
+
+    def _enfileirar_multivaga(self, curriculo, vagas: Dict[str, str], top_k: int) -> None:
+        if self._agente is None:
+            st.error("Serviço Gemini não disponível. Configure a chave e recarregue a página.")
+            LOGGER.error("Multivagas abortado: Agente não inicializado.")
+            return
+        if not curriculo:
+            st.error("Carregue um currículo antes de iniciar.")
+            LOGGER.warning("Multivagas abortado: currículo não enviado.")
+            return
+        if not vagas:
+            st.error("Selecione ou digite ao menos uma vaga.")
+            LOGGER.warning("Multivagas abortado: nenhuma vaga informada.")
+            return
+        try:
+            ArquivoHandler.verificar_tamanho(curriculo)
+        except ArquivoRejeitado as exc:
+            st.error(str(exc))
+            LOGGER.warning("Multivagas abortado: %s", exc)
+            return
+        agente = self._agente
+        nome, conteudo = curriculo.name, curriculo.getvalue()
+        total = len(vagas)
+
+        def executar(tarefa: Tarefa) -> List[ResultadoVaga]:
+            tarefa.atualizar(0, total, "Lendo currículo")
+            texto_curriculo = obter_extrator().ler_texto(io.BytesIO(conteudo), nome)
+            resultados: List[ResultadoVaga] = []
+            analisador = AnalisadorMultiVaga(agente)
+            for item in analisador.analisar(texto_curriculo, vagas, top_k=top_k, nome_curriculo=nome):
+                resultados.append(item)
+                tarefa.atualizar(len(resultados), mensagem=f"{len(resultados)}/{total} vagas avaliadas")
+                tarefa.publicar(ranquear_vagas(resultados))
+                if tarefa.cancelamento_pedido:
+                    break
+            return ranquear_vagas(resultados)
+
+        self._enviar_tarefa("multivaga", executar, f"{nome} × {total} vagas")
+
+    def _enviar_tarefa(self, tipo: str, funcao, descricao: str) -> None:
+        """Enfileira a análise; uma nova tarefa do mesmo tipo substitui a anterior da sessão."""
+        fila = obter_fila()
+        anterior = st.session_state.get(f"tarefa_{tipo}")
+        if anterior:
+            fila.cancelar(anterior)
+        tarefa = fila.enviar(tipo, funcao, descricao, prioridade=self.PRIORIDADES[tipo], dono=self._id_sessao())
+        st.session_state[f"tarefa_{tipo}"] = tarefa.id
+
+    @st.fragment(run_every=1.0)
+    def _acompanhar_tarefa(self, tipo: str) -> None:
+        """Atualiza o andamento da tarefa a cada segundo, sem reexecutar a página inteira."""
+        fila = obter_fila()
+        tarefa = fila.obter(st.session_state.get(f"tarefa_{tipo}", ""))
+        if tarefa is None or tarefa.finalizada:
+            self._coletar_tarefa(tipo, tarefa)
+            st.rerun()
+        col_status, col_cancelar = st.columns([4, 1])
+        with col_status:
+            if tarefa.status == PENDENTE:
+                st.info(f"⏳ Na fila (posição {fila.posicao(tarefa.id) or 1}). A página continua disponível.")
+            else:
+                st.info(f"⏳ {tarefa.mensagem or 'Processando'}")
+        with col_cancelar:
+            if st.button("✖ Cancelar", key=f"cancelar_{tipo}", use_container_width=True):
+                fila.cancelar(tarefa.id)
+        if tarefa.status != PENDENTE:
+            st.progress(tarefa.progresso)
+        parcial = tarefa.parcial
+        if not parcial:
             return
-        progresso.progress(100)
-        progresso.empty()
-        st.session_state["resultado"] = resultado
-        st.session_state["feedback"] = "Análise concluída com sucesso."
+        if tipo == "individual":
+            self._renderizar_detalhes(parcial, parcial=True)
+        else:
+            # Redesenhado a cada segundo: só a primeira página do ranking parcial.
+            if len(parcial) > self.ITENS_POR_PAGINA:
+                st.caption(f"Mostrando os {self.ITENS_POR_PAGINA} primeiros de {len(parcial)} resultados parciais.")
+            st.dataframe(
+                [item.como_linha() for item in parcial[: self.ITENS_POR_PAGINA]], use_container_width=True
+            )
+
+    def _coletar_tarefa(self, tipo: str, tarefa: Optional[Tarefa]) -> None:
+        """Leva o resultado da tarefa finalizada para a sessão."""
+        st.session_state.pop(f"tarefa_{tipo}", None)
         st.session_state["etapa"] = ""
-        status_box.empty()
-        LOGGER.info("Análise finalizada e armazenada em sessão.")
+        if tarefa is None:
+            return
+        duracao = (tarefa.finalizada_em or 0) - (tarefa.iniciada_em or tarefa.finalizada_em or 0)
+        if tarefa.status == ERRO:
+            st.session_state[f"erro_{tipo}"] = (
+                "Falha na análise: {}. Confirme a chave e o modelo configurado em GEMINI_MODEL.".format(tarefa.erro)
+            )
+            return
+        cancelada = tarefa.status == CANCELADA
+        if tipo == "individual":
+            if cancelada:
+                st.session_state["feedback"] = "Análise cancelada."
+            else:
+                st.session_state["resultado"] = tarefa.resultado
+                st.session_state["feedback"] = "Análise concluída com sucesso."
+                LOGGER.info("Análise finalizada e armazenada em sessão.")
+        elif tipo == "lote":
+            resultados = tarefa.resultado or tarefa.parcial or []
+            st.session_state["resultados_lote"] = resultados
+            st.session_state["feedback_lote"] = "Lote {}: {} de {} currículos em {:.1f}s ({:.1f} CVs/min).".format(
+                "cancelado" if cancelada else "concluído",
+                len(resultados),
+                tarefa.total,
+                duracao,
+                len(resultados) / duracao * 60 if duracao > 0 else 0.0,
+            )
+        else:
+            resultados = tarefa.resultado or tarefa.parcial or []
+            st.session_state["resultados_multivaga"] = resultados
+            st.session_state["feedback_multivaga"] = "Currículo comparado com {} de {} vagas em {:.1f}s{}.".format(
+                len(resultados), tarefa.total, duracao, " (cancelado)" if cancelada else ""
+            )
+
+    def _renderizar_fila(self) -> None:
+        tarefas = obter_fila().listar()
+        if not tarefas:
+            return
+        ativas = [tarefa for tarefa in tarefas if not tarefa.finalizada]
+        with st.expander(f"Fila de análises ({len(ativas)} em andamento, todas as sessões)"):
+            sessao = self._id_sessao()
+            st.dataframe(
+                [{**tarefa.como_dict(), "Sessão": "esta" if tarefa.dono == sessao else "outra"} for tarefa in tarefas],
+                use_container_width=True,
+            )
+            if ativas:
+                col_id, col_botao = st.columns([3, 1])
+                with col_id:
+                    escolha = st.selectbox(
+                        "Tarefa", [tarefa.id for tarefa in ativas], key="fila_cancelar_id", label_visibility="collapsed"
+                    )
+                with col_botao:
+                    if st.button("Cancelar tarefa", key="fila_cancelar", use_container_width=True):
+                        obter_fila().cancelar(escolha)
+
+    @staticmethod
+    def _id_sessao() -> str:
+        if "id_sessao" not in st.session_state:
+            st.session_state["id_sessao"] = uuid.uuid4().hex[:8]
+        return st.session_state["id_sessao"]
+
+    def _renderizar_resultados_lote(self) -> None:
+        resultados: List[ResultadoLote] = st.session_state.get("resultados_lote", [])
+        feedback = st.session_state.get("feedback_lote")
+        if feedback:
+            st.caption(feedback)
+        if not resultados:
+            st.info("💡 O ranking dos currículos aparecerá aqui após a análise.")
+            return
+        pagina = self._paginar(resultados, "lote_pagina")
+        st.dataframe([item.como_linha() for item in pagina], use_container_width=True)
+        resumo = resumir_cascata(item.resultado for item in resultados if item.duplicata_de is None)
+        if resumo:
+            with st.expander("Cascata de modelos"):
+                st.caption(descrever_cascata(resumo))
+                st.dataframe(resumo["camadas"], use_container_width=True)
+        concluidos = [item for item in pagina if item.status == "concluido"]
+        if not concluidos:
+            return
+        escolha = st.selectbox(
+            "Detalhar candidato",
+            [item.nome_arquivo for item in concluidos],
+            key="lote_detalhe",
+        )
+        selecionado = next(item for item in concluidos if item.nome_arquivo == escolha)
+        self._renderizar_detalhes(selecionado.resultado)
+
+    def _renderizar_resultados_multivaga(self) -> None:
+        resultados: List[ResultadoVaga] = st.session_state.get("resultados_multivaga", [])
+        feedback = st.session_state.get("feedback_multivaga")
+        if feedback:
+            st.caption(feedback)
+        if not resultados:
+            st.info("💡 O ranking das vagas para o currículo aparecerá aqui após a análise.")
+            return
+        pagina = self._paginar(resultados, "multivaga_pagina")
+        st.dataframe([item.como_linha() for item in pagina], use_container_width=True)
+        concluidas = [item for item in pagina if item.status == "concluido"]
+        if not concluidas:
+            return
+        escolha = st.selectbox("Detalhar vaga", [item.titulo for item in concluidas], key="multivaga_detalhe")
+        selecionada = next(item for item in concluidas if item.titulo == escolha)
+        self._renderizar_detalhes(selecionada.resultado)
+
+    def _renderizar_acervo(self) -> None:
+        st.markdown("<h2 class='section-title'>Consulta ao Acervo</h2>", unsafe_allow_html=True)
+        acervo = obter_acervo()
+        if acervo is None:
+            st.info(
+                "💡 Defina SELECT_AI_ACERVO=1 e SELECT_AI_ACERVO_CHAVE no .env para guardar as análises"
+                " e consultá-las depois sem novo upload."
+            )
+            return
+        col_termos, col_vaga, col_nota = st.columns([2, 2, 1])
+        with col_termos:
+            termos = st.text_input(
+                "Termos no currículo (todos, separados por vírgula)", key="acervo_termos", placeholder="kafka, postgresql"
+            )
+        with col_vaga:
+            vaga = st.selectbox("Vaga", ["Todas"] + acervo.vagas(), key="acervo_vaga")
+        with col_nota:
+            nota = st.number_input("Compatibilidade acima de", min_value=0, max_value=100, value=0, key="acervo_nota")
+        inicio = time.perf_counter()
+        registros: List[RegistroAcervo] = acervo.buscar(
+            [termo for termo in termos.split(",") if termo.strip()],
+            vaga=None if vaga == "Todas" else vaga,
+            pontuacao_minima=int(nota) if nota > 0 else None,
+        )
+        st.caption(
+            "{} registros em {:.1f} ms, sem chamadas ao modelo.".format(
+                len(registros), (time.perf_counter() - inicio) * 1000
+            )
+        )
+        if not registros:
+            st.info("💡 Nenhuma análise guardada atende aos filtros.")
+            return
+        pagina = self._paginar(registros, "acervo_pagina")
+        st.dataframe([registro.como_linha() for registro in pagina], use_container_width=True)
+        avaliados = {
+            f"{registro.nome or registro.apelido} — {registro.vaga}": registro
+            for registro in pagina
+            if registro.resultado
+        }
+        if avaliados:
+            escolha = st.selectbox("Detalhar análise", list(avaliados), key="acervo_detalhe")
+            self._renderizar_detalhes(avaliados[escolha].resultado)
+
+    def _paginar(self, itens: List[Any], chave: str) -> List[Any]:
+        """Fatia da página escolhida; o seletor só aparece quando há mais de uma página."""
+        paginas = max(1, -(-len(itens) // self.ITENS_POR_PAGINA))
+        if paginas == 1:
+            return itens
+        pagina = int(st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1, key=chave))
+        inicio = (min(pagina, paginas) - 1) * self.ITENS_POR_PAGINA
+        st.caption(f"Itens {inicio + 1} a {min(inicio + self.ITENS_POR_PAGINA, len(itens))} de {len(itens)}.")
+        return itens[inicio : inicio + self.ITENS_POR_PAGINA]
+
+    def _titulo_exemplo(self, vaga_texto: str) -> Optional[str]:
+        """Título da vaga de exemplo aplicada, se o texto não foi editado depois."""
+        titulo = st.session_state.get("vaga_exemplo_aplicado")
+        return titulo if titulo and self.AMOSTRAS_VAGA.get(titulo) == vaga_texto else None
+
+    @staticmethod
+    def _separar_vagas_digitadas(texto: str) -> Dict[str, str]:
+        blocos = [bloco.strip() for bloco in re.split(r"^\s*-{3,}\s*$", texto, flags=re.MULTILINE)]
+        blocos = [bloco for bloco in blocos if bloco]
+        if len(blocos) == 1:
+            return {"Vaga informada": blocos[0]}
+        return {f"Vaga informada {numero}": bloco for numero, bloco in enumerate(blocos, start=1)}
 
     def _renderizar_resultados(self) -> None:
         resultado: Dict[str, object] = st.session_state.get("resultado", {})
@@ -265,16 +650,24 @@ class SelectAIApp:
         if not resultado:
             st.info("💡 Os resultados aparecerão aqui após a análise.")
             return
-        
+        self._renderizar_detalhes(resultado)
+
+    def _renderizar_detalhes(self, resultado: Dict[str, object], parcial: bool = False) -> None:
+        """Desenha métrica, resumo e cards; com `parcial`, campos ausentes aparecem como pendentes."""
+        with obter_telemetria().span("renderizacao", parcial=parcial):
+            self._desenhar_detalhes(resultado, parcial)
+
+    def _desenhar_detalhes(self, resultado: Dict[str, object], parcial: bool) -> None:
         # Métrica de compatibilidade em destaque
-        pontuacao = resultado.get("pontuacao_compatibilidade", 0)
+        pontuacao = resultado.get("pontuacao_compatibilidade", None if parcial else 0)
         col_metric, col_resumo = st.columns([1, 3])
         
         with col_metric:
-            st.metric(label="Compatibilidade", value=f"{pontuacao}%")
+            st.metric(label="Compatibilidade", value="…" if pontuacao is None else f"{pontuacao}%")
         
         with col_resumo:
-            resumo = resultado.get("resumo_geral", "Sem resumo disponível.")
+            padrao = "Gerando resumo..." if parcial else "Sem resumo disponível."
+            resumo = resultado.get("resumo_geral", padrao)
             st.markdown(f"<div class='resumo'>{resumo}</div>", unsafe_allow_html=True)
         
         # Espaçamento antes dos cards
@@ -283,13 +676,18 @@ class SelectAIApp:
         # Grade de resultados em 2 colunas com gap consistente
         col_esquerda, col_direita = st.columns(2, gap="medium")
         
-        with col_esquerda:
-            self._renderizar_card("✅ Pontos Fortes", resultado.get("pontos_fortes", []), "success")
-            self._renderizar_card("💡 Sugestões", resultado.get("sugestoes", []), "info")
-        
-        with col_direita:
-            self._renderizar_card("⚠️ Lacunas", resultado.get("lacunas", []), "warning")
-            self._renderizar_card("📋 Análise Profissional", resultado.get("analise_profissional", []), "neutral")
+        cards = (
+            ("✅ Pontos Fortes", "pontos_fortes", "success", col_esquerda),
+            ("💡 Sugestões", "sugestoes", "info", col_esquerda),
+            ("⚠️ Lacunas", "lacunas", "warning", col_direita),
+            ("📋 Análise Profissional", "analise_profissional", "neutral", col_direita),
+        )
+        for titulo, campo, tipo, coluna in cards:
+            itens = resultado.get(campo, [])
+            if isinstance(itens, str):
+                itens = [itens]
+            with coluna:
+                self._renderizar_card(titulo, itens, tipo, pendente=parcial and campo not in resultado)
 
     def _renderizar_lista(self, titulo: str, itens) -> None:
         if not itens:
@@ -310,7 +708,7 @@ class SelectAIApp:
         for item in itens:
             st.markdown(f"<div class='item-compacto item-{tipo}'>• {item}</div>", unsafe_allow_html=True)
     
-    def _renderizar_card(self, titulo: str, itens, tipo: str = "neutral") -> None:
+    def _renderizar_card(self, titulo: str, itens, tipo: str = "neutral", pendente: bool = False) -> None:
         """Renderiza um card com altura e alinhamento consistentes."""
         # Mapeamento de ícones e cores
         icone_map = {
@@ -323,13 +721,17 @@ class SelectAIApp:
         # Construir HTML do card
         icone = icone_map.get(tipo, "📋")
         
-        if not itens or len(itens) == 0:
+        if pendente:
+            conteudo = "<div class='card-vazio'>Gerando...</div>"
+        elif not itens or len(itens) == 0:
             conteudo = "<div class='card-vazio'>Nenhum item encontrado</div>"
         else:
             itens_html = "".join(
                 f"<div class='card-item item-{tipo}'>• {item}</div>" 
-                for item in itens
+                for item in itens[: self.MAX_ITENS_CARD]
             )
+            if len(itens) > self.MAX_ITENS_CARD:
+                itens_html += f"<div class='card-vazio'>… e mais {len(itens) - self.MAX_ITENS_CARD} itens</div>"
             conteudo = f"<div class='card-conteudo'>{itens_html}</div>"
         
         card_html = f"""
@@ -360,6 +762,38 @@ class SelectAIApp:
             st.rerun()
 
 
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _obter_agente(api_key: str, modelo: str) -> AgenteAnalisador:
+    """Um agente (e cliente do modelo) por processo para cada par chave/modelo.
+
+    O Streamlit reexecuta o script a cada interação; sem o cache, cada rerun
+    reconfiguraria o SDK e recriaria o modelo.
+    """
+    agente = AgenteAnalisador(api_key=api_key, model=modelo or None)
+    LOGGER.info("Agente inicializado com sucesso.")
+    return agente
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _carregar_estilo(caminho: str, modificado_em: float) -> str:
+    """CSS pronto para injeção; a data de modificação na chave recarrega o arquivo editado."""
+    with open(caminho, "r", encoding="utf-8") as css:
+        return f"<style>{css.read()}</style>"
+
+
+def invalidar_recursos() -> None:
+    """Descarta agente e CSS compartilhados (ex.: após trocar a chave ou o modelo no `.env`)."""
+    _obter_agente.clear()
+    _carregar_estilo.clear()
+    LOGGER.info("Recursos compartilhados invalidados.")
+
+
+def recarregar_configuracao() -> None:
+    """Relê o `.env` por cima do ambiente atual e invalida os recursos que dependem dele."""
+    load_dotenv(override=True)
+    invalidar_recursos()
+
+
 def executar_app() -> None:
     app = SelectAIApp()
     app.executar()
@@ -0,0 +1,140 @@
+"""Testes de `AgenteAnalisador.analisar_async` contra o backend falso, sem chave da API."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from src.core.agente import AgenteAnalisador
+from src.core.backend import BackendFalso, ErroModeloFalso
+from src.core.cache import CacheResultados
+from src.core.limitador import LimitadorTaxa
+
+
+CURRICULO = "Desenvolvedora Python com cinco anos de experiência em Django, SQL e AWS."
+VAGA = "Vaga para pessoa desenvolvedora Python sênior com Django e AWS."
+
+
+class BackendRoteirizado(BackendFalso):
+    """Backend falso que devolve os códigos de erro indicados, em ordem, e anota o início de cada chamada."""
+
+    def __init__(self, erros: Tuple[Optional[int], ...] = (), **kwargs) -> None:
+        super().__init__(dispersao=0.0, **kwargs)
+        self._erros = list(erros)
+        self.inicios: List[float] = []
+
+    def sortear(self, latencia_ms: Optional[float] = None) -> Tuple[float, Optional[int], bool]:
+        latencia, _, truncar = super().sortear(latencia_ms)
+        self.inicios.append(time.monotonic())
+        return latencia, self._erros.pop(0) if self._erros else None, truncar
+
+
+@pytest.fixture(autouse=True)
+def sem_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(AgenteAnalisador, "_calcular_espera", staticmethod(lambda tentativa: 0.0))
+
+
+class CacheObservado(CacheResultados):
+    """Cache em memória que anota as threads que o acessaram."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads: List[threading.Thread] = []
+
+    def obter(self, chave: str) -> Optional[Dict[str, Any]]:
+        self.threads.append(threading.current_thread())
+        return super().obter(chave)
+
+    def guardar(self, chave: str, resultado: Dict[str, Any]) -> None:
+        self.threads.append(threading.current_thread())
+        super().guardar(chave, resultado)
+
+
+def criar_agente(backend: BackendFalso, limitador: Optional[LimitadorTaxa] = None, **kwargs) -> AgenteAnalisador:
+    kwargs.setdefault("usar_cache", False)
+    return AgenteAnalisador(api_key="", backend=backend, limitador=limitador or LimitadorTaxa(), **kwargs)
+
+
+def test_prazo_por_chamada_interrompe_modelo_lento() -> None:
+    backend = BackendRoteirizado(latencia_ms=2000)
+    agente = criar_agente(backend, timeout=0.05, max_tentativas=2)
+
+    inicio = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(agente.analisar_async(CURRICULO, VAGA))
+
+    assert backend.chamadas == 2
+    assert time.perf_counter() - inicio < 1.0
+
+
+def test_repete_erros_transitorios_ate_obter_resposta() -> None:
+    backend = BackendRoteirizado(erros=(429, 503), latencia_ms=1)
+    agente = criar_agente(backend, max_tentativas=4)
+
+    resultado = asyncio.run(agente.analisar_async(CURRICULO, VAGA))
+
+    assert backend.chamadas == 3
+    assert 0 <= resultado["pontuacao_compatibilidade"] <= 100
+    assert agente.estatisticas_json()["direto"] == 1
+
+
+def test_tentativas_sao_limitadas() -> None:
+    backend = BackendRoteirizado(erros=(503,) * 10, latencia_ms=1)
+    agente = criar_agente(backend, max_tentativas=3)
+
+    with pytest.raises(ErroModeloFalso) as erro:
+        asyncio.run(agente.analisar_async(CURRICULO, VAGA))
+
+    assert erro.value.code == 503
+    assert backend.chamadas == 3
+
+
+def test_erro_nao_transitorio_nao_e_repetido() -> None:
+    backend = BackendRoteirizado(erros=(400,), latencia_ms=1)
+    agente = criar_agente(backend, max_tentativas=4)
+
+    with pytest.raises(ErroModeloFalso):
+        asyncio.run(agente.analisar_async(CURRICULO, VAGA))
+
+    assert backend.chamadas == 1
+
+
+def test_limitador_espaca_chamadas_concorrentes() -> None:
+    limitador = LimitadorTaxa(requisicoes_por_minuto=600)
+    for _ in range(600):
+        # Esvazia o balde: daqui em diante, uma requisição a cada 0,1 s.
+        limitador.reservar()
+    backend = BackendRoteirizado(latencia_ms=1)
+    agente = criar_agente(backend, limitador=limitador)
+
+    async def analisar_varios() -> None:
+        await asyncio.gather(*(agente.analisar_async(f"{CURRICULO} {indice}", VAGA) for indice in range(4)))
+
+    asyncio.run(analisar_varios())
+
+    inicios = sorted(backend.inicios)
+    intervalos = [posterior - anterior for anterior, posterior in zip(inicios, inicios[1:])]
+    assert len(inicios) == 4
+    assert min(intervalos) >= 0.08
+
+
+def test_cache_de_resultados_fica_fora_do_event_loop() -> None:
+    backend = BackendRoteirizado(latencia_ms=1)
+    cache = CacheObservado()
+    agente = criar_agente(backend, cache=cache, usar_cache=True)
+
+    async def analisar_duas_vezes() -> Tuple[Dict[str, Any], Dict[str, Any], threading.Thread]:
+        primeiro = await agente.analisar_async(CURRICULO, VAGA)
+        segundo = await agente.analisar_async(CURRICULO, VAGA)
+        return primeiro, segundo, threading.current_thread()
+
+    primeiro, segundo, thread_do_loop = asyncio.run(analisar_duas_vezes())
+
+    assert primeiro == segundo
+    assert backend.chamadas == 1
+    assert len(cache.threads) == 3
+    assert thread_do_loop not in cache.threads
@@ -0,0 +1,85 @@
+"""Uploads hostis são recusados com `ArquivoRejeitado` sem estourar a memória.
+
+Cada cenário de `benchmarks.bench_memoria` é lido num subprocesso próprio, pelo
+mesmo caminho do lote (`expandir_arquivos` + `AnalisadorLote._ler`), para que o
+pico de RSS medido seja só o daquela leitura.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import pytest
+
+from benchmarks.bench_memoria import _escrever_zip_bomba
+from benchmarks.pdf_sintetico import gerar_pdf_arvore_bomba, gerar_pdf_bomba
+
+
+RAIZ = Path(__file__).resolve().parents[1]
+BOMBA_MB = 300
+TETO_MB = 128
+
+LEITURA = """
+import json
+import sys
+
+from benchmarks.bench_memoria import pico_rss_mb
+from src.core.arquivo import ArquivoRejeitado
+from src.core.lote import AnalisadorLote, expandir_arquivos
+
+caminho = sys.argv[1]
+erros = []
+with open(caminho, "rb") as arquivo:
+    documentos = expandir_arquivos([arquivo])
+for documento in documentos:
+    try:
+        AnalisadorLote._ler(documento)
+    except ArquivoRejeitado as exc:
+        erros.append({"nome": documento.nome, "tipo": type(exc).__name__, "mensagem": str(exc)})
+print(json.dumps({"documentos": len(documentos), "erros": erros, "pico_mb": pico_rss_mb()}))
+"""
+
+
+def _escrever_bytes(gerar: Callable[[], bytes]) -> Callable[[str], None]:
+    def escrever(caminho: str) -> None:
+        Path(caminho).write_bytes(gerar())
+
+    return escrever
+
+
+CENARIOS: Dict[str, Any] = {
+    "pdf_arvore_bomba": ("arvore.pdf", _escrever_bytes(lambda: gerar_pdf_arvore_bomba(10, 6))),
+    "pdf_flate_bomba": ("bomba.pdf", _escrever_bytes(lambda: gerar_pdf_bomba(BOMBA_MB))),
+    "zip_bomba": ("lote.zip", lambda caminho: _escrever_zip_bomba(caminho, BOMBA_MB)),
+}
+
+
+def _ler_em_subprocesso(caminho: Path) -> Dict[str, Any]:
+    ambiente = {**os.environ, "PYTHONPATH": str(RAIZ), "SELECT_AI_EXTRACAO": "local"}
+    processo = subprocess.run(
+        [sys.executable, "-c", LEITURA, str(caminho)],
+        capture_output=True,
+        text=True,
+        timeout=120,
+        cwd=RAIZ,
+        env=ambiente,
+    )
+    assert processo.returncode == 0, processo.stderr
+    return json.loads(processo.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("cenario", sorted(CENARIOS))
+def test_upload_hostil_e_recusado_abaixo_do_teto(cenario: str, tmp_path: Path) -> None:
+    nome, escrever = CENARIOS[cenario]
+    caminho = tmp_path / nome
+    escrever(str(caminho))
+
+    medicao = _ler_em_subprocesso(caminho)
+
+    assert [erro["tipo"] for erro in medicao["erros"]] == ["ArquivoRejeitado"]
+    assert medicao["pico_mb"] <= TETO_MB, f"pico de {medicao['pico_mb']:.1f} MB em {cenario}"